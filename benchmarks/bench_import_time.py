@@ -0,0 +1,74 @@
+"""Import-time budget check for the app's cold start.
+
+Each module set is imported in a fresh interpreter with `-X importtime`. The login path
+(what app.py imports before a page is chosen) must stay under its budget and must not
+pull in the data stack; heavy dependencies may only be loaded by the pages using them.
+
+Usage: python benchmarks/bench_import_time.py   (exits non-zero when over budget)
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "altair")
+
+# name -> (modules to import, budget in ms, heavy modules allowed)
+CHECKS = {
+    "login path": (["op_client", "snapshot"], float(os.getenv("OP_LOGIN_IMPORT_BUDGET_MS", "300")), False),
+    "views.fast_track": (["views.fast_track"], None, False),
+    "views.kanban": (["views.kanban"], None, True),
+    "views.reports": (["views.reports"], None, True),
+    "views.timesheet": (["views.timesheet"], None, True),
+    "views.workload": (["views.workload"], None, True),
+    "views.estimation": (["views.estimation"], None, True),
+}
+
+
+def measure(modules):
+    """Returns (total ms, set of imported top-level modules) for importing `modules` cold."""
+    code = "import " + ", ".join(modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    total_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue # Header line
+        # Top-level entries (no indentation) carry the cumulative time of their subtree
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+        imported.add(name.strip().split(".")[0])
+    return total_us / 1000.0, imported
+
+
+def main():
+    failures = []
+    # Streamlit itself is imported by every page; measure the app's own cost on top of it
+    for name, (modules, budget_ms, heavy_allowed) in CHECKS.items():
+        if name.startswith("views."):
+            modules = ["streamlit"] + modules
+        ms, imported = measure(modules)
+        heavy = sorted(m for m in HEAVY_MODULES if m in imported)
+        budget = f" (budget {budget_ms:.0f} ms)" if budget_ms else ""
+        print(f"{name:<20} {ms:8.1f} ms{budget}  heavy: {', '.join(heavy) or '-'}")
+        if budget_ms and ms > budget_ms:
+            failures.append(f"{name} took {ms:.1f} ms > {budget_ms:.0f} ms")
+        if heavy and not heavy_allowed:
+            failures.append(f"{name} imports {', '.join(heavy)}")
+
+    if failures:
+        print("\nFAILED: " + "; ".join(failures))
+        return 1
+    print("\nOK: import-time budget respected.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
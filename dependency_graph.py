@@ -0,0 +1,123 @@
+# Relation types (OpenProject API v3) where the "from" work package comes first, and those where
+# the "to" one does. Other types (relates, duplicates, includes, partof...) don't order work.
+FROM_FIRST = {"precedes", "blocks", "required"}
+TO_FIRST = {"follows", "blocked", "requires"}
+
+
+def relation_edge(relation):
+    """(before, after) work package ids of a relation row, or None if it doesn't order work."""
+    kind, source, target = relation.get("type"), relation.get("from"), relation.get("to")
+    if source is None or target is None:
+        return None
+    if kind in FROM_FIRST:
+        return source, target
+    if kind in TO_FIRST:
+        return target, source
+    return None
+
+
+class DependencyGraph:
+    """Adjacency index of work package dependencies ("before" must finish before "after").
+
+    Every query is linear in nodes + edges: the strongly connected components (iterative Tarjan)
+    give both the cycles and a topological order of the graph with each cycle collapsed.
+    """
+
+    def __init__(self, edges=()):
+        self.successors = {}
+        self.predecessors = {}
+        for before, after in edges:
+            self.successors.setdefault(before, set()).add(after)
+            self.predecessors.setdefault(after, set()).add(before)
+            self.successors.setdefault(after, set())
+            self.predecessors.setdefault(before, set())
+        self._components = None
+
+    @classmethod
+    def from_relations(cls, relations):
+        return cls(edge for edge in map(relation_edge, relations) if edge is not None)
+
+    def __len__(self):
+        return len(self.successors)
+
+    def components(self):
+        """Strongly connected components, in topological order (dependencies first)."""
+        if self._components is None:
+            index, low, on_stack, stack, found = {}, {}, set(), [], []
+            for root in self.successors:
+                if root in index:
+                    continue
+                index[root] = low[root] = len(index)
+                stack.append(root)
+                on_stack.add(root)
+                work = [(root, iter(self.successors[root]))]
+                while work:
+                    node, children = work[-1]
+                    for child in children:
+                        if child not in index:
+                            index[child] = low[child] = len(index)
+                            stack.append(child)
+                            on_stack.add(child)
+                            work.append((child, iter(self.successors[child])))
+                            break
+                        if child in on_stack:
+                            low[node] = min(low[node], index[child])
+                    else:
+                        work.pop()
+                        if work:
+                            parent = work[-1][0]
+                            low[parent] = min(low[parent], low[node])
+                        if low[node] == index[node]:
+                            component = []
+                            while True:
+                                member = stack.pop()
+                                on_stack.discard(member)
+                                component.append(member)
+                                if member == node:
+                                    break
+                            found.append(component)
+            found.reverse()  # Tarjan emits components dependents first
+            self._components = found
+        return self._components
+
+    def topological_order(self):
+        """Every node, dependencies before dependents (members of a cycle kept together)."""
+        return [node for component in self.components() for node in component]
+
+    def cycles(self):
+        """Groups of work packages that (transitively) depend on each other."""
+        return [c for c in self.components() if len(c) > 1 or c[0] in self.successors[c[0]]]
+
+    def blockers(self, task_id, open_ids):
+        """Direct dependencies of `task_id` that are still open."""
+        return sorted(p for p in self.predecessors.get(task_id, ()) if p in open_ids)
+
+    def critical_paths(self, weights, group_of):
+        """Longest dependency chain per group, by summed weight: {group: (total, [ids in order])}.
+
+        Only nodes in `group_of` (e.g. open task id -> project id) take part, and a chain
+        stays within one group. Edges inside a cycle are ignored.
+        """
+        component_of = {node: i for i, component in enumerate(self.components()) for node in component}
+        distance, previous, best = {}, {}, {}
+        for node in self.topological_order():
+            group = group_of.get(node)
+            if group is None:
+                continue
+            before = None
+            for pred in self.predecessors[node]:
+                if (pred in distance and group_of[pred] == group and component_of[pred] != component_of[node]
+                        and (before is None or distance[pred] > distance[before])):
+                    before = pred
+            distance[node] = weights.get(node, 0.0) + (distance[before] if before is not None else 0.0)
+            previous[node] = before
+            if group not in best or distance[node] > distance[best[group]]:
+                best[group] = node
+        paths = {}
+        for group, node in best.items():
+            path, total = [], distance[node]
+            while node is not None:
+                path.append(node)
+                node = previous[node]
+            paths[group] = (total, path[::-1])
+        return paths
@@ -0,0 +1,80 @@
+import io
+import os
+import tempfile
+
+# Exports are written chunk by chunk to a temp file on disk, so a 100k-row download doesn't
+# keep extra copies of the data in RAM while it's being serialized; only the finished file is read back.
+CHUNK_ROWS = 10_000
+
+# Label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Arrow IPC": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+
+def available_formats():
+    """CSV always; Parquet and Arrow IPC when pyarrow is installed."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return ["CSV"]
+    return list(EXPORT_FORMATS.keys())
+
+
+def export_file(df, fmt, chunk_rows=CHUNK_ROWS):
+    """Serializes `df` in `fmt` chunk by chunk. Returns the file's bytes (st.download_button data)."""
+    writers = {"CSV": _write_csv, "Parquet": _write_parquet, "Arrow IPC": _write_arrow_ipc}
+    if fmt not in writers:
+        raise ValueError(f"Unknown export format: {fmt}")
+    with tempfile.NamedTemporaryFile(suffix=f".{EXPORT_FORMATS[fmt][0]}", delete=False) as out:
+        path = out.name
+        try:
+            writers[fmt](df, out, chunk_rows)
+        except BaseException:
+            out.close()
+            os.unlink(path)
+            raise
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.unlink(path)
+
+
+def _chunks(df, chunk_rows):
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _write_csv(df, out, chunk_rows):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    for i, chunk in enumerate(_chunks(df, chunk_rows)):
+        chunk.to_csv(text, index=False, header=(i == 0))
+    text.flush()
+    text.detach() # Keep `out` open
+
+
+def _arrow_schema(df):
+    import pyarrow as pa
+    return pa.Schema.from_pandas(df, preserve_index=False)
+
+
+def _write_parquet(df, out, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(df)
+    with pq.ParquetWriter(out, schema) as writer:
+        for chunk in _chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _write_arrow_ipc(df, out, chunk_rows):
+    import pyarrow as pa
+
+    schema = _arrow_schema(df)
+    with pa.ipc.new_file(out, schema) as writer:
+        for chunk in _chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
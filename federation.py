@@ -0,0 +1,418 @@
+import contextvars
+import functools
+import hashlib
+import queue
+import re
+import threading
+from dependency_graph import DependencyGraph
+from op_cache import CachedResult
+from op_client import get_client, run_concurrently
+from project_tree import project_paths
+from search_index import SearchIndex, normalize
+
+# Instance-qualified ids: "<alias>:<id>" (e.g. "interno:123")
+SEPARATOR = ":"
+
+
+def qualify(alias, value):
+    return None if value is None else f"{alias}{SEPARATOR}{value}"
+
+
+def split_id(qualified):
+    """(alias, raw id) of an instance-qualified id."""
+    alias, _, raw = str(qualified).rpartition(SEPARATOR)
+    return alias, int(raw)
+
+
+def instance_aliases(labels):
+    """Short unique aliases ("Cliente Externo" -> "cliente-externo") used to qualify ids."""
+    aliases = []
+    for label in labels:
+        base = re.sub(r"[^a-z0-9]+", "-", normalize(label)).strip("-") or "op"
+        alias, n = base, 2
+        while alias in aliases:
+            alias, n = f"{base}-{n}", n + 1
+        aliases.append(alias)
+    return aliases
+
+
+class _FederatedCache:
+    """Read-only view of the members' task caches under the federated keys (see render_freshness)."""
+
+    def __init__(self, federation):
+        self._federation = federation
+
+    def version(self, key):
+        # Member versions only grow, so their sum changes whenever any of them does
+        return sum(client.task_cache.version(member_key) for _, client, member_key in self._federation._member_keys(key))
+
+    def is_refreshing(self, key):
+        return any(client.task_cache.is_refreshing(member_key) for _, client, member_key in self._federation._member_keys(key))
+
+    def peek(self, key):
+        """The merged rows of `key`, or None unless every instance has it cached."""
+        parts = []
+        for alias, client, member_key in self._federation._member_keys(key):
+            rows = client.task_cache.peek(member_key)
+            if rows is None:
+                return None
+            parts.append((alias, rows))
+        return [row for alias, rows in parts for row in self._federation._qualify_rows(key, alias, rows)]
+
+
+class FederatedClient:
+    """Several OpenProject instances behind the OpenProjectClient API the pages use.
+
+    Reads fan out to every instance concurrently (latency of the slowest, not the sum) and
+    merge into one list with instance-qualified ids; writes are routed to the instance of the
+    id they target. Each instance keeps its own pooled client and caches. The user's own
+    account on every instance is linked: its tasks share the first instance's "me" id.
+    """
+
+    def __init__(self, instances):
+        # instances: [(label, api_key, url)], the first one is the primary
+        self.instances = tuple(instances)
+        self.aliases = instance_aliases(label for label, _, _ in self.instances)
+        self.labels = {alias: label for alias, (label, _, _) in zip(self.aliases, self.instances)}
+        self.base_url = " | ".join(url for _, _, url in self.instances)
+        # Credentials fingerprint, as OpenProjectClient.scope
+        self.scope = hashlib.sha256("|".join(f"{url}|{key}" for _, key, url in self.instances).encode()).hexdigest()[:16]
+        self.task_cache = _FederatedCache(self)
+        self._lock = threading.RLock()
+        self._me_ids = {}  # alias -> raw id of the user on that instance
+        self._merged = {}  # federated key -> (member versions, merged rows)
+        self._dependency_graph = None
+        self._search_indexes = {}
+
+    # --- Members and id routing ---
+
+    def members(self):
+        return [(alias, get_client(api_key=api_key, url=url))
+                for alias, (_, api_key, url) in zip(self.aliases, self.instances)]
+
+    def _member(self, alias):
+        return dict(self.members())[alias]
+
+    def _fan_out(self, call, members=None):
+        """[(alias, client, call(alias, client))] for every member, run concurrently."""
+        members = self.members() if members is None else members
+        results = run_concurrently(*[functools.partial(call, alias, client) for alias, client in members])
+        return [(alias, client, result) for (alias, client), result in zip(members, results)]
+
+    def _route(self, qualified_id):
+        alias, raw = split_id(qualified_id)
+        return alias, self._member(alias), raw
+
+    def _me_id(self, alias, client):
+        with self._lock:
+            if alias in self._me_ids:
+                return self._me_ids[alias]
+        me = client.get_me()
+        if me is None:
+            return None
+        with self._lock:
+            self._me_ids[alias] = me["id"]
+        return me["id"]
+
+    def me_id(self):
+        """Federated id of the logged-in user (their account on the primary instance)."""
+        alias, client = self.members()[0]
+        return qualify(alias, self._me_id(alias, client))
+
+    def _route_assignee(self, assignee_id):
+        """[(alias, client, member assignee filter)] for a federated assignee filter."""
+        members = self.members()
+        if assignee_id is None or assignee_id == "me":
+            return [(alias, client, assignee_id) for alias, client in members]
+        if assignee_id == self.me_id():
+            return [(alias, client, "me") for alias, client in members]
+        alias, client, raw = self._route(assignee_id)
+        return [(alias, client, raw)]
+
+    def _member_keys(self, key):
+        if key[0] == "all_tasks":
+            return [(alias, client, ("all_tasks", raw)) for alias, client, raw in self._route_assignee(key[1])]
+        return [(alias, client, key) for alias, client in self.members()]
+
+    # --- Qualification of member rows ---
+
+    def _qualify_user(self, alias, user_id):
+        # The user's own account on each instance maps to the federated "me"
+        me = self._me_ids.get(alias)
+        if user_id is not None and me is not None and user_id == me:
+            return self.me_id()
+        return qualify(alias, user_id)
+
+    def _qualify_task(self, alias, task):
+        return dict(task, id=qualify(alias, task["id"]), project_id=qualify(alias, task.get("project_id")),
+                    assignee_id=self._qualify_user(alias, task.get("assignee_id")), instance=self.labels[alias])
+
+    def _qualify_project(self, alias, project):
+        # Roots carry the instance label, so paths read "Instance › Root › Child"
+        name = project["name"] if project.get("parent_id") else f"{self.labels[alias]} › {project['name']}"
+        return dict(project, id=qualify(alias, project["id"]), parent_id=qualify(alias, project.get("parent_id")),
+                    name=name, instance=self.labels[alias])
+
+    def _qualify_relation(self, alias, relation):
+        return dict(relation, id=qualify(alias, relation["id"]),
+                    **{"from": qualify(alias, relation["from"]), "to": qualify(alias, relation["to"])})
+
+    def _qualify_rows(self, key, alias, rows):
+        qualify_row = {"projects": self._qualify_project, "relations": self._qualify_relation}.get(key[0], self._qualify_task)
+        return [qualify_row(alias, row) for row in rows]
+
+    def _merge(self, key, parts):
+        """One CachedResult from the members' (alias, client, CachedResult), qualified once per version."""
+        available = [(alias, result) for alias, _, result in parts if result.value is not None]
+        if not available:
+            return CachedResult(None, None, True, False, 0)
+        versions = tuple(result.version for _, _, result in parts)
+        with self._lock:
+            memo = self._merged.get(key)
+        if memo is None or memo[0] != versions:
+            rows = [row for alias, result in available for row in self._qualify_rows(key, alias, result.value)]
+            memo = (versions, rows)
+            with self._lock:
+                self._merged[key] = memo
+        ages = [result.age for _, result in available if result.age is not None]
+        return CachedResult(
+            memo[1],
+            max(ages) if ages else None,
+            # A missing instance shows as stale data (render_freshness warns about it)
+            any(result.stale for _, _, result in parts),
+            any(result.refreshing for _, _, result in parts),
+            sum(versions),
+        )
+
+    # --- Reads ---
+
+    def is_configured(self):
+        return all(client.is_configured() for _, client in self.members())
+
+    def validate_login(self):
+        return all(ok for _, _, ok in self._fan_out(lambda alias, client: client.validate_login()))
+
+    def get_me(self):
+        self._fan_out(self._me_id)  # Every instance's user id is needed to link their tasks
+        alias, client = self.members()[0]
+        me = client.get_me()
+        return dict(me, id=self.me_id()) if me else None
+
+    def get_projects(self):
+        return [self._qualify_project(alias, p) for alias, _, projects in self._fan_out(
+            lambda alias, client: client.get_projects()) for p in projects]
+
+    def get_projects_cached(self, force=False):
+        return self._merge(("projects",), self._fan_out(lambda alias, client: client.get_projects_cached(force=force)))
+
+    def get_users(self):
+        self.get_me()
+        users = []
+        for alias, _, rows in self._fan_out(lambda alias, client: client.get_users()):
+            for u in rows:
+                if u["id"] == self._me_ids.get(alias) and alias != self.aliases[0]:
+                    continue  # Linked to the primary account
+                users.append(dict(u, id=self._qualify_user(alias, u["id"]), name=f"{u['name']} ({self.labels[alias]})"))
+        return users
+
+    def get_my_tasks(self):
+        return self.get_my_tasks_cached().value or []
+
+    def get_my_tasks_cached(self, force=False):
+        self.get_me()
+        return self._merge(("my_tasks",), self._fan_out(lambda alias, client: client.get_my_tasks_cached(force=force)))
+
+    def get_all_tasks(self, assignee_id="me"):
+        return self.get_all_tasks_cached(assignee_id).value or []
+
+    def get_all_tasks_cached(self, assignee_id="me", force=False):
+        self.get_me()
+        routes = self._route_assignee(assignee_id)
+        results = run_concurrently(*[functools.partial(client.get_all_tasks_cached, assignee_id=raw, force=force)
+                                     for _, client, raw in routes])
+        parts = [(alias, client, result) for (alias, client, _), result in zip(routes, results)]
+        return self._merge(("all_tasks", assignee_id), parts)
+
+    def report_state(self):
+        # Per-instance accumulators can't be sliced by a federated assignee: pages use the task cube
+        return None
+
+    def project_shards(self, projects=None):
+        return [(self._qualify_project(alias, root), None if ids is None else tuple(qualify(alias, i) for i in ids))
+                for alias, _, shards in self._fan_out(lambda alias, client: client.project_shards())
+                for root, ids in shards]
+
+    def iter_task_shards(self, assignee_id=None, projects=None):
+        """Every instance's shards (OpenProjectClient.iter_task_shards) at once, yielded as they land."""
+        self.get_me()
+        routes = self._route_assignee(assignee_id)
+        landed = queue.Queue()
+
+        def drain(alias, client, raw):
+            try:
+                for root, tasks in client.iter_task_shards(raw):
+                    landed.put((alias, root, tasks))
+            except Exception as e:
+                landed.put(e)
+            finally:
+                landed.put(None)
+
+        for alias, client, raw in routes:
+            context = contextvars.copy_context()
+            threading.Thread(target=context.run, args=(drain, alias, client, raw), daemon=True).start()
+        pending, failure = len(routes), None
+        while pending:
+            item = landed.get()
+            if item is None:
+                pending -= 1
+            elif isinstance(item, Exception):
+                failure = failure or item
+            else:
+                alias, root, tasks = item
+                yield self._qualify_project(alias, root), [self._qualify_task(alias, t) for t in tasks]
+        if failure is not None:
+            raise failure
+
+    def get_time_entries(self, start, end, refresh=False):
+        self.get_me()
+        return [dict(e, id=qualify(alias, e["id"]), user_id=self._qualify_user(alias, e.get("user_id")),
+                     project_id=qualify(alias, e.get("project_id")), work_package_id=qualify(alias, e.get("work_package_id")))
+                for alias, _, entries in self._fan_out(lambda alias, client: client.get_time_entries(start, end, refresh=refresh))
+                for e in entries]
+
+    def _catalog(self, method):
+        """Union by name of a per-instance reference list (statuses, types), with qualified ids."""
+        merged = {}
+        for alias, _, rows in self._fan_out(lambda alias, client: getattr(client, method)()):
+            for row in rows:
+                merged.setdefault(row["name"], dict(row, id=qualify(alias, row["id"])))
+        return list(merged.values())
+
+    def get_statuses(self):
+        return self._catalog("get_statuses")
+
+    def get_types(self):
+        return self._catalog("get_types")
+
+    def _translate(self, alias, qualified, method):
+        """Raw id on `alias` of a catalog entry (status, type) picked from the merged list, matched by name.
+
+        Raises ValueError if `alias` has no entry of that name, rather than dropping the change.
+        """
+        if not isinstance(qualified, str) or SEPARATOR not in qualified:
+            return qualified
+        source, raw = split_id(qualified)
+        if source == alias:
+            return raw
+        name = next((r["name"] for r in getattr(self._member(source), method)() if r["id"] == raw), None)
+        translated = next((r["id"] for r in getattr(self._member(alias), method)() if r["name"] == name), None)
+        if name is None or translated is None:
+            kind = {"get_statuses": "el estado", "get_types": "el tipo"}[method]
+            raise ValueError(f"{self.labels[alias]} no tiene {kind} '{name or qualified}'")
+        return translated
+
+    # --- Relations ---
+
+    def get_relations_cached(self, force=False):
+        return self._merge(("relations",), self._fan_out(lambda alias, client: client.get_relations_cached(force=force)))
+
+    def dependency_graph(self, force=False):
+        cached = self.get_relations_cached(force=force)
+        if cached.value is None:
+            return None
+        with self._lock:
+            memo = self._dependency_graph
+        if memo is not None and memo[0] == cached.version:
+            return memo[1]
+        graph = DependencyGraph.from_relations(cached.value)
+        with self._lock:
+            self._dependency_graph = (cached.version, graph)
+        return graph
+
+    def get_blockers(self, task_ids):
+        by_alias = {}
+        for task_id in task_ids:
+            alias, raw = split_id(task_id)
+            by_alias.setdefault(alias, []).append(raw)
+        members = [(alias, client) for alias, client in self.members() if alias in by_alias]
+        blocked = {}
+        for alias, _, found in self._fan_out(lambda alias, client: client.get_blockers(by_alias[alias]), members):
+            for task, blockers in found.items():
+                blocked[qualify(alias, task)] = [qualify(alias, b) for b in blockers]
+        return blocked
+
+    # --- Search ---
+
+    def project_index(self):
+        cached = self.get_projects_cached()
+        def docs():
+            for pid, (_, path) in project_paths(cached.value or []).items():
+                yield pid, path, path
+        return self._search_index("projects", cached.version, docs)
+
+    def task_index(self, cache_key=("my_tasks",)):
+        version = self.task_cache.version(cache_key)
+        def docs():
+            for t in self.task_cache.peek(cache_key) or []:
+                raw = split_id(t["id"])[1]
+                yield t["id"], f"#{t['id']} · {t['subject']}", f"{t['id']} {raw} {t['subject']} {t.get('project_name') or ''}"
+        return self._search_index(cache_key, version, docs)
+
+    def _search_index(self, name, version, docs):
+        with self._lock:
+            entry = self._search_indexes.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        index = entry[1] if entry is not None else SearchIndex()
+        index.sync(docs())
+        with self._lock:
+            self._search_indexes[name] = (version, index)
+        return index
+
+    # --- Writes (routed to the instance of the target id) ---
+
+    def create_work_package(self, project_id, subject, type_id, estimated_hours=None, description=None, due_date=None):
+        alias, client, raw = self._route(project_id)
+        result = client.create_work_package(raw, subject, self._translate(alias, type_id, "get_types"),
+                                            estimated_hours, description, due_date=due_date)
+        return dict(result, id=qualify(alias, result["id"])) if result else result
+
+    def update_work_package(self, work_package_id, lock_version, subject=None, description=None, due_date=None, estimated_hours=None, status_id=None, expected=None):
+        alias, client, raw = self._route(work_package_id)
+        return client.update_work_package(raw, lock_version, subject=subject, description=description, due_date=due_date,
+                                          estimated_hours=estimated_hours, status_id=self._translate(alias, status_id, "get_statuses"),
+                                          expected=expected)
+
+    def close_task(self, work_package_id, lock_version, expected=None):
+        alias, client, raw = self._route(work_package_id)
+        return client.close_task(raw, lock_version, expected=expected)
+
+    def log_time(self, work_package_id, hours, comment="", progress=None, spent_on=None):
+        alias, client, raw = self._route(work_package_id)
+        return client.log_time(raw, hours, comment, progress=progress, spent_on=spent_on)
+
+    def uses_journal(self):
+        return all(client.uses_journal() for _, client in self.members())
+
+    def enqueue(self, op, **kwargs):
+        target = "work_package_id" if "work_package_id" in kwargs else "project_id"
+        alias, client, raw = self._route(kwargs[target])
+        kwargs[target] = raw
+        if kwargs.get("status_id") is not None:
+            kwargs["status_id"] = self._translate(alias, kwargs["status_id"], "get_statuses")
+        if kwargs.get("type_id") is not None:
+            kwargs["type_id"] = self._translate(alias, kwargs["type_id"], "get_types")
+        return client.enqueue(op, **kwargs)
+
+    def journal_items(self, limit=50):
+        items = [i for _, client in self.members() for i in client.journal_items(limit)]
+        return sorted(items, key=lambda i: i.created_at, reverse=True)[:limit]
+
+    def retry_intent(self, key):
+        for _, client in self.members():
+            if any(i.key == key for i in client.journal_items()):
+                client.retry_intent(key)
+                return
+
+    def discard_intent(self, key):
+        self.members()[0][1].discard_intent(key)
@@ -0,0 +1,80 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from collections import namedtuple
+
+# Validators plus the parsed result of a cached response. `result` is what the client built
+# from the payload (e.g. the projects list), so a 304 costs neither download nor parsing.
+CachedResponse = namedtuple("CachedResponse", ["etag", "last_modified", "result", "stored_at"])
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "openproject_agile", "http_cache.sqlite")
+
+
+class HttpCache:
+    """Small disk-backed (SQLite) store of response validators and parsed results; survives restarts."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body BLOB, stored_at REAL)"
+        )
+        os.chmod(path, 0o600)
+
+    @staticmethod
+    def make_key(scope, url, params=None):
+        return json.dumps([scope, url, sorted((params or {}).items())])
+
+    def get(self, key):
+        """Returns a CachedResponse, or None if nothing (readable) is stored under `key`."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT etag, last_modified, body, stored_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+            if row is None:
+                return None
+            result = json.loads(zlib.decompress(row[2]))
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            print(f"Error reading HTTP cache: {e}")
+            return None
+        return CachedResponse(row[0], row[1], result, row[3])
+
+    def put(self, key, etag, last_modified, result):
+        body = zlib.compress(json.dumps(result, separators=(",", ":")).encode("utf-8"))
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, etag, last_modified, body, stored_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, etag, last_modified, body, time.time()),
+                )
+        except sqlite3.Error as e:
+            print(f"Error writing HTTP cache: {e}")
+
+    def touch(self, key):
+        """Marks a cached response as revalidated now (after a 304)."""
+        try:
+            with self._lock:
+                self._conn.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            print(f"Error writing HTTP cache: {e}")
+
+    def delete(self, key):
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            print(f"Error writing HTTP cache: {e}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
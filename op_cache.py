@@ -0,0 +1,439 @@
+import threading
+import time
+from collections import namedtuple
+
+# value: cached data (None if nothing could be loaded), age: seconds since it was fetched,
+# stale: older than the freshness window, refreshing: a background refresh is running,
+# version: bumps every time a new value is stored.
+CachedResult = namedtuple("CachedResult", ["value", "age", "stale", "refreshing", "version"])
+
+
+class CircuitOpen(Exception):
+    """Raised when a call is refused because the upstream's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after repeated failures and probes it again after a cool-down."""
+
+    def __init__(self, failure_threshold=3, reset_after=30):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            # Half-open: let a single probe through once the cool-down has elapsed
+            if not self._probing and time.monotonic() - self._opened_at >= self.reset_after:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def call(self, fn, *args, **kwargs):
+        if not self.allow():
+            raise CircuitOpen("Circuit open: upstream marked as down.")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(upstream):
+    """Returns the process-wide circuit breaker for an upstream (e.g. a base URL)."""
+    with _breakers_lock:
+        if upstream not in _breakers:
+            _breakers[upstream] = CircuitBreaker()
+        return _breakers[upstream]
+
+
+def _is_row(row, row_id):
+    return isinstance(row, dict) and row.get("id") == row_id
+
+
+def _patched(rows, row_id, changes):
+    return [dict(r, **changes) if _is_row(r, row_id) else r for r in rows]
+
+
+def _replaced(rows, row_id, row):
+    # `row` in place of the row `row_id` (in front if there is none); row=None drops it
+    index = next((i for i, r in enumerate(rows) if _is_row(r, row_id)), 0)
+    rows = [r for r in rows if not _is_row(r, row_id)]
+    if row is not None:
+        rows.insert(index, row)
+    return rows
+
+
+class _Entry:
+    __slots__ = ("value", "fetched_at", "version", "must_revalidate", "seeded")
+
+    def __init__(self, value, fetched_at, version):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.version = version
+        self.must_revalidate = False
+        self.seeded = False
+
+
+class StaleWhileRevalidate:
+    """Serves the last good value immediately while a background thread refreshes it.
+
+    Values younger than `fresh_for` seconds are served as they are. Older ones are served
+    marked as stale, for at most `max_stale` seconds, while a refresh runs in the background.
+    Past `max_stale` (or after `invalidate`) the value is reloaded before being served.
+    Loads go through `breaker`, so a down upstream is not hammered with refreshes. Rows patched
+    while a background refresh runs are patched into its result as well, so it doesn't undo them.
+    """
+
+    def __init__(self, fresh_for=15, max_stale=900, breaker=None):
+        self.fresh_for = fresh_for
+        self.max_stale = max_stale
+        self.breaker = breaker or CircuitBreaker()
+        self._entries = {}
+        self._refreshing = set()
+        self._replay = {}  # key -> row edits made while it refreshes in the background (None: a value was put)
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, loader, force=False):
+        with self._lock:
+            entry = self._entries.get(key)
+        age = time.time() - entry.fetched_at if entry else None
+
+        expired = age is not None and age > self.max_stale and not entry.seeded
+        if entry is None or force or entry.must_revalidate or expired:
+            try:
+                entry = self._load(key, loader)
+                return CachedResult(entry.value, 0.0, False, False, entry.version)
+            except Exception as e:
+                print(f"Refresh of {key} failed: {e}")
+                if entry is not None and (age <= self.max_stale or entry.seeded):
+                    return CachedResult(entry.value, age, True, False, entry.version)
+                return CachedResult(None, None, True, False, 0)
+
+        if age > self.fresh_for:
+            refreshing = self._refresh_in_background(key, loader)
+            return CachedResult(entry.value, age, True, refreshing, entry.version)
+        return CachedResult(entry.value, age, False, key in self._refreshing, entry.version)
+
+    def version(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.version if entry else 0
+
+    def is_refreshing(self, key):
+        return key in self._refreshing
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def refresh(self, key, loader):
+        """Reloads `key` in the background now, whatever its age (e.g. the upstream reported a change).
+
+        The current value keeps being served until the new one lands. Returns False if the
+        breaker is open.
+        """
+        return self._refresh_in_background(key, loader)
+
+    def seed(self, key, value, fetched_at):
+        """Stores a value loaded elsewhere (e.g. a disk snapshot) unless the key is already cached.
+
+        Seeded values are served, marked stale, whatever their age until a refresh replaces them.
+        """
+        with self._lock:
+            if key in self._entries:
+                return False
+            self._version += 1
+            entry = _Entry(value, fetched_at, self._version)
+            entry.seeded = True
+            self._entries[key] = entry
+            return True
+
+    def row_count(self):
+        with self._lock:
+            return sum(len(e.value) for e in self._entries.values() if isinstance(e.value, list))
+
+    def peek(self, key):
+        """The cached value of `key` (or None) without loading or refreshing anything."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry else None
+
+    def find_row(self, row_id):
+        """Returns a copy of a cached row (dict) whose "id" is `row_id`, from the newest entry holding one."""
+        with self._lock:
+            for entry in sorted(self._entries.values(), key=lambda e: e.version, reverse=True):
+                if isinstance(entry.value, list):
+                    for row in entry.value:
+                        if isinstance(row, dict) and row.get("id") == row_id:
+                            return dict(row)
+        return None
+
+    def patch_rows(self, row_id, changes):
+        """Applies `changes` to every cached row whose "id" is `row_id` (e.g. with a write's response).
+
+        Copy-on-write: lists already handed out are left untouched. Returns the number of rows updated.
+        """
+        updated = 0
+        with self._lock:
+            for entry in self._entries.values():
+                if not isinstance(entry.value, list):
+                    continue
+                rows = _patched(entry.value, row_id, changes)
+                hits = sum(1 for old, new in zip(entry.value, rows) if old is not new)
+                if hits:
+                    self._version += 1
+                    entry.value, entry.version = rows, self._version
+                    updated += hits
+            for edits in self._replay.values():
+                if edits is not None:
+                    edits.append((_patched, row_id, changes))
+        return updated
+
+    def replace_row(self, key, row_id, row):
+        """Puts `row` in place of the row of `key` whose "id" is `row_id` (in front if there is none);
+        row=None drops it instead.
+
+        Copy-on-write, and the entry keeps its age. Returns False if `key` isn't cached or nothing changed.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not isinstance(entry.value, list):
+                return False
+            if row is None and not any(_is_row(r, row_id) for r in entry.value):
+                return False
+            self._version += 1
+            entry.value, entry.version = _replaced(entry.value, row_id, row), self._version
+            if self._replay.get(key) is not None:
+                self._replay[key].append((_replaced, row_id, row))
+            return True
+
+    def invalidate(self, key=None):
+        """Forces the next read of `key` (or of every key) to reload; the old value stays as fallback."""
+        with self._lock:
+            entries = self._entries.values() if key is None else [self._entries[key]] if key in self._entries else []
+            for entry in entries:
+                entry.must_revalidate = True
+
+    def put(self, key, value):
+        """Stores a value loaded outside get() (e.g. assembled from shards) as freshly fetched."""
+        with self._lock:
+            self._version += 1
+            entry = _Entry(value, time.time(), self._version)
+            self._entries[key] = entry
+            if key in self._replay:
+                self._replay[key] = None  # Newer than what the background refresh is loading
+        return entry
+
+    def _load(self, key, loader):
+        return self.put(key, self.breaker.call(loader))
+
+    def _refresh_in_background(self, key, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return True
+            if not self.breaker.allow():
+                return False
+            self._refreshing.add(key)
+            self._replay[key] = []
+
+        def run():
+            try:
+                # allow() above already admitted this call (it may be the half-open probe)
+                value = loader()
+            except Exception as e:
+                self.breaker.record_failure()
+                print(f"Background refresh of {key} failed: {e}")
+            else:
+                self.breaker.record_success()
+                with self._lock:
+                    edits = self._replay[key]
+                    if edits is not None:
+                        for edit, row_id, change in edits:
+                            value = edit(value, row_id, change) if isinstance(value, list) else value
+                        self._version += 1
+                        self._entries[key] = _Entry(value, time.time(), self._version)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+                    self._replay.pop(key, None)
+
+        threading.Thread(target=run, name=f"swr-refresh-{key}", daemon=True).start()
+        return True
+
+
+class WaitTimeout(Exception):
+    """Raised when waiting on an identical in-flight call takes longer than allowed."""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls: the first one runs, the others wait and share its outcome."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, timeout=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise WaitTimeout("Timed out waiting for an identical in-flight call.")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class TTLCache:
+    """Thread-safe key/value cache whose entries expire `ttl` seconds after being stored.
+
+    With `max_size`, the entries stored longest ago are dropped beyond that many.
+    """
+
+    def __init__(self, ttl=300, max_size=None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = {}  # key -> (value, stored at), oldest first
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        with self._lock:
+            hit = self._entries.get(key)
+        if hit is not None and time.time() - hit[1] < self.ttl:
+            return hit[0]
+        value = loader()
+        self._store({key: value})
+        return value
+
+    def get_many(self, keys, loader):
+        """{key: value} for `keys`; the missing or expired ones are loaded together with
+        `loader(missing keys)`, which returns a {key: value} dict."""
+        now = time.time()
+        with self._lock:
+            hits = {k: self._entries.get(k) for k in keys}
+        found = {k: hit[0] for k, hit in hits.items() if hit is not None and now - hit[1] < self.ttl}
+        missing = [k for k in keys if k not in found]
+        if missing:
+            loaded = loader(missing)
+            self._store(loaded)
+            found.update(loaded)
+        return found
+
+    def _store(self, values):
+        now = time.time()
+        with self._lock:
+            for key, value in values.items():
+                self._entries.pop(key, None)
+                self._entries[key] = (value, now)
+            while self.max_size is not None and len(self._entries) > self.max_size:
+                del self._entries[next(iter(self._entries))]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+class DayCache:
+    """Rows bucketed by day (ISO date string), filled one date range at a time.
+
+    A day that was loaded and had no rows is cached as an empty bucket, so it isn't fetched again.
+    """
+
+    def __init__(self):
+        self._days = {}
+        self._lock = threading.Lock()
+
+    def missing(self, days):
+        with self._lock:
+            return [d for d in days if d not in self._days]
+
+    def store(self, days, rows, day_of):
+        """Replaces the buckets of `days` with `rows`, grouped by `day_of(row)`."""
+        buckets = {d: [] for d in days}
+        for row in rows:
+            bucket = buckets.get(day_of(row))
+            if bucket is not None:
+                bucket.append(row)
+        with self._lock:
+            self._days.update(buckets)
+
+    def rows(self, days):
+        with self._lock:
+            return [row for d in days for row in self._days.get(d, ())]
+
+    def forget(self, days):
+        """Drops the buckets of `days` so that they are loaded again."""
+        with self._lock:
+            for d in days:
+                self._days.pop(d, None)
+
+    def row_count(self):
+        with self._lock:
+            return sum(len(rows) for rows in self._days.values())
+
+    def clear(self):
+        with self._lock:
+            self._days.clear()
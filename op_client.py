@@ -1,19 +1,431 @@
 import os
+import re
 import requests
+import urllib3
 import base64
 import json
-from datetime import datetime
-from dotenv import load_dotenv
+import time
+import hashlib
+import sqlite3
+import threading
+import importlib.util
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import functools
+import contextvars
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit
+from http_cache import HttpCache
+from dependency_graph import DependencyGraph
+from project_tree import project_paths
+from report_state import ReportState
+from search_index import SearchIndex
+from op_cache import CachedResult, DayCache, SingleFlight, StaleWhileRevalidate, TTLCache, WaitTimeout, breaker_for
+from throttle import HostThrottle, ThrottleTimeout, parse_retry_after
+from write_journal import FAILED, RETRY, SENT, UNCERTAIN, JournalFlusher, WriteJournal
+
+# Optional speed-ups: a faster JSON decoder and an incremental (streaming) JSON parser
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+_env_loaded = False
+
+
+def load_env():
+    """Loads a local .env into os.environ, once per process. Called on first use, not at import."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+# Per-call timeouts (seconds). The read timeout is further capped by the active deadline.
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 20
+
+# Instance-wide reference data and the fields kept from each element
+REFERENCE_FIELDS = {
+    "types": ("id", "name"),
+    "statuses": ("id", "name", "isClosed", "isDefault"),
+    "roles": ("id", "name"),
+}
+
+# Role granted when the user has to join a project to be assigned a task there
+MEMBER_ROLE_NAME = "Miembro"
+DEFAULT_MEMBER_ROLE_ID = 3
+
+# Name hints used only when the server's status metadata (isClosed) can't be loaded
+CLOSED_NAME_HINTS = ("close", "cerrad", "finaliza", "done", "reject", "rechaz")
+# Statuses close_task prefers, in order (see _find_closed_status_id)
+CLOSE_STATUS_NAMES = ("Closed", "Cerrado", "Done", "Finalizado")
+
+# Page size for collections loaded page by page (the server may cap it lower)
+TIME_ENTRIES_PAGE_SIZE = 500
+WORK_PACKAGES_PAGE_SIZE = 500
+RELATIONS_PAGE_SIZE = 1000
+MEMBERSHIPS_PAGE_SIZE = 1000
+# Work package ids per id-filtered query (keeps the URL short)
+ID_FILTER_CHUNK = 100
+
+# Rough in-memory footprint of one cached task/project row, used for the client pool memory cap
+APPROX_ROW_BYTES = 1024
+
+# Writes that can be queued in the write-behind journal (see OpenProjectClient.enqueue)
+JOURNALED_OPS = ("create_work_package", "log_time", "update_work_package", "close_task")
+
+# Process-wide: identical reads in flight (across sessions) share one request
+_inflight = SingleFlight()
+# Process-wide objects configured from the environment, built on first use (after load_env)
+_singletons = {}
+_singletons_lock = threading.RLock()
+
+
+def _singleton(name, factory):
+    with _singletons_lock:
+        if name not in _singletons:
+            load_env()
+            _singletons[name] = factory()
+        return _singletons[name]
+
+
+_pool_worker = threading.local()
+
+
+def _mark_pool_worker():
+    _pool_worker.active = True
+
+
+def _new_executor(max_workers, prefix="op-client"):
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=prefix, initializer=_mark_pool_worker)
+
+
+def _get_executor():
+    # Worker threads for independent calls issued in parallel (see run_concurrently)
+    return _singleton("executor", lambda: _new_executor(int(os.getenv("OP_MAX_WORKERS", "16"))))
+
+
+def _get_reference_cache():
+    # Reference data shared by all credentials of the same instance, keyed by (base_url, endpoint)
+    return _singleton("reference_cache", lambda: TTLCache(ttl=float(os.getenv("OP_REFERENCE_TTL", "300"))))
+
+
+def _get_member_roles():
+    # Resolved "Miembro" role id per instance (base_url), shared by every client of that instance
+    return _singleton("member_roles", dict)
+
+
+def _get_throttle(base_url):
+    # Process-wide request governor per upstream host (OP_THROTTLE=0 disables it)
+    host = urlsplit(base_url or "").netloc
+
+    def build():
+        if os.getenv("OP_THROTTLE", "1") != "1":
+            return None
+        rate = float(os.getenv("OP_RATE_LIMIT", "20"))
+        return HostThrottle(
+            rate=rate,
+            burst=float(os.getenv("OP_RATE_BURST", rate)),
+            max_in_flight=int(os.getenv("OP_MAX_IN_FLIGHT", "8")),
+            target_latency=float(os.getenv("OP_LATENCY_TARGET", "3")),
+        )
+    return _singleton(("throttle", host), build)
+
+
+def _get_http_cache():
+    # Disk store of ETag/Last-Modified validators for conditional GETs; None if disabled or unusable
+    def build():
+        if os.getenv("OP_HTTP_CACHE", "1") != "1":
+            return None
+        path = os.getenv("OP_HTTP_CACHE_PATH") or os.path.join(
+            os.path.expanduser("~"), ".cache", "openproject_agile", "http_cache.sqlite")
+        try:
+            return HttpCache(path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"HTTP cache disabled: {e}")
+            return None
+    return _singleton("http_cache", build)
+
+
+def _get_write_journal():
+    # Durable queue of write intents; opt-in (OP_WRITE_JOURNAL=1), None if disabled or unusable
+    def build():
+        if os.getenv("OP_WRITE_JOURNAL", "0") != "1":
+            return None
+        path = os.getenv("OP_WRITE_JOURNAL_PATH") or os.path.join(
+            os.path.expanduser("~"), ".cache", "openproject_agile", "write_journal.sqlite")
+        try:
+            return WriteJournal(path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Write journal disabled: {e}")
+            return None
+    return _singleton("write_journal", build)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call is attempted after the active deadline has passed."""
+
+
+class UpstreamError(Exception):
+    """Raised when OpenProject answers a read with a non-200 status."""
+
+    def __init__(self, status_code, text=""):
+        super().__init__(f"{status_code} - {text[:200]}")
+        self.status_code = status_code
+
+
+class _Collection(list):
+    """Elements of a paginated collection. complete is False when fewer distinct elements came
+    back than the server announced, i.e. the collection shifted between pages."""
+
+    def __init__(self, elements=(), complete=True):
+        super().__init__(elements)
+        self.complete = complete
+
+
+class Deadline:
+    """Time budget shared by every client call made while it is active."""
+
+    def __init__(self, seconds, parent=None):
+        self.expires_at = time.monotonic() + seconds
+        if parent is not None:
+            self.expires_at = min(self.expires_at, parent.expires_at)
+        self.parent = parent
+        self.degraded = []  # Names of reads that fell back to cached data
+
+    def remaining(self):
+        return self.expires_at - time.monotonic()
+
+    def note_degraded(self, name):
+        d = self
+        while d is not None:
+            if name not in d.degraded:
+                d.degraded.append(name)
+            d = d.parent
+
+
+_current_deadline = contextvars.ContextVar("op_deadline", default=None)
+# Idempotency key of the journaled intent being sent, forwarded on its writes
+_idempotency_key = contextvars.ContextVar("op_idempotency_key", default=None)
+# Status of each write of that intent, in order (None while it is in flight)
+_intent_writes = contextvars.ContextVar("op_intent_writes", default=None)
+
+
+def _failed_to_connect(error):
+    """Whether a requests.ConnectionError happened before any byte of the request was sent
+    (connect timeout, connection refused, unknown host)."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+
+@contextmanager
+def deadline(seconds):
+    """Bounds all client calls made inside the block (e.g. one page render) to `seconds` in total."""
+    budget = Deadline(seconds, parent=_current_deadline.get())
+    token = _current_deadline.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline():
+    return _current_deadline.get()
+
+
+def _submit_all(calls):
+    """Futures of `calls`, each run under a copy of the caller's context (deadline included).
+
+    Calls issued from a pool worker (a fan-out nested in another one) get threads of their own:
+    queued behind the shared pool, whose workers may all be waiting on them, they'd never run.
+    Those threads are capped at OP_MAX_IN_FLIGHT, as more would only wait on the host throttle.
+    """
+    nested = getattr(_pool_worker, "active", False)
+    if nested:
+        workers = min(len(calls), int(os.getenv("OP_MAX_IN_FLIGHT", "8")))
+        executor = _new_executor(max(workers, 1), "op-client-nested")
+    else:
+        executor = _get_executor()
+    futures = [executor.submit(contextvars.copy_context().run, fn) for fn in calls]
+    if nested:
+        executor.shutdown(wait=False) # Submitted calls still run; the threads exit when done
+    return futures
+
+
+def run_concurrently(*calls):
+    """Runs independent client calls in parallel under the caller's deadline; returns their results in order."""
+    return [f.result() for f in _submit_all(calls)]
+
+
+def iter_concurrently(*calls):
+    """Like run_concurrently, but yields (index, result) pairs as each call completes."""
+    futures = {future: i for i, future in enumerate(_submit_all(calls))}
+    try:
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # Consumer gone (or a shard failed): don't start the calls still queued
+        for future in futures:
+            future.cancel()
+
+
+def _serves_last_good(default=None):
+    """Read decorator: on timeout, connection error or expired deadline, returns the last good result."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            try:
+                result = method(self, *args, **kwargs)
+            except (requests.RequestException, DeadlineExceeded) as e:
+                print(f"{method.__name__} degraded to cached data: {e}")
+                budget = _current_deadline.get()
+                if budget is not None:
+                    budget.note_degraded(method.__name__)
+                cached = self._last_good.get(key)
+                return cached if cached is not None else (default() if callable(default) else default)
+            # Don't let an error page (empty result) overwrite good data
+            if result:
+                with self._lock:
+                    self._last_good[key] = result
+            return result
+        return wrapper
+    return decorator
+
+
+def _accept_encoding():
+    """Content codings we can decode: gzip/deflate always, br and zstd when their decoders are installed."""
+    encodings = ["gzip", "deflate"]
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+        encodings.append("br")
+    if importlib.util.find_spec("zstandard"):
+        encodings.append("zstd")
+    return ", ".join(encodings)
+
+
+def is_closed_name(status_name):
+    """Name-based fallback for 'is this status closed?' when isClosed metadata is unavailable."""
+    name = (status_name or "").lower()
+    return any(hint in name for hint in CLOSED_NAME_HINTS)
+
+
+def _id_from_href(href):
+    # href example: /api/v3/statuses/12
+    try:
+        return int(href.split("/")[-1])
+    except (AttributeError, ValueError):
+        return None
+
+
+_DURATION_RE = re.compile(r"P(?:(?P<d>[\d.]+)D)?(?:T(?:(?P<h>[\d.]+)H)?(?:(?P<m>[\d.]+)M)?(?:(?P<s>[\d.]+)S)?)?$")
+
+
+def _iso_hours(duration):
+    """ISO 8601 duration (e.g. 'PT2H30M') -> hours, rounded to 2 decimals; None if absent or unparsable."""
+    match = _DURATION_RE.match(duration or "")
+    if not duration or not match:
+        return None
+    parts = {k: float(v) if v else 0.0 for k, v in match.groupdict().items()}
+    return round(parts["d"] * 24 + parts["h"] + parts["m"] / 60 + parts["s"] / 3600, 2)
+
+
+# Fields the conflict-aware update compares and re-applies, keyed as in the task rows
+WP_FIELDS = ("subject", "description", "dueDate", "estimatedTime", "progress", "status_id")
+
+
+def _wp_state(el):
+    """Comparable field values of a work package representation (see WP_FIELDS)."""
+    return {
+        "subject": el.get("subject"),
+        "description": (el.get("description") or {}).get("raw"),
+        "dueDate": el.get("dueDate"),
+        "estimatedTime": _iso_hours(el.get("estimatedTime")),
+        "progress": el.get("percentageDone") or 0,
+        "status_id": _id_from_href(el.get("_links", {}).get("status", {}).get("href")),
+    }
+
+
+def _task_state(task):
+    """Comparable field values of a cached task row (tasks don't carry the description)."""
+    return {
+        "subject": task.get("subject"),
+        "dueDate": task.get("dueDate"),
+        "estimatedTime": _iso_hours(task.get("estimatedTime")),
+        "progress": task.get("progress") or 0,
+        "status_id": task.get("status_id"),
+    }
+
+
+def _wp_payload(lock_version, fields):
+    """PATCH body setting `fields` (keyed as in WP_FIELDS)."""
+    payload = {"lockVersion": int(lock_version)}
+    for field, value in fields.items():
+        if field == "description":
+            payload["description"] = {"format": "markdown", "raw": value}
+        elif field == "estimatedTime":
+            payload["estimatedTime"] = f"PT{value}H" if value is not None else None
+        elif field == "progress":
+            payload["percentageDone"] = int(value)
+        elif field == "status_id":
+            payload.setdefault("_links", {})["status"] = {"href": f"/api/v3/statuses/{value}"}
+        else:
+            payload[field] = value
+    return payload
+
+
+def _coalesced(shared=False):
+    """Read decorator: concurrent identical calls (same endpoint, params and credentials) share one request.
+
+    With shared=True the credentials are left out of the key, for data that is the same for every user.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            scope = None if shared else self._scope
+            key = (self.base_url, scope, method.__name__, args, tuple(sorted(kwargs.items())))
+            budget = _current_deadline.get()
+            timeout = max(budget.remaining(), 0) if budget is not None else None
+            try:
+                return _inflight.do(key, lambda: method(self, *args, **kwargs), timeout=timeout)
+            except WaitTimeout as e:
+                raise DeadlineExceeded(str(e))
+        return wrapper
+    return decorator
+
+
+def _fails_on_timeout(failure):
+    """Write decorator: turns a timeout, connection error or expired deadline into the method's failure value."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            except (requests.RequestException, DeadlineExceeded) as e:
+                print(f"{method.__name__} aborted: {e}")
+                return failure(e) if callable(failure) else failure
+        return wrapper
+    return decorator
 
-load_dotenv()
 
 class OpenProjectClient:
     def __init__(self, api_key=None, url=None):
+        load_env()
         self.base_url = url or os.getenv("OP_BASE_URL")
         self.api_key = api_key or os.getenv("OP_API_KEY")
         
         self.start_error = None
         self.auth_header = None
+        self.connect_timeout = float(os.getenv("OP_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT))
+        self.read_timeout = float(os.getenv("OP_READ_TIMEOUT", DEFAULT_READ_TIMEOUT))
 
         if not self.base_url or not self.api_key:
             self.start_error = "Credentials incomplete. Please log in."
@@ -28,6 +440,146 @@ class OpenProjectClient:
                 "Content-Type": "application/json"
             }
 
+        # The client is shared by every Streamlit session (thread) using the same credentials:
+        # memoized state below is only mutated under this lock. The session's connection pool
+        # is thread-safe; its headers are never mutated after construction.
+        self._lock = threading.RLock()
+        self._session = requests.Session()
+        self._session.headers["Accept-Encoding"] = _accept_encoding()
+        # Incremental parsing of large collections (needs ijson); otherwise bodies are decoded in one go
+        self.stream_json = os.getenv("OP_STREAM_JSON", "1") == "1" and ijson is not None
+        # Credential scope for shared keys, without keeping the raw key around in them
+        self._scope = hashlib.sha256(self.api_key.encode()).hexdigest()[:16] if self.api_key else None
+        self._me = None
+        self._member_projects = None  # Project ids where the user is a member, loaded once
+        self._memberships_denied = False
+        self._report_state = None  # Accumulators of the all-assignees dataset (see _sync_all_tasks)
+        self._dependency_graph = None  # (relations cache version, DependencyGraph)
+        self._search_indexes = {}  # name -> (dataset version, SearchIndex)
+        self._tasks_watermark = None
+        self._last_full_sync = 0.0
+        self._flusher = None
+        self._last_good = {}  # Last successful result per read call, served when upstream is slow
+        # Stale-while-revalidate store for the task datasets (Kanban / Reports)
+        self.task_cache = StaleWhileRevalidate(
+            fresh_for=float(os.getenv("OP_SWR_FRESH_FOR", "15")),
+            max_stale=float(os.getenv("OP_SWR_MAX_STALE", "900")),
+            breaker=breaker_for(self.base_url),
+        )
+        # Time entries by spentOn day, loaded incrementally (see get_time_entries)
+        self.time_entries = DayCache()
+        # Open/closed state of single work packages (blockers), bounded in time and size
+        self.open_states = TTLCache(ttl=float(os.getenv("OP_SWR_FRESH_FOR", "15")),
+                                    max_size=int(os.getenv("OP_OPEN_STATES_MAX", "5000")))
+        # Intents queued by a previous run are sent as soon as these credentials are used again
+        journal = _get_write_journal() if self.is_configured() else None
+        if journal is not None and journal.has_pending(self._journal_scope()):
+            self._start_flusher()
+
+    def seed_from_snapshot(self, snapshot):
+        """Pre-fills the Kanban datasets from a disk snapshot (see snapshot.py) unless fresher data is cached."""
+        self.task_cache.seed(("my_tasks",), snapshot["tasks"], snapshot["saved_at"])
+        self.task_cache.seed(("projects",), snapshot["projects"], snapshot["saved_at"])
+
+    def close(self):
+        """Closes pooled connections and stops the journal flusher. The client stays usable."""
+        with self._lock:
+            flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            flusher.stop()
+        self._session.close()
+
+    # --- Write-behind journal ---
+
+    def uses_journal(self):
+        return self.is_configured() and _get_write_journal() is not None
+
+    def _journal_scope(self):
+        # Intents are bound to instance + credentials, without storing either in clear
+        return hashlib.sha256(f"{self.base_url}|{self._scope}".encode()).hexdigest()[:16]
+
+    def enqueue(self, op, **kwargs):
+        """Appends a write intent (one of JOURNALED_OPS) to the durable journal and returns its
+        idempotency key immediately; a background flusher sends it. Requires uses_journal()."""
+        if op not in JOURNALED_OPS:
+            raise ValueError(f"Operation can't be journaled: {op}")
+        if op in ("update_work_package", "close_task") and kwargs.get("expected") is None:
+            # Record what the edit was based on now: by flush time the cache may hold newer rows
+            cached = self.task_cache.find_row(int(kwargs["work_package_id"]))
+            if cached is not None and cached["lock_version"] == int(kwargs["lock_version"]):
+                kwargs["expected"] = _task_state(cached)
+        key = _get_write_journal().append(self._journal_scope(), op, kwargs)
+        self._start_flusher().wake()
+        return key
+
+    def journal_items(self, limit=50):
+        """Most recent intents of these credentials (write_journal.JournalItem), newest first."""
+        journal = _get_write_journal()
+        return journal.items(self._journal_scope(), limit) if journal is not None else []
+
+    def retry_intent(self, key):
+        _get_write_journal().requeue(key)
+        self._start_flusher().wake()
+
+    def discard_intent(self, key):
+        _get_write_journal().discard(key)
+
+    def _start_flusher(self):
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = JournalFlusher(
+                    _get_write_journal(), self._journal_scope(), self._send_intent,
+                    batch_size=int(os.getenv("OP_JOURNAL_BATCH", "20")),
+                    interval=float(os.getenv("OP_JOURNAL_INTERVAL", "5")),
+                    max_attempts=int(os.getenv("OP_JOURNAL_MAX_ATTEMPTS", "5")),
+                    prepare=self._prepare_intents,
+                )
+            return self._flusher
+
+    def _prepare_intents(self, items):
+        # Bulk capture: join every project the queued creations target in one batch up front
+        self.ensure_memberships({item.args["project_id"] for item in items if item.op == "create_work_package"})
+
+    def _send_intent(self, item):
+        """Sends one journaled intent. Returns (SENT, result), (RETRY, error), (FAILED, error) or
+        (UNCERTAIN, error).
+
+        OpenProject ignores the Idempotency-Key, so only failures that can't have reached it are
+        retried: no write sent yet, or the connection couldn't be opened. A connection lost while a
+        write was in flight is uncertain; a read timeout propagates and the flusher marks it so too.
+        A write rejected with a 4xx fails at once, as replaying it would be rejected again.
+        """
+        # The undecorated method: timeouts must reach us instead of becoming a failure value
+        method = getattr(OpenProjectClient, item.op).__wrapped__
+        writes = []
+        tokens = _idempotency_key.set(item.key), _intent_writes.set(writes)
+        try:
+            result = method(self, **item.args)
+        except DeadlineExceeded as e:
+            return RETRY, str(e)  # Raised before sending
+        except requests.ConnectionError as e:
+            if writes and writes[-1] is None and not _failed_to_connect(e):
+                return UNCERTAIN, str(e)
+            return RETRY, str(e)
+        finally:
+            _idempotency_key.reset(tokens[0])
+            _intent_writes.reset(tokens[1])
+        status = writes[-1] if writes else None
+        failure = FAILED if status is not None and 400 <= status < 500 and status not in (408, 429) else RETRY
+        if item.op == "log_time":
+            success, msg = result
+            return (SENT, None) if success else (failure, msg)
+        if item.op == "create_work_package":
+            return (SENT, {"id": result["id"]}) if result else (failure, "OpenProject rechazó la creación")
+        return (SENT, None) if result else (failure, "OpenProject rechazó la actualización")
+
+    def approx_memory(self):
+        """Rough size in bytes of the data memoized by this client (rows x an average row size)."""
+        with self._lock:
+            rows = sum(len(v) for v in self._last_good.values() if isinstance(v, list))
+        rows += self.task_cache.row_count() + self.time_entries.row_count()
+        return rows * APPROX_ROW_BYTES
+
     def validate_login(self):
         """Checks if current credentials are valid by fetching 'me'."""
         if self.start_error: return False
@@ -37,57 +589,251 @@ class OpenProjectClient:
     def _get_headers(self):
         return self.auth_header
 
+    def _request(self, method, url, headers=None, **kwargs):
+        """Sends a request bounded by the per-call timeouts and the active deadline.
+
+        Requests to the same host share a process-wide throttle (see throttle.HostThrottle); waiting
+        for a slot counts against the deadline. The slot is held until the response headers arrive,
+        which is where OpenProject does its work.
+        """
+        budget = _current_deadline.get()
+        if budget is not None and budget.remaining() <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded before {method} {url}")
+        idempotency_key = _idempotency_key.get()
+        if idempotency_key is not None and method != "GET":
+            # One stable key per (intent, request): an intent may issue several writes (e.g. auto-join)
+            request_key = hashlib.sha256(f"{idempotency_key}|{method}|{url}".encode()).hexdigest()[:32]
+            headers = {**(headers or {}), "Idempotency-Key": request_key}
+        if headers:
+            headers = {**self._get_headers(), **headers}
+        else:
+            headers = self._get_headers()
+
+        throttle = _get_throttle(self.base_url)
+        if throttle is None:
+            return self._send(method, url, headers, budget, **kwargs)
+        wait = self.read_timeout if budget is None else budget.remaining()
+        try:
+            with throttle.slot(timeout=wait) as report:
+                start = time.monotonic()
+                response = self._send(method, url, headers, budget, **kwargs)
+                report(response.status_code, time.monotonic() - start, parse_retry_after(response.headers.get("Retry-After")))
+                return response
+        except ThrottleTimeout as e:
+            raise DeadlineExceeded(f"{e} for {method} {url}")
+
+    def _send(self, method, url, headers, budget, **kwargs):
+        connect_timeout, read_timeout = self.connect_timeout, self.read_timeout
+        if budget is not None:
+            remaining = budget.remaining()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"Deadline exceeded before {method} {url}")
+            connect_timeout = min(connect_timeout, remaining)
+            read_timeout = min(read_timeout, remaining)
+        writes = _intent_writes.get() if method != "GET" else None
+        if writes is not None:
+            writes.append(None)
+        response = self._session.request(method, url, headers=headers, timeout=(connect_timeout, read_timeout), **kwargs)
+        if writes is not None:
+            writes[-1] = response.status_code
+        return response
+
+    def _get_elements(self, url, params=None):
+        """GETs a HAL collection and yields its _embedded.elements one at a time.
+
+        Raises UpstreamError on a non-200 response. In streaming mode the elements are parsed
+        incrementally from the decompressed socket stream, so the full JSON tree is never held
+        in memory and the deadline is re-checked while reading.
+        """
+        response = self._request("GET", url, params=params, stream=self.stream_json)
+        try:
+            if response.status_code != 200:
+                raise UpstreamError(response.status_code, response.text)
+            yield from self._iter_elements(response, url)
+        finally:
+            response.close()
+
+    def _iter_elements(self, response, url):
+        if not self.stream_json:
+            yield from _json_loads(response.content).get("_embedded", {}).get("elements", [])
+            return
+        response.raw.decode_content = True
+        budget = _current_deadline.get()
+        for i, element in enumerate(ijson.items(response.raw, "_embedded.elements.item", use_float=True)):
+            if budget is not None and i % 100 == 99 and budget.remaining() <= 0:
+                raise DeadlineExceeded(f"Deadline exceeded while reading {url}")
+            yield element
+
+    def _get_validated(self, url, build, shared=False):
+        """Conditional GET of a HAL collection, revalidated against the disk HTTP cache.
+
+        `build` turns the yielded elements into the result (a JSON-serializable list). When the
+        server sent an ETag or Last-Modified, the result is stored with them; later calls send
+        If-None-Match / If-Modified-Since and a 304 returns the stored result without downloading
+        or parsing the collection again. `shared` results (instance-wide reference data) are
+        keyed without the credential scope.
+        """
+        cache = _get_http_cache()
+        if cache is None:
+            return build(self._get_elements(url))
+        key = HttpCache.make_key(None if shared else self._scope, url)
+        cached = cache.get(key)
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        response = self._request("GET", url, headers=headers, stream=self.stream_json)
+        try:
+            if response.status_code == 304 and cached is not None:
+                cache.touch(key)
+                return cached.result
+            if response.status_code != 200:
+                raise UpstreamError(response.status_code, response.text)
+            result = build(self._iter_elements(response, url))
+            etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        finally:
+            response.close()
+        if etag or last_modified:
+            cache.put(key, etag, last_modified, result)
+        elif cached is not None:
+            cache.delete(key)
+        return result
+
+    def _get_all_pages(self, url, params, page_size):
+        """Loads every element of a paginated collection.
+
+        The first page gives the total; the remaining pages are then fetched concurrently.
+        """
+        params = {**params, "pageSize": page_size, "offset": 1}
+        response = self._request("GET", url, params=params)
+        try:
+            if response.status_code != 200:
+                raise UpstreamError(response.status_code, response.text)
+            data = _json_loads(response.content)
+        finally:
+            response.close()
+        elements = data.get("_embedded", {}).get("elements", [])
+        page_size = data.get("pageSize") or page_size  # The server may cap the page size
+        pages = -(-data.get("total", len(elements)) // page_size)
+        rest = run_concurrently(*[
+            functools.partial(lambda offset: list(self._get_elements(url, {**params, "pageSize": page_size, "offset": offset})), n)
+            for n in range(2, pages + 1)
+        ])
+        for page in rest:
+            elements.extend(page)
+        # Offset pages of a changing collection can overlap: keep the first copy of each element
+        seen, unique = set(), []
+        for el in elements:
+            if el.get("id") is not None:
+                if el["id"] in seen:
+                    continue
+                seen.add(el["id"])
+            unique.append(el)
+        return _Collection(unique, complete=len(unique) >= data.get("total", len(elements)))
+
     def is_configured(self):
         return self.start_error is None
 
+    @property
+    def scope(self):
+        """Fingerprint of the credentials (not the key itself), e.g. to key per-user memos in a session."""
+        return self._scope
+
+    @_serves_last_good(None)
+    @_coalesced()
     def get_me(self):
         """Fetches the current user."""
         if not self.is_configured(): return None
         # Simple caching
-        if hasattr(self, '_me'): return self._me
+        with self._lock:
+            if self._me is not None: return self._me
         
         url = f"{self.base_url}/api/v3/users/me"
-        response = requests.get(url, headers=self._get_headers())
+        response = self._request("GET", url)
         if response.status_code == 200:
-            self._me = response.json()
-            return self._me
+            me = _json_loads(response.content)
+            with self._lock:
+                self._me = me
+            return me
         return None
 
+    @_serves_last_good(list)
     def get_projects(self):
         """Fetches all available projects with parent info."""
         if not self.is_configured(): return []
-        url = f"{self.base_url}/api/v3/projects"
-        response = requests.get(url, headers=self._get_headers())
-        if response.status_code == 200:
-            data = response.json()
-            projects = []
-            for p in data.get("_embedded", {}).get("elements", []):
-                parent_data = p.get("_links", {}).get("parent")
-                parent_id = None
-                if parent_data:
-                    # href example: /api/v3/projects/123
-                    try:
-                        parent_id = int(parent_data["href"].split("/")[-1])
-                    except:
-                        pass
-                
-                projects.append({
-                    "id": p["id"], 
-                    "name": p["name"],
-                    "parent_id": parent_id
-                })
-            return projects
-        return []
+        try:
+            return self._fetch_projects()
+        except UpstreamError as e:
+            print(f"Error fetching projects: {e}")
+            return []
+
+    def get_projects_cached(self, force=False):
+        """Stale-while-revalidate variant of get_projects. Returns an op_cache.CachedResult."""
+        if not self.is_configured(): return CachedResult([], None, False, False, 0)
+        return self.task_cache.get(("projects",), self._fetch_projects, force=force)
+
+    def project_index(self):
+        """SearchIndex over project names and paths ("Root › Child"), keyed by project id."""
+        cached = self.get_projects_cached()
+        def docs():
+            for pid, (_, path) in project_paths(cached.value or []).items():
+                yield pid, path, path
+        return self._search_index("projects", cached.version, docs)
+
+    def task_index(self, cache_key=("my_tasks",)):
+        """SearchIndex over the ids and subjects of a cached task list (default: my open tasks)."""
+        version = self.task_cache.version(cache_key)
+        def docs():
+            for t in self.task_cache.peek(cache_key) or []:
+                yield t["id"], f"#{t['id']} · {t['subject']}", f"{t['id']} {t['subject']} {t.get('project_name') or ''}"
+        return self._search_index(cache_key, version, docs)
 
+    def _search_index(self, name, version, docs):
+        # Rebuilt per dataset version, incrementally: only added/changed/removed documents are re-indexed
+        with self._lock:
+            entry = self._search_indexes.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        index = entry[1] if entry is not None else SearchIndex()
+        index.sync(docs())
+        with self._lock:
+            self._search_indexes[name] = (version, index)
+        return index
+
+    @_coalesced()
+    def _fetch_projects(self):
+        """Loads all visible projects. Raises UpstreamError on a non-200 response."""
+        return self._get_validated(f"{self.base_url}/api/v3/projects", self._build_projects)
+
+    @staticmethod
+    def _build_projects(elements):
+        projects = []
+        for p in elements:
+            parent_data = p.get("_links", {}).get("parent")
+            parent_id = None
+            if parent_data:
+                # href example: /api/v3/projects/123
+                try:
+                    parent_id = int(parent_data["href"].split("/")[-1])
+                except:
+                    pass
+            
+            projects.append({
+                "id": p["id"], 
+                "name": p["name"],
+                "parent_id": parent_id
+            })
+        return projects
+
+    @_serves_last_good(list)
     def get_types(self):
         """Fetches available work package types (e.g., Task, Bug, Phase)."""
         if not self.is_configured(): return []
-        url = f"{self.base_url}/api/v3/types"
-        response = requests.get(url, headers=self._get_headers())
-        if response.status_code == 200:
-             return [{"id": t["id"], "name": t["name"]} for t in response.json().get("_embedded", {}).get("elements", [])]
-        return []
+        return self._get_reference("types")
 
+    @_fails_on_timeout(None)
     def create_work_package(self, project_id, subject, type_id, estimated_hours=None, description=None, due_date=None, retry=True):
         """Creates a new work package."""
         if not self.is_configured(): return None
@@ -117,9 +863,14 @@ class OpenProjectClient:
         if description:
              payload["description"] = {"format": "markdown", "raw": description}
 
-        response = requests.post(url, headers=self._get_headers(), json=payload)
+        # Join first if the membership index says we aren't a member (avoids a failed write)
+        if retry:
+            self.ensure_memberships([project_id])
+
+        response = self._request("POST", url, json=payload)
         
         if response.status_code in [200, 201]:
+            self.task_cache.invalidate()
             return response.json()
         elif response.status_code == 404:
              print(f"404 Error: Project or Type not found. ProjectID: {project_id}, TypeID: {type_id}")
@@ -137,21 +888,9 @@ class OpenProjectClient:
                      
                      print("User is not a member of the project. Attempting to join...")
                      
-                     # 1. Get Me ID
+                     # The membership index was stale (or couldn't be loaded): join now and retry once
                      if me:
-                         user_id = me["id"]
-                         
-                         # 2. Add as member (Role ID 3 = Miembro by default)
-                         # We could fetch roles to find "Miembro", but ID 3 is fairly standard. 
-                         # Let's try to be robust and find "Miembro" or fallback to 3.
-                         role_id = 3
-                         roles = self.get_roles()
-                         for r in roles:
-                             if r["name"] == "Miembro":
-                                 role_id = r["id"]
-                                 break
-                         
-                         if self.add_member(project_id, user_id, role_id):
+                         if self.add_member(project_id, me["id"], self.get_member_role_id()):
                              print("Successfully joined project. Retrying creation...")
                              return self.create_work_package(project_id, subject, type_id, estimated_hours, description, due_date, retry=False)
                          else:
@@ -165,69 +904,54 @@ class OpenProjectClient:
 
 
 
-    def update_work_package(self, work_package_id, lock_version, subject=None, description=None, due_date=None, estimated_hours=None, status_id=None):
-        """Updates an existing work package."""
+    @_fails_on_timeout(False)
+    def update_work_package(self, work_package_id, lock_version, subject=None, description=None, due_date=None, estimated_hours=None, status_id=None, expected=None):
+        """Updates an existing work package, merging concurrent edits that don't collide (see _patch_work_package)."""
         if not self.is_configured(): return False
-        url = f"{self.base_url}/api/v3/work_packages/{work_package_id}"
-        
-        payload = {
-            "lockVersion": int(lock_version),
-            "_links": {}
-        }
-        
+        changes = {}
         if subject:
-            payload["subject"] = subject
-            
+            changes["subject"] = subject
         if description:
-            payload["description"] = {"format": "markdown", "raw": description}
-            
+            changes["description"] = description
         if due_date:
-            payload["dueDate"] = due_date
-            
+            changes["dueDate"] = due_date
         if estimated_hours is not None:
-             payload["estimatedTime"] = f"PT{estimated_hours}H"
-             
+            changes["estimatedTime"] = round(float(estimated_hours), 2)
         if status_id:
-            payload["_links"]["status"] = {"href": f"/api/v3/statuses/{status_id}"}
-
-        # Remove _links if empty
-        if not payload["_links"]:
-            del payload["_links"]
-
-        response = requests.patch(url, headers=self._get_headers(), json=payload)
-        
-        if response.status_code == 200:
-            return True
-        else:
-            print(f"Error updating WP {work_package_id}: {response.status_code} - {response.text}")
-            return False
+            changes["status_id"] = int(status_id)
+        return self._patch_work_package(work_package_id, lock_version, changes, expected)
 
+    @_serves_last_good(list)
     def get_statuses(self):
         """Fetches all available statuses."""
         if not self.is_configured(): return []
-        url = f"{self.base_url}/api/v3/statuses"
-        response = requests.get(url, headers=self._get_headers())
-        if response.status_code == 200:
-             return [{"id": s["id"], "name": s["name"]} for s in response.json().get("_embedded", {}).get("elements", [])]
-        return []
+        return self._get_reference("statuses")
 
+    @_serves_last_good(list)
     def get_my_tasks(self):
         """Fetches tasks assigned to 'me' that are open."""
         if not self.is_configured(): return []
-        
+        try:
+            return self._fetch_my_tasks()
+        except UpstreamError as e:
+            print(f"Error fetching my tasks: {e}")
+            return []
+
+    def get_my_tasks_cached(self, force=False):
+        """Stale-while-revalidate variant of get_my_tasks. Returns an op_cache.CachedResult."""
+        if not self.is_configured(): return CachedResult([], None, False, False, 0)
+        return self.task_cache.get(("my_tasks",), self._fetch_my_tasks, force=force)
+
+    @_coalesced()
+    def _fetch_my_tasks(self):
+        """Loads open tasks assigned to 'me'. Raises UpstreamError on a non-200 response."""
         # Filter: assignee=me AND status=open
-        # "open" is a status category. 
+        # Operator "o" matches every status the server does not flag as isClosed.
         filters = [
             {"assignee": {"operator": "=", "values": ["me"]}},
-             # Verify if we can filter by status category via API directly, simplified for now:
-             # We fetch all assigned to me and filter manually if API filter is complex to guess without inspecting headers.
-             # But 'status' filter usually expects status IDs. 
-             # Let's try to omit status filter and filter in python if needed, or use a common guess.
-             # Better: OP API supports filtering by status *category*? Not easily.
-             # Let's stick to just assignee=me and sort by updated.
+            {"status": {"operator": "o", "values": []}},
         ]
-        # Adding status filter often requires knowing status IDs. 
-        # For 'open', we often just want everything not closed.
+        closed_ids = self.get_closed_status_ids()
         
         url = f"{self.base_url}/api/v3/work_packages"
         params = {
@@ -236,147 +960,290 @@ class OpenProjectClient:
             "sortBy": '[["updatedAt", "desc"]]'
         }
         
-        response = requests.get(url, headers=self._get_headers(), params=params)
-        
-        if response.status_code == 200:
-            elements = response.json().get("_embedded", {}).get("elements", [])
-            tasks = []
-            for el in elements:
-                # Basic check if it looks closed (status name contains closed/cerrado/rechazado)
-                status_name = el["_links"]["status"]["title"]
-                if "close" in status_name.lower() or "cerrad" in status_name.lower() or "reject" in status_name.lower():
-                    continue
-                
-                # Extract Project ID
-                project_id = None
-                try:
-                    project_href = el["_links"]["project"]["href"] # /api/v3/projects/123
-                    project_id = int(project_href.split("/")[-1])
-                except Exception as e:
-                    pass
+        tasks = []
+        for el in self._get_elements(url, params=params):
+            # Safety net: the server filter already excludes closed statuses
+            status_name = el["_links"]["status"]["title"]
+            status_id = _id_from_href(el["_links"]["status"].get("href"))
+            if self._is_closed(status_id, status_name, closed_ids):
+                continue
 
-                tasks.append({
-                    "id": el["id"],
-                    "subject": el["subject"],
-                    "priority": el["_links"]["priority"]["title"],
-                    "project_name": el["_links"]["project"]["title"],
-                    "project_id": project_id,
-                    "updated_at": el["updatedAt"],
-                    "status": status_name,
-                    "progress": el.get("percentageDone") or 0,
-                    "lock_version": el["lockVersion"],
-                    "dueDate": el.get("dueDate"),
-                    "estimatedTime": el.get("estimatedTime"),
-                    "spentTime": el.get("spentTime")
-                })
-            return tasks
-        return []
+            # Extract Project ID
+            project_id = None
+            try:
+                project_href = el["_links"]["project"]["href"] # /api/v3/projects/123
+                project_id = int(project_href.split("/")[-1])
+            except Exception as e:
+                pass
 
+            tasks.append({
+                "id": el["id"],
+                "subject": el["subject"],
+                "priority": el["_links"]["priority"]["title"],
+                "project_name": el["_links"]["project"]["title"],
+                "project_id": project_id,
+                "updated_at": el["updatedAt"],
+                "status": status_name,
+                "status_id": status_id,
+                "is_closed": False,
+                "progress": el.get("percentageDone") or 0,
+                "lock_version": el["lockVersion"],
+                "dueDate": el.get("dueDate"),
+                "estimatedTime": el.get("estimatedTime"),
+                "spentTime": el.get("spentTime")
+            })
+        return tasks
+
+    @_serves_last_good(list)
+    @_coalesced()
     def get_users(self):
         """Fetches list of users."""
         if not self.is_configured(): return []
         url = f"{self.base_url}/api/v3/users"
-        response = requests.get(url, headers=self._get_headers())
-        if response.status_code == 200:
-            users = []
-            for u in response.json().get("_embedded", {}).get("elements", []):
-                users.append({
-                    "id": u["id"],
-                    "name": f"{u.get('firstName', '')} {u.get('lastName', '')}".strip()
-                })
-            return users
-        return []
+        try:
+            return self._get_validated(url, lambda elements: [
+                {"id": u["id"], "name": f"{u.get('firstName', '')} {u.get('lastName', '')}".strip()}
+                for u in elements
+            ])
+        except UpstreamError as e:
+            print(f"Error fetching users: {e}")
+            return []
 
+    @_serves_last_good(list)
     def get_all_tasks(self, assignee_id="me"):
         """Fetches ALL tasks (Open AND Closed) with optional assignee filter."""
         if not self.is_configured(): return []
-        
+        try:
+            return self._fetch_all_tasks(assignee_id)
+        except UpstreamError as e:
+            print(f"Error fetching tasks: {e}")
+            return []
+
+    def get_all_tasks_cached(self, assignee_id="me", force=False):
+        """Stale-while-revalidate variant of get_all_tasks. Returns an op_cache.CachedResult.
+
+        The all-assignees dataset (assignee_id=None) is refreshed incrementally, see _sync_all_tasks.
+        """
+        if not self.is_configured(): return CachedResult([], None, False, False, 0)
+        if assignee_id is None:
+            loader = self._sync_all_tasks
+        else:
+            loader = lambda: self._fetch_all_tasks(assignee_id)
+        return self.task_cache.get(("all_tasks", assignee_id), loader, force=force)
+
+    def project_shards(self, projects=None):
+        """Splits the visible projects into root-project subtrees: [(root project, subtree ids)].
+
+        A project whose parent is not visible counts as a root, so every visible project lands
+        in exactly one shard. A last catch-all shard (id None, subtree ids None) stands for the
+        work packages of every other project, listed in the reports as unclassified.
+        """
+        projects = self.get_projects() if projects is None else projects
+        known = {p["id"] for p in projects}
+        children = {}
+        for p in projects:
+            children.setdefault(p.get("parent_id"), []).append(p)
+        shards = []
+        for root in projects:
+            if root.get("parent_id") in known:
+                continue
+            ids, stack, seen = [], [root], set()
+            while stack:
+                p = stack.pop()
+                if p["id"] in seen:
+                    continue
+                seen.add(p["id"])
+                ids.append(p["id"])
+                stack.extend(children.get(p["id"], []))
+            shards.append((root, tuple(ids)))
+        shards.append(({"id": None, "name": "❓ Sin Clasificar", "parent_id": None}, None))
+        return shards
+
+    def iter_task_shards(self, assignee_id=None, projects=None):
+        """Fetches all tasks one root-project subtree at a time, concurrently.
+
+        Yields (root project, tasks) as each shard completes, fastest first. Once every shard
+        has landed complete, the merged list is stored as the get_all_tasks_cached dataset (and,
+        for all assignees, as the ReportState baseline) so the next read is served from the cache.
+        If any shard came back incomplete, nothing is stored and the next read reloads the full list.
+        """
+        projects = self.get_projects() if projects is None else projects
+        shards = self.project_shards(projects)
+        known = tuple(pid for _, ids in shards for pid in ids or ())
+        calls = [functools.partial(self._fetch_all_tasks, assignee_id, project_ids=ids) if ids is not None
+                 else functools.partial(self._fetch_all_tasks, assignee_id, excluded_project_ids=known)
+                 for _, ids in shards]
+        merged, complete = {}, True
+        for i, tasks in iter_concurrently(*calls):
+            complete = complete and tasks.complete
+            for t in tasks:
+                merged[t["id"]] = t  # Guards against a task moved between subtrees mid-load
+            yield shards[i][0], tasks
+
+        if not complete:
+            print("Incomplete work package shard (changed while paging); the next read reloads the full list")
+            if assignee_id is None:
+                with self._lock:
+                    self._tasks_watermark = None  # Makes the next _sync_all_tasks a full one
+            self.task_cache.invalidate(("all_tasks", assignee_id))
+            return
+        tasks = list(merged.values())
+        if assignee_id is None:
+            newest = max((t["updated_at"] for t in tasks if t.get("updated_at")), default=None)
+            with self._lock:
+                self._report_state = ReportState(projects, tasks)
+                self._tasks_watermark = newest
+                self._last_full_sync = time.monotonic()
+        self.task_cache.put(("all_tasks", assignee_id), tasks)
+
+    def report_state(self):
+        """Incremental per-project accumulators of the all-assignees dataset (report_state.ReportState), or None before its first load."""
+        with self._lock:
+            return self._report_state
+
+    @_coalesced()
+    def _sync_all_tasks(self):
+        """Loads the all-assignees dataset, fetching only what changed since the previous load.
+
+        Work packages updated since the newest updatedAt seen (server clock) are fetched and
+        merged by id, and only those are re-accounted in the ReportState. Deleted work packages
+        can't be seen that way: every OP_FULL_SYNC_EVERY seconds (and on the first load) the
+        full list is fetched instead, and the differences are applied as a delta as well.
+        A fetch that came back incomplete is merged but removes nothing and doesn't advance the
+        watermark (or the full-sync clock), so the next refresh asks for the same window again.
+        """
+        previous = self.task_cache.peek(("all_tasks", None))
+        projects = self.get_projects()
+        with self._lock:
+            state, watermark, last_full = self._report_state, self._tasks_watermark, self._last_full_sync
+        full = (previous is None or state is None or watermark is None
+                or time.monotonic() - last_full > float(os.getenv("OP_FULL_SYNC_EVERY", "600")))
+
+        if full:
+            fetched = self._fetch_all_tasks(None)
+            complete = fetched.complete
+            current_ids = {t["id"] for t in fetched}
+            # Missing rows of an incomplete list may still exist: keep the previous copies
+            tasks = list(fetched) if complete else fetched + [t for t in previous or () if t["id"] not in current_ids]
+            if state is None or not state.same_tree(projects):
+                state = ReportState(projects, tasks)
+            else:
+                changed = [t for t in fetched if state.updated_at(t["id"]) != t["updated_at"]]
+                state.apply(changed=changed, removed=state.task_ids() - current_ids if complete else ())
+        else:
+            changed = self._fetch_all_tasks(None, updated_since=watermark)
+            complete = changed.complete
+            changed_ids = {t["id"] for t in changed}
+            tasks = changed + [t for t in previous if t["id"] not in changed_ids]
+            if state.same_tree(projects):
+                state.apply(changed=changed)
+            else:
+                state = ReportState(projects, tasks)
+
+        if not complete:
+            print("Incomplete work package list (changed while paging); retrying on the next refresh")
+        newest = max((t["updated_at"] for t in tasks if t.get("updated_at")), default=watermark)
+        with self._lock:
+            self._report_state = state
+            if complete:
+                self._tasks_watermark = max(newest, watermark) if watermark and newest else newest
+                if full:
+                    self._last_full_sync = time.monotonic()
+        return tasks
+
+    @_coalesced()
+    def _fetch_all_tasks(self, assignee_id="me", updated_since=None, project_ids=None, excluded_project_ids=None):
+        """Loads all tasks for an assignee filter (optionally only those updated since a timestamp,
+        only those of the given projects, or only those outside the excluded ones).
+
+        Raises UpstreamError on a non-200 response.
+        """
         filters = []
         if assignee_id == "me":
              filters.append({"assignee": {"operator": "=", "values": ["me"]}})
         elif assignee_id: # Specific ID
              filters.append({"assignee": {"operator": "=", "values": [str(assignee_id)]}})
         # If assignee_id is None, no assignee filter -> fetch all (might be heavy!)
+        if updated_since:
+            # Inclusive bound: the newest already-seen tasks come back and are merged idempotently
+            filters.append({"updatedAt": {"operator": "<>d", "values": [updated_since, ""]}})
+        if project_ids:
+            filters.append({"project": {"operator": "=", "values": [str(pid) for pid in project_ids]}})
+        if excluded_project_ids:
+            filters.append({"project": {"operator": "!", "values": [str(pid) for pid in excluded_project_ids]}})
 
         url = f"{self.base_url}/api/v3/work_packages"
-        params = {
-            "pageSize": 500, # Increased limit for reports
-            "sortBy": '[["updatedAt", "desc"]]'
-        }
-        
-        if filters:
-            params["filters"] = json.dumps(filters)
-        
-        response = requests.get(url, headers=self._get_headers(), params=params)
+        # Always sent, even empty: without it OpenProject applies its default open-only status filter
+        params = {"sortBy": '[["updatedAt", "desc"]]', "filters": json.dumps(filters)}
         
-        if response.status_code == 200:
-            elements = response.json().get("_embedded", {}).get("elements", [])
-            tasks = []
-            for el in elements:
-                status_name = el["_links"]["status"]["title"]
-                
-                # Extract Project ID
-                project_id = None
-                try:
-                    project_href = el["_links"]["project"]["href"]
-                    project_id = int(project_href.split("/")[-1])
-                except Exception as e:
-                    pass
-                
-                # Helper to safely get user name
-                assignee_name = "Unassigned"
-                try:
-                    if el["_links"]["assignee"]["title"]:
-                         assignee_name = el["_links"]["assignee"]["title"]
-                except: pass
-
-                tasks.append({
-                    "id": el["id"],
-                    "subject": el["subject"],
-                    "priority": el["_links"]["priority"]["title"],
-                    "project_name": el["_links"]["project"]["title"],
-                    "project_id": project_id,
-                    "updated_at": el["updatedAt"],
-                    "status": status_name,
-                    "assignee": assignee_name,
-                    "progress": el.get("percentageDone") or 0,
-                    "lock_version": el["lockVersion"],
-                    "dueDate": el.get("dueDate"),
-                    "estimatedTime": el.get("estimatedTime"),
-                    "spentTime": el.get("spentTime")
-                })
-            return tasks
-        return []
-
-    def close_task(self, work_package_id, lock_version):
+        closed_ids = self.get_closed_status_ids()
+        # Every page: a single capped page would silently drop tasks (and deltas) past the first one
+        elements = self._get_all_pages(url, params, WORK_PACKAGES_PAGE_SIZE)
+        tasks = _Collection(complete=elements.complete)
+        for el in elements:
+            tasks.append(self._task_row(el, closed_ids))
+        return tasks
+
+    def _task_row(self, el, closed_ids):
+        """Task row (as listed by _fetch_all_tasks) of a work package from the API."""
+        status_name = el["_links"]["status"]["title"]
+        status_id = _id_from_href(el["_links"]["status"].get("href"))
+
+        # Extract Project ID
+        project_id = None
+        try:
+            project_href = el["_links"]["project"]["href"]
+            project_id = int(project_href.split("/")[-1])
+        except Exception as e:
+            pass
+
+        # Helper to safely get user name
+        assignee_name = "Unassigned"
+        assignee_id = None
+        try:
+            assignee_id = _id_from_href(el["_links"]["assignee"]["href"])
+            if el["_links"]["assignee"]["title"]:
+                 assignee_name = el["_links"]["assignee"]["title"]
+        except: pass
+
+        return {
+            "id": el["id"],
+            "subject": el["subject"],
+            "priority": el["_links"]["priority"]["title"],
+            "type": el["_links"].get("type", {}).get("title"),
+            "project_name": el["_links"]["project"]["title"],
+            "project_id": project_id,
+            "updated_at": el["updatedAt"],
+            "status": status_name,
+            "status_id": status_id,
+            "is_closed": self._is_closed(status_id, status_name, closed_ids),
+            "assignee": assignee_name,
+            "assignee_id": assignee_id,
+            "progress": el.get("percentageDone") or 0,
+            "lock_version": el["lockVersion"],
+            "startDate": el.get("startDate"),
+            "dueDate": el.get("dueDate"),
+            "estimatedTime": el.get("estimatedTime"),
+            "spentTime": el.get("spentTime"),
+            "estimated_hours": _iso_hours(el.get("estimatedTime")) or 0.0,
+            "spent_hours": _iso_hours(el.get("spentTime")) or 0.0,
+        }
+
+    @_fails_on_timeout(False)
+    def close_task(self, work_package_id, lock_version, expected=None):
         """Attempts to close a task."""
         if not self.is_configured(): return False
         
-        # Try to find a status ID for "Closed"
-        status_id = self._find_status_id_by_name("Closed") or \
-                    self._find_status_id_by_name("Cerrado") or \
-                    self._find_status_id_by_name("Done") or \
-                    self._find_status_id_by_name("Finalizado") 
+        status_id = self._find_closed_status_id()
         
         if not status_id:
             # Fallback: Just return false, user needs to set up statuses
             print("Status 'Closed'/'Cerrado' not found.")
             return False
 
-        # Ensure native types for JSON serialization
-        lock_version = int(lock_version)
-
-        url = f"{self.base_url}/api/v3/work_packages/{work_package_id}"
-        payload = {
-            "lockVersion": lock_version,
-            "_links": {
-                "status": {"href": f"/api/v3/statuses/{status_id}"}
-            }
-        }
-        
-        response = requests.patch(url, headers=self._get_headers(), json=payload)
-        return response.status_code == 200
+        return self._patch_work_package(work_package_id, lock_version, {"status_id": status_id}, expected)
 
+    @_fails_on_timeout(lambda e: (False, str(e)))
     def log_time(self, work_package_id, hours, comment="", progress=None, spent_on=None):
         """Logs time and optionally updates progress %. Returns (success, error_msg)."""
         if not self.is_configured(): return False, "Client not configured."
@@ -398,7 +1265,7 @@ class OpenProjectClient:
             }
         }
         
-        response = requests.post(url, headers=self._get_headers(), json=payload)
+        response = self._request("POST", url, json=payload)
         success = response.status_code in [200, 201]
 
         if not success:
@@ -406,46 +1273,452 @@ class OpenProjectClient:
             print(f"Error logging time: {error_msg}")
             return False, error_msg
 
-        # 2. Update Progress if requested
+        # 2. Update Progress if requested (lockVersion from the task cache; refetched on conflict)
         if progress is not None:
             try:
-                # Fetch current lockVersion
-                wp_url = f"{self.base_url}/api/v3/work_packages/{work_package_id}"
-                wp_resp = requests.get(wp_url, headers=self._get_headers())
-                if wp_resp.status_code == 200:
-                    current_data = wp_resp.json()
-                    lock_version = current_data["lockVersion"]
-                    
-                    patch_payload = {
-                        "lockVersion": lock_version,
-                        "percentageDone": int(progress)
-                    }
-                    requests.patch(wp_url, headers=self._get_headers(), json=patch_payload)
+                self._patch_work_package(work_package_id, None, {"progress": int(progress)})
             except Exception as e:
                 print(f"Error updating progress: {e}")
                 # We don't fail the whole operation if just progress update fails, 
                 # but maybe warn? For now let's ensure time logic is prioritary.
 
+        self.task_cache.invalidate()
+        self.time_entries.forget([spent_on])
         return True, "Time logged successfully."
 
-    def _find_status_id_by_name(self, name):
-        url = f"{self.base_url}/api/v3/statuses"
-        response = requests.get(url, headers=self._get_headers())
-        if response.status_code == 200:
-            for status in response.json().get("_embedded", {}).get("elements", []):
+    def _patch_work_package(self, work_package_id, lock_version, changes, expected=None):
+        """Conflict-aware PATCH: applies `changes` (keyed as in WP_FIELDS) with optimistic locking.
+
+        `expected` holds the field values the edit was based on (default: the cached task with that
+        lockVersion). Fields already at their expected value are not sent. On 409 the work package is
+        refetched; if no changed field was also changed server-side the rest is re-applied on the new
+        lockVersion, up to OP_CONFLICT_RETRIES times. Fields with no known base are re-applied as they are.
+        The PATCH response (fresh lockVersion included) is written back into the task cache.
+        """
+        work_package_id = int(work_package_id)
+        url = f"{self.base_url}/api/v3/work_packages/{work_package_id}"
+        cached = self.task_cache.find_row(work_package_id)
+        if lock_version is None and cached is not None:
+            lock_version = cached["lock_version"]
+        if expected is None and cached is not None and cached["lock_version"] == int(lock_version):
+            expected = _task_state(cached)
+        if lock_version is None:
+            current = self._get_work_package(work_package_id)
+            if current is None:
+                return False
+            lock_version, expected = current["lockVersion"], _wp_state(current)
+        expected = expected or {}
+
+        pending = {f: v for f, v in changes.items() if f not in expected or expected[f] != v}
+        retries = int(os.getenv("OP_CONFLICT_RETRIES", "3"))
+        for attempt in range(retries + 1):
+            if not pending:
+                return True
+            response = self._request("PATCH", url, json=_wp_payload(lock_version, pending))
+            if response.status_code == 200:
+                self._apply_work_package(response.json(), status_changed="status_id" in pending)
+                return True
+            if response.status_code != 409 or attempt == retries:
+                print(f"Error updating WP {work_package_id}: {response.status_code} - {response.text}")
+                return False
+            current = self._get_work_package(work_package_id)
+            if current is None:
+                return False
+            server = _wp_state(current)
+            collisions = [f for f in pending if f in expected and server[f] != expected[f] and server[f] != pending[f]]
+            if collisions:
+                print(f"Conflict updating WP {work_package_id}: {', '.join(collisions)} changed concurrently")
+                return False
+            # The server may already hold some of our values
+            pending = {f: v for f, v in pending.items() if server[f] != v}
+            lock_version, expected = current["lockVersion"], server
+        return True
+
+    def _get_work_package(self, work_package_id):
+        response = self._request("GET", f"{self.base_url}/api/v3/work_packages/{work_package_id}")
+        if response.status_code != 200:
+            print(f"Error fetching WP {work_package_id}: {response.status_code} - {response.text}")
+            return None
+        return _json_loads(response.content)
+
+    def _apply_work_package(self, el, status_changed=False):
+        """Writes a work package returned by the server into the cached task rows."""
+        status = el.get("_links", {}).get("status", {})
+        status_id = _id_from_href(status.get("href"))
+        self.task_cache.patch_rows(el["id"], {
+            "subject": el.get("subject"),
+            "lock_version": el["lockVersion"],
+            "progress": el.get("percentageDone") or 0,
+            "startDate": el.get("startDate"),
+            "dueDate": el.get("dueDate"),
+            "estimatedTime": el.get("estimatedTime"),
+            "spentTime": el.get("spentTime"),
+            "estimated_hours": _iso_hours(el.get("estimatedTime")) or 0.0,
+            "spent_hours": _iso_hours(el.get("spentTime")) or 0.0,
+            "updated_at": el.get("updatedAt"),
+            "status": status.get("title"),
+            "status_id": status_id,
+            "is_closed": self._is_closed(status_id, status.get("title"), self.get_closed_status_ids()),
+        })
+        if status_changed:
+            # Status filters (e.g. open tasks only) may now include or exclude the task
+            self.task_cache.invalidate()
+            self.open_states.invalidate(el["id"])
+
+    def apply_webhook(self, event):
+        """Applies an OpenProject webhook event (see webhooks.py) to the cached data.
+
+        A pushed work package is upserted into the cached lists it belongs to (by assignee, status
+        and visible project), dropped from the others and re-accounted in the ReportState; the
+        dataset versions move, so open pages rerun (see views.common.render_freshness).
+        """
+        action = event.get("action") or ""
+        if action.startswith("work_package:") and "id" in (event.get("work_package") or {}):
+            self._apply_pushed_work_package(event["work_package"])
+        elif action.startswith("time_entry:"):
+            self._apply_pushed_time_entry(event.get("time_entry") or {})
+
+    def _apply_pushed_work_package(self, el):
+        """Upserts a pushed work package into each cached task list it belongs to and drops it
+        from the others, so no list is reloaded (only those that can't be decided are). If the
+        client's projects are unknown, its lists are reloaded with its own credentials instead."""
+        row = self._task_row(el, self.get_closed_status_ids())
+        project_ids = {p["id"] for p in self.get_projects()}
+        if not project_ids:
+            # Can't tell what this user may see (the payload is built with admin rights): reload
+            # the lists with the user's own credentials instead of inserting it
+            self.open_states.invalidate(row["id"])
+            self._refresh_task_lists([k for k in self.task_cache.keys() if k[0] in ("my_tasks", "all_tasks")])
+            return
+        visible = row["project_id"] in project_ids
+        me = self.get_me()
+        undecided = []
+        for key in self.task_cache.keys():
+            if key == ("my_tasks",):
+                if me is None:
+                    undecided.append(key)
+                    continue
+                member = row["assignee_id"] == me["id"] and not row["is_closed"]
+            elif key[0] == "all_tasks":
+                if key[1] == "me" and me is None:
+                    undecided.append(key)
+                    continue
+                assignee = me["id"] if key[1] == "me" else key[1]
+                member = assignee is None or str(row["assignee_id"]) == str(assignee)
+            else:
+                continue
+            self._upsert_task_row(key, row, visible and member)
+        state = self.report_state()
+        if state is not None:
+            if visible:
+                state.apply(changed=[row])
+            else:
+                state.apply(removed=[row["id"]])
+        self.open_states.invalidate(row["id"])
+        self._refresh_task_lists(undecided)
+
+    def _upsert_task_row(self, key, row, member):
+        current = next((r for r in self.task_cache.peek(key) or () if r["id"] == row["id"]), None)
+        if not member:
+            self.task_cache.replace_row(key, row["id"], None)
+        elif current is None:
+            self.task_cache.replace_row(key, row["id"], row)
+        else:
+            # Same fields as the rows the list was loaded with (my_tasks rows are narrower)
+            self.task_cache.replace_row(key, row["id"], {f: row.get(f, v) for f, v in current.items()})
+
+    def _apply_pushed_time_entry(self, entry):
+        if entry.get("spentOn"):
+            self.time_entries.forget([entry["spentOn"]])
+        # Spent hours of the work package changed: refetch it if any cached list shows it
+        wp_id = _id_from_href(((entry.get("_links") or {}).get("workPackage") or {}).get("href"))
+        if wp_id is None or not self._cached_task_rows(wp_id):
+            return
+        try:
+            el = self._get_work_package(wp_id)
+        except (requests.RequestException, DeadlineExceeded, UpstreamError) as e:
+            print(f"Error fetching WP {wp_id}: {e}")
+            return
+        if el is not None:
+            self._apply_pushed_work_package(el)
+
+    def _cached_task_rows(self, work_package_id):
+        return [row for key in self.task_cache.keys() if key[0] in ("my_tasks", "all_tasks")
+                for row in self.task_cache.peek(key) or () if row["id"] == work_package_id]
+
+    def _refresh_task_lists(self, keys):
+        """Background reload of the given cached task lists."""
+        for key in keys:
+            if key == ("my_tasks",):
+                loader = self._fetch_my_tasks
+            else:
+                loader = self._sync_all_tasks if key[1] is None else functools.partial(self._fetch_all_tasks, key[1])
+            self.task_cache.refresh(key, loader)
+
+    def get_time_entries(self, start, end, refresh=False):
+        """Time entries (all visible users) with spentOn between the dates `start` and `end`.
+
+        Served from a cache keyed by spentOn: only days not loaded yet are fetched. With
+        refresh=True the days of the current week are re-fetched as well; earlier weeks are
+        considered settled. If OpenProject fails, whatever is cached for the range is returned.
+        """
+        if not self.is_configured(): return []
+        days = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+        todo = set(self.time_entries.missing(days))
+        if refresh:
+            week_start = (date.today() - timedelta(days=date.today().weekday())).isoformat()
+            todo.update(d for d in days if d >= week_start)
+        if todo:
+            first, last = min(todo), max(todo)
+            try:
+                entries = self._fetch_time_entries(first, last)
+            except (requests.RequestException, DeadlineExceeded, UpstreamError) as e:
+                print(f"Error fetching time entries: {e}")
+            else:
+                # One request covers first..last: every day in between is up to date now
+                self.time_entries.store([d for d in days if first <= d <= last], entries, lambda e: e["spentOn"])
+        return self.time_entries.rows(days)
+
+    @_coalesced()
+    def _fetch_time_entries(self, first_day, last_day):
+        filters = [{"spentOn": {"operator": "<>d", "values": [first_day, last_day]}}]
+        elements = self._get_all_pages(
+            f"{self.base_url}/api/v3/time_entries", {"filters": json.dumps(filters)}, TIME_ENTRIES_PAGE_SIZE)
+        entries = []
+        for el in elements:
+            links = el.get("_links", {})
+            user, project, wp = links.get("user") or {}, links.get("project") or {}, links.get("workPackage") or {}
+            entries.append({
+                "id": el["id"],
+                "spentOn": el.get("spentOn"),
+                "hours": _iso_hours(el.get("hours")) or 0.0,
+                "user_id": _id_from_href(user.get("href")),
+                "user": user.get("title"),
+                "project_id": _id_from_href(project.get("href")),
+                "project": project.get("title"),
+                "work_package_id": _id_from_href(wp.get("href")),
+                "work_package": wp.get("title"),
+                "comment": (el.get("comment") or {}).get("raw") or "",
+            })
+        return entries
+
+    def get_relations_cached(self, force=False):
+        """Stale-while-revalidate list of every work package relation visible to the user."""
+        if not self.is_configured(): return CachedResult([], None, False, False, 0)
+        return self.task_cache.get(("relations",), self._fetch_relations, force=force)
+
+    @_coalesced()
+    def _fetch_relations(self):
+        """Loads all relations (paginated). Raises UpstreamError on a non-200 response."""
+        relations = []
+        for el in self._get_all_pages(f"{self.base_url}/api/v3/relations", {}, RELATIONS_PAGE_SIZE):
+            links = el.get("_links", {})
+            relations.append({
+                "id": el.get("id"),
+                "type": el.get("type"),
+                "from": _id_from_href(links.get("from", {}).get("href")),
+                "to": _id_from_href(links.get("to", {}).get("href")),
+            })
+        return relations
+
+    def dependency_graph(self, force=False):
+        """DependencyGraph of the cached relations, rebuilt only when they change; None if unavailable."""
+        cached = self.get_relations_cached(force=force)
+        if cached.value is None:
+            return None
+        with self._lock:
+            memo = self._dependency_graph
+        if memo is not None and memo[0] == cached.version:
+            return memo[1]
+        graph = DependencyGraph.from_relations(cached.value)
+        with self._lock:
+            self._dependency_graph = (cached.version, graph)
+        return graph
+
+    def get_blockers(self, task_ids):
+        """{task id: [open work packages it depends on]}, listing only the blocked tasks."""
+        graph = self.dependency_graph()
+        if graph is None:
+            return {}
+        candidates = sorted({p for t in task_ids for p in graph.predecessors.get(t, ())})
+        if not candidates:
+            return {}
+        try:
+            states = self.open_states.get_many(candidates, self._fetch_open_states)
+        except (requests.RequestException, DeadlineExceeded, UpstreamError) as e:
+            print(f"Error fetching blocker states: {e}")
+            return {}
+        open_ids = {i for i, is_open in states.items() if is_open}
+        blocked = {}
+        for t in task_ids:
+            blockers = graph.blockers(t, open_ids)
+            if blockers:
+                blocked[t] = blockers
+        return blocked
+
+    def _fetch_open_states(self, ids):
+        open_ids = set(self._fetch_open_ids(ids))
+        return {i: i in open_ids for i in ids}
+
+    def _fetch_open_ids(self, ids):
+        """Which of the given work packages are open (ids chunked, chunks fetched concurrently)."""
+        url = f"{self.base_url}/api/v3/work_packages"
+
+        def fetch(chunk):
+            filters = [
+                {"id": {"operator": "=", "values": [str(i) for i in chunk]}},
+                {"status": {"operator": "o", "values": []}},
+            ]
+            params = {"filters": json.dumps(filters), "pageSize": len(chunk)}
+            return [el["id"] for el in self._get_elements(url, params=params)]
+
+        chunks = [ids[i:i + ID_FILTER_CHUNK] for i in range(0, len(ids), ID_FILTER_CHUNK)]
+        return sorted(i for found in run_concurrently(*[functools.partial(fetch, c) for c in chunks]) for i in found)
+
+    def get_closed_status_ids(self):
+        """IDs of the statuses the server flags as isClosed (statuses are loaded once, instance-wide)."""
+        return {s["id"] for s in self.get_statuses() if s.get("isClosed")}
+
+    @staticmethod
+    def _is_closed(status_id, status_name, closed_ids):
+        if closed_ids:
+            return status_id in closed_ids
+        return is_closed_name(status_name)
+
+    def _find_closed_status_id(self):
+        """Status used by close_task: OP_CLOSED_STATUS (a status name) if set, else a closed status
+        with a well-known name ('Closed', 'Cerrado'...), so that e.g. 'Rejected' is never picked
+        while a proper one exists; else the first isClosed status in the server's order."""
+        statuses = self.get_statuses()
+        configured = (os.getenv("OP_CLOSED_STATUS") or "").strip().lower()
+        if configured:
+            for status in statuses:
+                if status["name"].strip().lower() == configured:
+                    return status["id"]
+            print(f"OP_CLOSED_STATUS '{configured}' not found among the statuses")
+        closed = [s for s in statuses if s.get("isClosed")]
+        # Without metadata every status is a candidate for the well-known names
+        for name in CLOSE_STATUS_NAMES:
+            for status in closed or statuses:
                 if name.lower() in status["name"].lower():
                     return status["id"]
-        return None
+        return closed[0]["id"] if closed else None
+
+    def _get_reference(self, endpoint):
+        """Returns instance-wide reference data (types, statuses, roles), shared across credentials."""
+        try:
+            elements = _get_reference_cache().get((self.base_url, endpoint), lambda: self._fetch_reference(endpoint))
+        except UpstreamError as e:
+            print(f"Error fetching {endpoint}: {e}")
+            return []
+        # Callers get their own copies; the cached list is shared between sessions
+        return [dict(el) for el in elements]
+
+    @_coalesced(shared=True)
+    def _fetch_reference(self, endpoint):
+        fields = REFERENCE_FIELDS[endpoint]
+        return self._get_validated(
+            f"{self.base_url}/api/v3/{endpoint}",
+            lambda elements: [{f: el.get(f) for f in fields} for el in elements],
+            shared=True,
+        )
 
+    @_serves_last_good(list)
     def get_roles(self):
         """Fetches all available roles."""
         if not self.is_configured(): return []
-        url = f"{self.base_url}/api/v3/roles"
-        response = requests.get(url, headers=self._get_headers())
-        if response.status_code == 200:
-            return [{"id": r["id"], "name": r["name"]} for r in response.json().get("_embedded", {}).get("elements", [])]
-        return []
+        return self._get_reference("roles")
+
+    def get_member_role_id(self):
+        """Id of the "Miembro" role, resolved once per instance (falls back to the usual id 3)."""
+        roles = _get_member_roles()
+        role_id = roles.get(self.base_url)
+        if role_id is None:
+            for r in self.get_roles():
+                if r["name"] == MEMBER_ROLE_NAME:
+                    # Only a real match is remembered, so a failed roles fetch is retried next time
+                    role_id = roles[self.base_url] = r["id"]
+                    break
+        return role_id if role_id is not None else DEFAULT_MEMBER_ROLE_ID
+
+    def get_member_project_ids(self):
+        """Ids of the projects the current user is a member of, loaded once per client.
+
+        Memberships held through a group count as well. Returns None when memberships (or the
+        user's groups) can't be listed; callers then rely on the 422 auto-join.
+        """
+        with self._lock:
+            if self._member_projects is not None or self._memberships_denied:
+                return self._member_projects
+        me = self.get_me()
+        if not me:
+            return None
+        try:
+            project_ids = self._fetch_member_project_ids(me["id"])
+        except UpstreamError as e:
+            # The server refuses the listing: don't ask again on every write
+            print(f"Error fetching memberships: {e}")
+            with self._lock:
+                self._memberships_denied = True
+            return None
+        except (requests.RequestException, DeadlineExceeded) as e:
+            print(f"Error fetching memberships: {e}")
+            return None
+        if project_ids is None:
+            print("Group memberships can't be resolved: projects are joined on demand")
+            with self._lock:
+                self._memberships_denied = True
+            return None
+        with self._lock:
+            if self._member_projects is None:
+                self._member_projects = project_ids
+            return self._member_projects
 
+    @_coalesced()
+    def _fetch_member_project_ids(self, user_id):
+        """Projects where the user, or a group the user belongs to, is a member; None if the
+        groups' members aren't visible. Raises UpstreamError on a non-200 response."""
+        group_ids = self._fetch_group_ids(user_id)
+        if group_ids is None:
+            return None
+        principals = [str(user_id)] + [str(g) for g in sorted(group_ids)]
+        params = {"filters": json.dumps([{"principal": {"operator": "=", "values": principals}}])}
+        project_ids = set()
+        for m in self._get_all_pages(f"{self.base_url}/api/v3/memberships", params, MEMBERSHIPS_PAGE_SIZE):
+            # Global memberships have no project
+            project_id = _id_from_href((m.get("_links", {}).get("project") or {}).get("href"))
+            if project_id is not None:
+                project_ids.add(project_id)
+        return project_ids
+
+    def _fetch_group_ids(self, user_id):
+        group_ids = set()
+        for group in self._get_all_pages(f"{self.base_url}/api/v3/groups", {}, MEMBERSHIPS_PAGE_SIZE):
+            members = group.get("_links", {}).get("members")
+            if members is None:
+                return None
+            if any(_id_from_href(m.get("href")) == user_id for m in members):
+                group_ids.add(group["id"])
+        return group_ids
+
+    def ensure_memberships(self, project_ids):
+        """Pre-joins, in one concurrent batch, the projects the user isn't a member of yet.
+
+        Returns the set of project ids joined. Does nothing if the membership index is unavailable.
+        """
+        members = self.get_member_project_ids()
+        me = self.get_me()
+        if members is None or not me:
+            return set()
+        with self._lock:
+            missing = sorted({int(pid) for pid in project_ids} - members)
+        if not missing:
+            return set()
+        role_id = self.get_member_role_id()
+        results = run_concurrently(*[functools.partial(self.add_member, pid, me["id"], role_id) for pid in missing])
+        return {pid for pid, ok in zip(missing, results) if ok}
+
+    @_fails_on_timeout(False)
     def add_member(self, project_id, user_id, role_id):
         """Adds a user to a project with a specific role."""
         if not self.is_configured(): return False
@@ -459,9 +1732,154 @@ class OpenProjectClient:
             }
         }
         
-        response = requests.post(url, headers=self._get_headers(), json=payload)
+        response = self._request("POST", url, json=payload)
         if response.status_code in [200, 201]:
+            me = self.get_me()
+            with self._lock:
+                if self._member_projects is not None and me and int(user_id) == me["id"]:
+                    self._member_projects.add(int(project_id))
             return True
         else:
             print(f"Error adding member: {response.status_code} - {response.text}")
             return False
+
+
+class ClientPool:
+    """Thread-safe LRU of OpenProjectClient instances keyed by credentials.
+
+    Clients idle for more than `idle_ttl` seconds are evicted, as are the least recently
+    used ones once there are more than `max_clients` or their memoized data exceeds
+    `max_bytes`. Evicted clients have their pooled connections closed.
+    """
+
+    def __init__(self, max_clients=64, idle_ttl=1800, max_bytes=256 * 1024 * 1024):
+        self.max_clients = max_clients
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self._clients = OrderedDict()  # key -> (client, last_used), least recently used first
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(api_key, url):
+        return ((url or "").rstrip("/"), hashlib.sha256((api_key or "").encode()).hexdigest())
+
+    def get(self, api_key=None, url=None):
+        key = self._key(api_key, url)
+        built = None
+        while True:
+            with self._lock:
+                evicted = self._evict_idle()
+                entry = self._clients.pop(key, None)
+                if entry is not None or built is not None:
+                    client = entry[0] if entry else built
+                    self._clients[key] = (client, time.monotonic())
+                    evicted += self._evict_over_capacity(keep=key)
+                    break
+            for old in evicted:
+                old.close()
+            # Built outside the lock, so a slow construction doesn't hold up every other session
+            built = OpenProjectClient(api_key=api_key, url=url)
+        if built is not None and built is not client:
+            evicted.append(built)  # Another thread stored a client for these credentials first
+        for old in evicted:
+            old.close()
+        return client
+
+    def discard(self, api_key=None, url=None):
+        with self._lock:
+            entry = self._clients.pop(self._key(api_key, url), None)
+        if entry:
+            entry[0].close()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def clients(self):
+        with self._lock:
+            return [client for client, _ in self._clients.values()]
+
+    def _evict_idle(self):
+        evicted = []
+        now = time.monotonic()
+        # Oldest first: stop at the first client that is still active
+        while self._clients:
+            key, (client, last_used) = next(iter(self._clients.items()))
+            if now - last_used <= self.idle_ttl:
+                break
+            del self._clients[key]
+            evicted.append(client)
+        return evicted
+
+    def _evict_over_capacity(self, keep):
+        evicted = []
+        total = sum(c.approx_memory() for c, _ in self._clients.values())
+        while len(self._clients) > 1 and (len(self._clients) > self.max_clients or total > self.max_bytes):
+            key = next(iter(self._clients))
+            if key == keep:
+                break
+            client, _ = self._clients.pop(key)
+            total -= client.approx_memory()
+            evicted.append(client)
+        return evicted
+
+
+def _get_client_pool():
+    return _singleton("client_pool", lambda: ClientPool(
+        max_clients=int(os.getenv("OP_CLIENT_POOL_SIZE", "64")),
+        idle_ttl=float(os.getenv("OP_CLIENT_IDLE_TTL", "1800")),
+        max_bytes=int(float(os.getenv("OP_CLIENT_POOL_MAX_MB", "256")) * 1024 * 1024),
+    ))
+
+
+def get_client(api_key=None, url=None):
+    """Returns the shared client for these credentials from the process-wide pool."""
+    return _get_client_pool().get(api_key=api_key, url=url)
+
+
+def discard_client(api_key=None, url=None):
+    """Drops (and closes) the pooled client for these credentials, e.g. on logout."""
+    _get_client_pool().discard(api_key=api_key, url=url)
+
+
+def dispatch_webhook(event):
+    """Applies a webhook event to every pooled client (of OP_WEBHOOK_INSTANCE_URL, if set)."""
+    instance = (os.getenv("OP_WEBHOOK_INSTANCE_URL") or "").rstrip("/")
+    for client in _get_client_pool().clients():
+        if not client.is_configured() or (instance and client.base_url != instance):
+            continue
+        try:
+            client.apply_webhook(event)
+        except Exception as e:
+            print(f"Error applying webhook {event.get('action')}: {e}")
+
+
+def start_webhook_receiver():
+    """Starts the embedded webhook endpoint once per process, if OP_WEBHOOK_SECRET is set.
+
+    Returns the webhooks.WebhookReceiver, or None when disabled or the port can't be bound.
+    """
+    def build():
+        secret = os.getenv("OP_WEBHOOK_SECRET")
+        if not secret:
+            return None
+        from webhooks import DEFAULT_PATH, WebhookReceiver
+        try:
+            receiver = WebhookReceiver(
+                secret,
+                # Reply to OpenProject right away; the caches are updated on the worker threads
+                dispatch=lambda event: _get_executor().submit(dispatch_webhook, event),
+                host=os.getenv("OP_WEBHOOK_HOST", "127.0.0.1"),
+                port=int(os.getenv("OP_WEBHOOK_PORT", "8765")),
+                path=os.getenv("OP_WEBHOOK_PATH", DEFAULT_PATH),
+            )
+        except OSError as e:
+            print(f"Webhook receiver not started: {e}")
+            return None
+        return receiver.start()
+    return _singleton("webhook_receiver", build)
+
+
+def webhooks_enabled():
+    """True once the webhook receiver is running: cached data changes without a refresh being asked."""
+    with _singletons_lock:
+        return _singletons.get("webhook_receiver") is not None
@@ -0,0 +1,45 @@
+# Helpers over the flat project list returned by OpenProjectClient.get_projects()
+# ({"id", "name", "parent_id"} dicts, in API order).
+
+
+def build_hierarchy(projects):
+    """Returns ({parent_id: [child projects]}, [root projects]), keeping the API order."""
+    project_children = {}
+    root_projects = []
+    for p in projects:
+        parent_id = p.get("parent_id")
+        if parent_id:
+            project_children.setdefault(parent_id, []).append(p)
+        else:
+            root_projects.append(p)
+    return project_children, root_projects
+
+
+def project_paths(projects, separator=" › "):
+    """Maps project id -> (root project name, "Root › Child › Leaf" path).
+
+    Each project is resolved once (memoized walk up the parents), so this is linear in the
+    number of projects. Broken chains (unknown parent) or cycles root the path at the last
+    project that could be resolved.
+    """
+    by_id = {p["id"]: p for p in projects}
+    paths = {}
+    for p in projects:
+        # Walk up until a resolved ancestor, a root, an unknown parent or a cycle
+        chain = []
+        seen = set()
+        current = p
+        while current is not None and current["id"] not in paths and current["id"] not in seen:
+            seen.add(current["id"])
+            chain.append(current)
+            current = by_id.get(current.get("parent_id"))
+
+        if current is not None and current["id"] in paths:
+            root_name, prefix = paths[current["id"]]
+        else:
+            root_name, prefix = chain[-1]["name"], None
+
+        for node in reversed(chain):
+            prefix = node["name"] if prefix is None else f"{prefix}{separator}{node['name']}"
+            paths[node["id"]] = (root_name, prefix)
+    return paths
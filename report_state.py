@@ -0,0 +1,107 @@
+import threading
+
+# Accumulated metrics, in vector order
+FIELDS = ("total", "closed", "progress_sum", "hours_est", "hours_spent")
+# Assignee key of the all-assignees accumulators
+ALL = "*"
+
+
+def _vector(task):
+    return (
+        1,
+        1 if task.get("is_closed") else 0,
+        task.get("progress") or 0,
+        task.get("estimated_hours") or 0.0,
+        task.get("spent_hours") or 0.0,
+    )
+
+
+class ReportState:
+    """Per-project report accumulators maintained incrementally from work package deltas.
+
+    Keeps, per (project, assignee) and per (project, ALL), the metrics of the project's own
+    tasks ("direct") and of its whole subtree ("rolled", i.e. added to every ancestor too).
+    Each task's last contribution is remembered, so an update subtracts the old one and adds
+    the new one: O(changed × depth) instead of a recompute over every task.
+    """
+
+    def __init__(self, projects, tasks=()):
+        self.parents = {p["id"]: p.get("parent_id") for p in projects}
+        self.version = 0
+        self._chains = {}
+        self._direct = {}
+        self._rolled = {}
+        self._contributions = {}  # task id -> (project_id, assignee_id, vector, updated_at)
+        self._lock = threading.Lock()
+        self.apply(changed=tasks)
+
+    def same_tree(self, projects):
+        return self.parents == {p["id"]: p.get("parent_id") for p in projects}
+
+    def _chain(self, project_id):
+        """The project and its ancestors (guarded against parent cycles)."""
+        chain = self._chains.get(project_id)
+        if chain is None:
+            chain, seen, current = [], set(), project_id
+            while current is not None and current not in seen:
+                seen.add(current)
+                chain.append(current)
+                current = self.parents.get(current)
+            chain = self._chains[project_id] = tuple(chain)
+        return chain
+
+    @staticmethod
+    def _add(table, key, vector, sign):
+        acc = table.get(key)
+        if acc is None:
+            acc = table[key] = [0] * len(FIELDS)
+        for i, value in enumerate(vector):
+            acc[i] += sign * value
+        if acc[0] == 0:
+            del table[key]
+
+    def _account(self, contribution, sign):
+        project_id, assignee_id, vector, _ = contribution
+        for assignee in (assignee_id, ALL):
+            self._add(self._direct, (project_id, assignee), vector, sign)
+            for ancestor in self._chain(project_id):
+                self._add(self._rolled, (ancestor, assignee), vector, sign)
+
+    def apply(self, changed=(), removed=()):
+        """Applies new/updated tasks and removed task ids. Returns how many tasks were (re)accounted."""
+        count = 0
+        with self._lock:
+            for task in changed:
+                old = self._contributions.pop(task["id"], None)
+                if old is not None:
+                    self._account(old, -1)
+                new = (task.get("project_id"), task.get("assignee_id"), _vector(task), task.get("updated_at"))
+                self._contributions[task["id"]] = new
+                self._account(new, +1)
+                count += 1
+            for task_id in removed:
+                old = self._contributions.pop(task_id, None)
+                if old is not None:
+                    self._account(old, -1)
+                    count += 1
+            if count:
+                self.version += 1
+        return count
+
+    def updated_at(self, task_id):
+        contribution = self._contributions.get(task_id)
+        return contribution[3] if contribution else None
+
+    def task_ids(self):
+        with self._lock:
+            return set(self._contributions)
+
+    def project_totals(self, assignee_id=ALL, rolled=False):
+        """{project_id: {field: value}} for one assignee (ALL: everybody), direct or rolled up."""
+        table = self._rolled if rolled else self._direct
+        with self._lock:
+            return {pid: dict(zip(FIELDS, acc)) for (pid, assignee), acc in table.items() if assignee == assignee_id}
+
+    def total(self, assignee_id=ALL):
+        with self._lock:
+            return sum(acc[0] for (_, assignee), acc in self._direct.items() if assignee == assignee_id)
@@ -0,0 +1,172 @@
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize(text):
+    """Lowercase, accent-free text ("Diseño" -> "diseno") so queries match regardless of either."""
+    decomposed = unicodedata.normalize("NFKD", str(text or "").lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokens(text):
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def _trigrams(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class SearchIndex:
+    """In-memory token + trigram index for typeahead over small documents (project paths, task subjects).
+
+    A query term matches a document through one of its tokens: exactly, as a prefix (sorted
+    vocabulary range) or, for terms of 3+ characters, as a substring (trigram postings). Results
+    are ranked by match tier, then by the caller's recent use, then by insertion order; the top
+    `limit` are picked tier by tier without scoring every match. sync() re-indexes only the
+    documents that changed.
+    """
+
+    def __init__(self, docs=()):
+        self._docs = {}        # key -> (label, text)
+        self._tokens = {}      # key -> tuple of normalized tokens
+        self._token_keys = {}  # token -> set of keys
+        self._grams = {}       # trigram -> set of tokens containing it
+        self._order = {}       # key -> insertion rank (stable ordering of ties)
+        self._next_rank = 0
+        self._vocabulary = None  # Sorted tokens, rebuilt lazily after changes
+        self._ordered = None     # Keys by insertion rank, rebuilt lazily after changes
+        self._lock = threading.Lock()
+        self.sync(docs)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def label(self, key):
+        doc = self._docs.get(key)
+        return doc[0] if doc else None
+
+    def _add(self, key, label, text):
+        toks = tuple(dict.fromkeys(tokens(text)))
+        self._docs[key] = (label, text)
+        self._tokens[key] = toks
+        if key not in self._order:
+            self._order[key] = self._next_rank
+            self._next_rank += 1
+        for token in toks:
+            keys = self._token_keys.get(token)
+            if keys is None:
+                keys = self._token_keys[token] = set()
+                for gram in _trigrams(token):
+                    self._grams.setdefault(gram, set()).add(token)
+            keys.add(key)
+
+    def _remove(self, key):
+        for token in self._tokens.pop(key, ()):
+            keys = self._token_keys[token]
+            keys.discard(key)
+            if not keys:
+                del self._token_keys[token]
+                for gram in _trigrams(token):
+                    self._grams[gram].discard(token)
+                    if not self._grams[gram]:
+                        del self._grams[gram]
+        self._docs.pop(key, None)
+
+    def sync(self, docs):
+        """Makes the index hold exactly `docs` ((key, label, text) triples). Returns how many changed."""
+        docs = {key: (label, text) for key, label, text in docs}
+        changed = 0
+        with self._lock:
+            for key in [k for k in self._docs if k not in docs]:
+                self._remove(key)
+                self._order.pop(key, None)
+                changed += 1
+            for key, doc in docs.items():
+                if self._docs.get(key) != doc:
+                    self._remove(key)
+                    self._add(key, *doc)
+                    changed += 1
+            if changed:
+                self._vocabulary = self._ordered = None
+        return changed
+
+    def _term_tiers(self, term):
+        """Keys whose tokens equal, start with, or (3+ characters) contain `term`, as three disjoint sets."""
+        exact = self._token_keys.get(term, set())
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._token_keys)
+        prefix = set()
+        i = bisect.bisect_right(self._vocabulary, term)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(term):
+            prefix |= self._token_keys[self._vocabulary[i]]
+            i += 1
+        prefix -= exact
+        inner = set()
+        if len(term) >= 3:
+            grams = [self._grams.get(g) for g in _trigrams(term)]
+            if all(grams):
+                grams.sort(key=len)  # Intersect starting from the rarest gram
+                for token in grams[0].intersection(*grams[1:]):
+                    if term in token and not token.startswith(term):
+                        inner |= self._token_keys[token]
+            inner -= exact
+            inner -= prefix
+        return exact, prefix, inner
+
+    def _top(self, tiers, limit, recent):
+        """First `limit` keys of the tiers (sets or dicts of keys) in order; within a tier, recently
+        used first, then by insertion."""
+        out = []
+        for tier in tiers:
+            need = limit - len(out)
+            if need <= 0:
+                break
+            if not tier:
+                continue
+            used = sorted((k for k in recent if k in tier), key=recent.get, reverse=True)[:need]
+            out.extend(used)
+            need -= len(used)
+            skip = set(used)
+            if need <= 0 or len(tier) == len(skip):
+                continue
+            if (len(tier) - len(skip)) * 8 > len(self._order):
+                # Dense tier: walking the insertion order finds `need` members after a few steps
+                if self._ordered is None:
+                    self._ordered = sorted(self._order, key=self._order.get)
+                picked = []
+                for key in self._ordered:
+                    if key in tier and key not in skip:
+                        picked.append(key)
+                        if len(picked) == need:
+                            break
+                out.extend(picked)
+            else:
+                rest = (k for k in tier if k not in skip)
+                out.extend(heapq.nsmallest(need, rest, key=self._order.__getitem__))
+        return out
+
+    def search(self, query, limit=20, recent=None):
+        """Best `limit` keys for `query` (every term must match). An empty query lists the most
+        recently used keys first. `recent` maps key -> last use (e.g. a timestamp)."""
+        recent = recent or {}
+        terms = list(dict.fromkeys(tokens(query)))
+        with self._lock:
+            if not terms:
+                return self._top([self._docs], limit, recent)
+            per_term = [self._term_tiers(term) for term in terms]
+            if len(per_term) == 1:
+                return self._top(per_term[0], limit, recent)
+
+            matches = [exact | prefix | inner for exact, prefix, inner in per_term]
+            matches.sort(key=len)
+            matched = matches[0].intersection(*matches[1:])
+            by_score = {}
+            for key in matched:
+                score = sum(0 if key in exact else 1 if key in prefix else 2 for exact, prefix, _ in per_term)
+                by_score.setdefault(score, set()).add(key)
+            return self._top([by_score[s] for s in sorted(by_score)], limit, recent)
@@ -0,0 +1,47 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import tempfile
+
+# Last successfully built Kanban dataset per user, shown instantly on the next login
+
+
+def _snapshot_dir():
+    # Read on every use: OP_SNAPSHOT_DIR may come from .env, loaded after this module is imported
+    return os.getenv("OP_SNAPSHOT_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "openproject_agile")
+
+
+def snapshot_path(url, api_key):
+    """One file per credentials; the name is a hash so neither URL nor key end up on disk in clear."""
+    digest = hashlib.sha256(f"{(url or '').rstrip('/')}|{api_key}".encode()).hexdigest()[:32]
+    return os.path.join(_snapshot_dir(), f"kanban_{digest}.json.gz")
+
+
+def save_snapshot(url, api_key, tasks, projects):
+    """Atomically writes the Kanban dataset (tasks + project tree) as gzipped JSON. Returns success."""
+    path = snapshot_path(url, api_key)
+    data = {"saved_at": time.time(), "tasks": tasks, "projects": projects}
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(gzip.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"), compresslevel=6))
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f"Error saving Kanban snapshot: {e}")
+        return False
+
+
+def load_snapshot(url, api_key):
+    """Returns {"saved_at", "tasks", "projects"} or None if there is no readable snapshot."""
+    try:
+        with open(snapshot_path(url, api_key), "rb") as f:
+            data = json.loads(gzip.decompress(f.read()))
+    except (OSError, ValueError):
+        return None
+    if not all(k in data for k in ("saved_at", "tasks", "projects")):
+        return None
+    return data
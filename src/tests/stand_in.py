@@ -0,0 +1,120 @@
+# Local stand-in for OpenProject shared by the test scripts: a threaded HTTP server on a free
+# port that answers from the routes each script declares, e.g.
+#     server = StandIn({"GET /api/v3/statuses": collection(STATUSES), "PATCH *": update_wp})
+#     client = OpenProjectClient(api_key="test", url=server.url)
+# A route is the answer itself or a function of the Request returning it. An answer is JSON data
+# (sent with status 200) or a Reply. Keys are "METHOD /path", "METHOD /prefix/*" or "METHOD *".
+
+import os
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Keep the client's disk stores (HTTP cache, snapshots, write journal) out of ~/.cache. The stores
+# are built on first use, so this only has to run before a script's first client call; a script
+# that sets its own path first keeps it.
+_scratch = tempfile.mkdtemp(prefix="op-stand-in-")
+os.environ.setdefault("OP_HTTP_CACHE_PATH", os.path.join(_scratch, "http_cache.sqlite"))
+os.environ.setdefault("OP_SNAPSHOT_DIR", _scratch)
+os.environ.setdefault("OP_WRITE_JOURNAL_PATH", os.path.join(_scratch, "write_journal.sqlite"))
+
+
+class Request:
+    """What a route sees: method, path, query ({name: first value}), filters, headers and JSON body."""
+
+    def __init__(self, method, target, headers, body):
+        url = urlparse(target)
+        self.method = method
+        self.path = url.path
+        self.query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        self.headers = headers
+        self.json = json.loads(body) if body else None
+
+    @property
+    def filters(self):
+        return json.loads(self.query.get("filters", "[]"))
+
+
+class Reply:
+    """An answer other than "200 + JSON": any status, extra headers, or a raw body."""
+
+    def __init__(self, status=200, data=None, headers=None, body=None):
+        self.status = status
+        self.headers = dict(headers or {})
+        if body is None and data is not None:
+            body = json.dumps(data).encode()
+            self.headers.setdefault("Content-Type", "application/json")
+        self.body = body or b""
+
+
+def collection(elements, **fields):
+    """HAL collection of `elements` (plus e.g. total=...)."""
+    return dict(fields, _embedded={"elements": list(elements)})
+
+
+def page(request, elements, max_page_size=None):
+    """The page of `elements` a paginated request asks for (1-based offset), optionally capping the page size."""
+    elements = list(elements)
+    size = int(request.query.get("pageSize", 20))
+    if max_page_size:
+        size = min(size, max_page_size)
+    offset = int(request.query.get("offset", 1))
+    return collection(elements[(offset - 1) * size:offset * size], total=len(elements), pageSize=size, offset=offset)
+
+
+class StandIn:
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []  # Every Request served, in arrival order
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def shutdown(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _route(self, method, path):
+        for key in (f"{method} {path}", f"{method} {path.rsplit('/', 1)[0]}/*", f"{method} *"):
+            if key in self.routes:
+                return self.routes[key]
+        return None
+
+    def _answer(self, request):
+        route = self._route(request.method, request.path)
+        if route is None:
+            return Reply(404, {})
+        answer = route(request) if callable(route) else route
+        return answer if isinstance(answer, Reply) else Reply(200, answer)
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def handle_request(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = Request(self.command, self.path, self.headers, self.rfile.read(length) if length else None)
+                stand_in.requests.append(request)
+                reply = stand_in._answer(request)
+                try:
+                    self.send_response(reply.status)
+                    for name, value in reply.headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", str(len(reply.body)))
+                    self.end_headers()
+                    self.wfile.write(reply.body)
+                except OSError:
+                    pass  # The client gave up (e.g. its deadline passed)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = handle_request
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
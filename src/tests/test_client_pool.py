@@ -0,0 +1,76 @@
+import threading
+import time
+
+import op_client
+from op_client import ClientPool
+
+# No network involved: clients are only created, reused and evicted
+print("--- Same credentials -> same client ---")
+pool = ClientPool(max_clients=3, idle_ttl=60)
+a = pool.get(api_key="key-a", url="https://op.example.com/")
+assert pool.get(api_key="key-a", url="https://op.example.com") is a
+assert pool.get(api_key="key-b", url="https://op.example.com") is not a
+
+print("\n--- LRU eviction closes the evicted client's connections ---")
+closed = []
+a.close = lambda: closed.append("a")
+pool.get(api_key="key-c", url="https://op.example.com")
+pool.get(api_key="key-b", url="https://op.example.com") # Touch b -> a is now least recently used
+pool.get(api_key="key-d", url="https://op.example.com")
+print(f"Pool size: {len(pool)}, closed: {closed}")
+assert len(pool) == 3
+assert closed == ["a"]
+assert pool.get(api_key="key-a", url="https://op.example.com") is not a
+
+print("\n--- Idle clients expire ---")
+pool = ClientPool(max_clients=10, idle_ttl=0.05)
+old = pool.get(api_key="idle", url="https://op.example.com")
+time.sleep(0.1)
+pool.get(api_key="active", url="https://op.example.com")
+assert len(pool) == 1
+
+print("\n--- Memory cap ---")
+pool = ClientPool(max_clients=10, idle_ttl=60, max_bytes=1)
+big = pool.get(api_key="big", url="https://op.example.com")
+big.approx_memory = lambda: 10
+pool.get(api_key="small", url="https://op.example.com")
+assert len(pool) == 1
+
+print("\n--- Concurrent sessions get one client per credential ---")
+pool = ClientPool(max_clients=10, idle_ttl=60)
+seen = []
+threads = [threading.Thread(target=lambda: seen.append(pool.get(api_key="shared", url="https://op.example.com"))) for _ in range(20)]
+for t in threads: t.start()
+for t in threads: t.join()
+assert len(set(map(id, seen))) == 1
+
+print("\n--- Slow construction: other credentials aren't held up; race losers are closed ---")
+class SlowClient(op_client.OpenProjectClient):
+    closed = []
+
+    def __init__(self, api_key=None, url=None):
+        if api_key == "slow":
+            time.sleep(0.3)
+        super().__init__(api_key=api_key, url=url)
+
+    def close(self):
+        SlowClient.closed.append(self)
+        super().close()
+
+op_client.OpenProjectClient, original = SlowClient, op_client.OpenProjectClient
+try:
+    pool = ClientPool(max_clients=10, idle_ttl=60)
+    seen = []
+    slow = [threading.Thread(target=lambda: seen.append(pool.get(api_key="slow", url="https://op.example.com"))) for _ in range(2)]
+    for t in slow: t.start()
+    time.sleep(0.05)
+    start = time.perf_counter()
+    pool.get(api_key="fast", url="https://op.example.com")
+    assert time.perf_counter() - start < 0.2
+    for t in slow: t.join()
+    assert seen[0] is seen[1] and len(pool) == 2
+    assert len(SlowClient.closed) == 1 and SlowClient.closed[0] is not seen[0]
+finally:
+    op_client.OpenProjectClient = original
+
+print("\nSUCCESS: Client pool verified.")
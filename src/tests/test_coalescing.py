@@ -0,0 +1,51 @@
+import threading
+import time
+from collections import Counter
+
+from op_client import OpenProjectClient
+from stand_in import StandIn, collection
+
+# --- Local stand-in for OpenProject that counts hits per endpoint ---
+hits = Counter()
+
+def slow_collection(request):
+    hits[request.path] += 1
+    time.sleep(0.3) # Slow enough for concurrent calls to overlap
+    return collection([{"id": 1, "name": "New", "_links": {}}])
+
+server = StandIn({"GET *": slow_collection})
+url = server.url
+
+def run_concurrently(calls):
+    results = [None] * len(calls)
+    def run(i, fn):
+        results[i] = fn()
+    threads = [threading.Thread(target=run, args=(i, fn)) for i, fn in enumerate(calls)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return results
+
+print("--- Ten sessions, same credentials: one projects request ---")
+same_user = [OpenProjectClient(api_key="manager", url=url) for _ in range(10)]
+results = run_concurrently([c.get_projects for c in same_user])
+print(dict(hits))
+assert hits["/api/v3/projects"] == 1
+assert all(r == results[0] for r in results)
+
+print("\n--- Different credentials are not coalesced for user-scoped data ---")
+hits.clear()
+others = [OpenProjectClient(api_key=f"user{i}", url=url) for i in range(3)]
+run_concurrently([c.get_projects for c in others])
+assert hits["/api/v3/projects"] == 3
+
+print("\n--- Reference data is shared across credentials ---")
+hits.clear()
+results = run_concurrently([c.get_statuses for c in others] + [c.get_statuses for c in same_user])
+print(dict(hits))
+assert hits["/api/v3/statuses"] == 1
+results[0][0]["name"] = "Mutated" # Each caller owns its copy
+assert others[1].get_statuses()[0]["name"] == "New"
+assert hits["/api/v3/statuses"] == 1 # Served from the shared cache
+
+server.shutdown()
+print("\nSUCCESS: Request coalescing verified.")
@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+# Fresh disk cache for this run (set before the client builds its process-wide HTTP cache)
+cache_dir = tempfile.mkdtemp()
+os.environ["OP_HTTP_CACHE_PATH"] = os.path.join(cache_dir, "http_cache.sqlite")
+
+import op_client
+from op_client import OpenProjectClient
+from stand_in import Reply, StandIn, collection
+
+# Another test in the same process may already have opened the default cache
+stale = op_client._singletons.pop("http_cache", None)
+if stale is not None:
+    stale.close()
+
+# --- Local stand-in for OpenProject honouring If-None-Match ---
+state = {"etag": '"v1"', "full": 0, "not_modified": 0, "name": "Alpha"}
+
+def projects(request):
+    if request.headers.get("If-None-Match") == state["etag"]:
+        state["not_modified"] += 1
+        return Reply(304, headers={"ETag": state["etag"]})
+    state["full"] += 1
+    return Reply(200, collection([{"id": 1, "name": state["name"]}]), headers={"ETag": state["etag"]})
+
+server = StandIn({"GET *": projects})
+url = server.url
+
+print("--- First load: full response, stored with its ETag ---")
+client = OpenProjectClient(api_key="test", url=url)
+expected = [{"id": 1, "name": "Alpha", "parent_id": None}]
+assert client.get_projects() == expected
+assert state["full"] == 1 and state["not_modified"] == 0
+
+print("--- Unchanged: 304, stored result reused ---")
+assert client.get_projects() == expected
+assert state["full"] == 1 and state["not_modified"] == 1
+
+print("--- Restart: new process-wide cache object over the same file still revalidates ---")
+op_client._singletons.pop("http_cache").close()
+restarted = OpenProjectClient(api_key="test", url=url)
+assert restarted.get_projects() == expected
+assert state["full"] == 1 and state["not_modified"] == 2
+
+print("--- Other credentials don't reuse a user-scoped entry ---")
+assert OpenProjectClient(api_key="other", url=url).get_projects() == expected
+assert state["full"] == 2
+
+print("--- Changed upstream: new ETag -> full response ---")
+state["etag"], state["name"] = '"v2"', "Beta"
+assert client.get_projects() == [{"id": 1, "name": "Beta", "parent_id": None}]
+assert state["full"] == 3
+
+print("--- Reference data is shared across credentials ---")
+assert client._fetch_reference("types") == [{"id": 1, "name": "Beta"}]
+assert OpenProjectClient(api_key="other", url=url)._fetch_reference("types") == [{"id": 1, "name": "Beta"}]
+assert state["full"] == 4 and state["not_modified"] == 3
+
+server.shutdown()
+print("\nSUCCESS: Conditional GET revalidation and disk-backed HTTP cache verified.")
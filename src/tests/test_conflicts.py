@@ -0,0 +1,90 @@
+from op_client import OpenProjectClient
+from stand_in import Reply, StandIn, collection
+
+# --- Local stand-in for OpenProject with optimistic locking on one work package ---
+wp = {"id": 7, "subject": "Original", "lockVersion": 4, "percentageDone": 0, "dueDate": None,
+      "estimatedTime": "PT8H", "spentTime": "PT0H", "updatedAt": "2026-10-01T10:00:00Z",
+      "_links": {"status": {"href": "/api/v3/statuses/1", "title": "New"}}}
+STATUSES = {1: "New", 2: "In Progress", 3: "Closed"}
+log = []
+
+def concurrent_edit(**fields):
+    """Someone else saves the work package."""
+    for field, value in fields.items():
+        if field == "status_id":
+            wp["_links"]["status"] = {"href": f"/api/v3/statuses/{value}", "title": STATUSES[value]}
+        else:
+            wp[field] = value
+    wp["lockVersion"] += 1
+
+def get(request):
+    log.append("GET " + request.path)
+    if request.path == "/api/v3/statuses":
+        return collection({"id": i, "name": n, "isClosed": i == 3} for i, n in STATUSES.items())
+    return wp
+
+def patch(request):
+    payload = request.json
+    log.append("PATCH")
+    if payload.pop("lockVersion") != wp["lockVersion"]:
+        return Reply(409, {"errorIdentifier": "urn:openproject-org:api:v3:errors:UpdateConflict"})
+    links = payload.pop("_links", {})
+    if "status" in links:
+        status_id = int(links["status"]["href"].split("/")[-1])
+        payload["_links"] = {"status": {"href": links["status"]["href"], "title": STATUSES[status_id]}}
+    wp.update(payload)
+    wp["lockVersion"] += 1
+    return wp
+
+server = StandIn({"GET *": get, "PATCH *": patch, "POST *": Reply(201, {"id": 1})})
+client = OpenProjectClient(api_key="test", url=server.url)
+
+def load_row():
+    """The Kanban's cached view of the work package as it is now."""
+    row = {"id": 7, "subject": wp["subject"], "lock_version": wp["lockVersion"], "progress": wp["percentageDone"],
+           "dueDate": wp["dueDate"], "estimatedTime": wp["estimatedTime"], "status": wp["_links"]["status"]["title"],
+           "status_id": int(wp["_links"]["status"]["href"].split("/")[-1]), "is_closed": False}
+    client.task_cache.get(("my_tasks",), lambda: [row], force=True)
+    return row
+
+print("--- Non-colliding concurrent edit: refetched and re-applied ---")
+row = load_row()
+concurrent_edit(subject="Renamed by someone else")
+log.clear()
+# The form re-sends the unchanged subject/estimate: only the status is an intended change
+assert client.update_work_package(7, row["lock_version"], subject="Original", estimated_hours=8, status_id=2)
+print(log)
+assert log[:3] == ["PATCH", "GET /api/v3/work_packages/7", "PATCH"]
+assert wp["subject"] == "Renamed by someone else" and wp["_links"]["status"]["title"] == "In Progress"
+
+print("--- Fresh lockVersion from the PATCH response lands in the task cache ---")
+cached = client.task_cache.find_row(7)
+assert cached["lock_version"] == wp["lockVersion"] and cached["status_id"] == 2
+
+print("--- Colliding edit: the same field changed differently server-side -> not overwritten ---")
+row = load_row()
+concurrent_edit(status_id=1)
+assert not client.update_work_package(7, row["lock_version"], status_id=3)
+assert wp["_links"]["status"]["title"] == "New"
+
+print("--- Progress after logging time: cached lockVersion, no extra GET ---")
+row = load_row()
+log.clear()
+assert client.log_time(7, 1.5, progress=40)[0]
+assert log == ["PATCH"] and wp["percentageDone"] == 40
+
+print("--- Concurrent edit already holds our value: nothing left to send ---")
+row = load_row()
+concurrent_edit(percentageDone=60)
+log.clear()
+assert client._patch_work_package(7, row["lock_version"], {"progress": 60})
+assert log == ["PATCH", "GET /api/v3/work_packages/7"]
+
+print("--- Close: uses the conflict-aware path as well ---")
+row = load_row()
+concurrent_edit(dueDate="2026-12-01")
+assert client.close_task(7, row["lock_version"])
+assert wp["_links"]["status"]["title"] == "Closed" and wp["dueDate"] == "2026-12-01"
+
+server.shutdown()
+print("\nSUCCESS: lockVersion conflict resolution and cache write-back verified.")
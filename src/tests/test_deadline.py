@@ -0,0 +1,37 @@
+import time
+
+from op_client import OpenProjectClient, deadline
+from stand_in import StandIn, collection
+
+# --- Local stand-in for OpenProject: fast the first time, then hangs ---
+state = {"slow": False}
+
+def tasks(request):
+    if state["slow"]:
+        time.sleep(2)
+    return collection([{"id": 1, "name": "Task"}])
+
+server = StandIn({"GET *": tasks})
+client = OpenProjectClient(api_key="test", url=server.url)
+
+print("--- Fresh data ---")
+projects = client.get_projects()
+print(projects)
+assert projects == [{"id": 1, "name": "Task", "parent_id": None}]
+
+print("\n--- Upstream hangs: deadline bounds the whole render ---")
+state["slow"] = True
+start = time.monotonic()
+with deadline(0.5) as budget:
+    projects = client.get_projects()   # Times out at the deadline -> cached data
+    users = client.get_users()  # Deadline already spent -> not even sent
+elapsed = time.monotonic() - start
+print(f"Elapsed: {elapsed:.2f}s, degraded: {budget.degraded}")
+
+assert elapsed < 1.5
+assert projects == [{"id": 1, "name": "Task", "parent_id": None}] # Served from last good result
+assert users == [] # Nothing cached yet
+assert budget.degraded == ["get_projects", "get_users"]
+
+server.shutdown()
+print("\nSUCCESS: Deadline propagation and cached fallback verified.")
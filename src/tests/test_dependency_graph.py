@@ -0,0 +1,112 @@
+import random
+import time
+from itertools import permutations
+
+from dependency_graph import DependencyGraph, relation_edge
+from op_client import OpenProjectClient
+from stand_in import StandIn, collection, page
+from views.reports import critical_path_frame
+
+print("--- Relation types map to (before, after) ---")
+assert relation_edge({"type": "precedes", "from": 1, "to": 2}) == (1, 2)
+assert relation_edge({"type": "blocks", "from": 1, "to": 2}) == (1, 2)
+assert relation_edge({"type": "follows", "from": 1, "to": 2}) == (2, 1)
+assert relation_edge({"type": "blocked", "from": 1, "to": 2}) == (2, 1)
+assert relation_edge({"type": "requires", "from": 1, "to": 2}) == (2, 1)
+assert relation_edge({"type": "relates", "from": 1, "to": 2}) is None
+
+print("--- Topological order and cycles ---")
+graph = DependencyGraph([(1, 2), (2, 3), (1, 3), (4, 5), (5, 6), (6, 4), (6, 7), (8, 8)])
+order = {node: i for i, node in enumerate(graph.topological_order())}
+for before, after in [(1, 2), (2, 3), (1, 3), (6, 7)]:
+    assert order[before] < order[after]
+assert sorted(sorted(c) for c in graph.cycles()) == [[4, 5, 6], [8]]
+
+def brute_force(edges, weights, group_of):
+    """Reference: heaviest simple path within each group, over every ordering of its nodes."""
+    best = {}
+    succ = {}
+    for a, b in edges:
+        succ.setdefault(a, set()).add(b)
+    for group in set(group_of.values()):
+        nodes = [n for n in group_of if group_of[n] == group]
+        for size in range(1, len(nodes) + 1):
+            for path in permutations(nodes, size):
+                if all(path[i + 1] in succ.get(path[i], ()) for i in range(size - 1)):
+                    total = sum(weights[n] for n in path)
+                    best[group] = max(best.get(group, 0), total)
+    return best
+
+print("--- Critical paths match a brute force on random DAGs ---")
+rng = random.Random(3)
+for step in range(200):
+    n = rng.randint(2, 7)
+    edges = [(a, b) for a in range(n) for b in range(a + 1, n) if rng.random() < 0.4]
+    weights = {i: rng.randint(0, 8) / 2 for i in range(n)}
+    group_of = {i: rng.choice("ab") for i in range(n) if rng.random() < 0.9}
+    graph = DependencyGraph(edges + [(i, i + 100) for i in range(n)]) # Every node present
+    paths = graph.critical_paths(weights, group_of)
+    expected = brute_force(edges, weights, group_of)
+    for group, (total, path) in paths.items():
+        assert abs(total - expected[group]) < 1e-9, (step, group, total, expected)
+        assert all(group_of[i] == group for i in path)
+        assert all(path[i + 1] in graph.successors[path[i]] for i in range(len(path) - 1))
+
+print("--- Linear time: 100k relations ---")
+edges = [(rng.randint(0, 49999), rng.randint(0, 49999)) for _ in range(100000)]
+start = time.perf_counter()
+graph = DependencyGraph(edges)
+cycles = graph.cycles()
+paths = graph.critical_paths({i: 1.0 for i in range(50000)}, {i: i % 20 for i in range(50000)})
+elapsed = time.perf_counter() - start
+print(f"{len(graph)} nodes, {len(cycles)} cycles, {len(paths)} paths in {elapsed:.2f}s")
+assert elapsed < 5
+
+# --- Client: paginated relations, blockers from the open work packages ---
+RELATIONS = [{"id": i, "type": "blocks", "_links": {"from": {"href": f"/api/v3/work_packages/{i}"},
+                                                     "to": {"href": f"/api/v3/work_packages/{i + 1}"}}}
+             for i in range(1, 6)]
+RELATIONS.append({"id": 9, "type": "relates", "_links": {"from": {"href": "/api/v3/work_packages/1"},
+                                                          "to": {"href": "/api/v3/work_packages/6"}}})
+CLOSED = {1, 3}
+
+def open_work_packages(request):
+    ids = [int(v) for f in request.filters if "id" in f for v in f["id"]["values"]]
+    return collection({"id": i} for i in ids if i not in CLOSED)
+
+server = StandIn({
+    "GET /api/v3/relations": lambda request: page(request, RELATIONS, max_page_size=2), # Server caps the page size at 2
+    "GET /api/v3/work_packages": open_work_packages,
+})
+client = OpenProjectClient(api_key="test", url=server.url)
+
+print("--- Every relation page is fetched; the graph is built once per version ---")
+graph = client.dependency_graph()
+assert [r.path for r in server.requests].count("/api/v3/relations") == 3
+assert sorted(graph.successors) == [1, 2, 3, 4, 5, 6] and graph.successors[1] == {2}
+assert client.dependency_graph() is graph
+
+print("--- Blocked: only tasks waiting on an open work package ---")
+blockers = client.get_blockers([2, 3, 4, 5, 6, 7])
+assert blockers == {3: [2], 5: [4], 6: [5]}, blockers
+
+print("--- Open states cached per work package: other task lists reuse them, the cache stays bounded ---")
+server.requests.clear()
+assert client.get_blockers([3, 6]) == {3: [2], 6: [5]}
+assert "/api/v3/work_packages" not in [r.path for r in server.requests]
+client.open_states.max_size = 2
+client.open_states.invalidate()
+assert client.get_blockers([2, 3, 4, 5, 6, 7]) == blockers
+assert len(client.open_states) == 2
+
+print("--- Critical path per project over open tasks ---")
+tasks = [{"id": i, "subject": f"T{i}", "project_id": 10 if i <= 4 else 20, "is_closed": i in CLOSED,
+          "estimated_hours": float(i)} for i in range(1, 7)]
+frame = critical_path_frame(graph, tasks, [{"id": 10, "name": "Alpha"}, {"id": 20, "name": "Beta"}])
+rows = {r["Proyecto"]: r for r in frame.to_dict("records")}
+assert rows["Beta"]["Ruta"] == "#5 → #6" and rows["Beta"]["Horas Ruta"] == 11.0
+assert rows["Alpha"]["Ruta"] == "#4" and rows["Alpha"]["Siguiente"] == "T4" # 3 is closed: 2 and 4 aren't chained
+assert list(frame["Proyecto"]) == ["Beta", "Alpha"]
+
+server.shutdown()
+print("SUCCESS: Dependency graph, blockers and critical paths verified")
@@ -0,0 +1,66 @@
+import random
+import statistics
+import time
+
+import numpy as np
+
+from views.estimation import accuracy_stats, estimation_frame, ratio_histogram
+
+projects = [
+    {"id": 1, "name": "Alpha", "parent_id": None},
+    {"id": 2, "name": "Alpha Web", "parent_id": 1},
+    {"id": 3, "name": "Beta", "parent_id": None},
+]
+TYPES = ["Task", "Bug", "Feature"]
+PRIORITIES = ["Low", "Normal", "High"]
+
+def task(i, rng):
+    return {"id": i, "project_id": rng.choice([1, 2, 3, 99]), "type": rng.choice(TYPES),
+            "assignee": rng.choice(["Ana", "Bob", None]), "priority": rng.choice(PRIORITIES),
+            "is_closed": rng.random() < 0.7, "estimated_hours": rng.choice([0.0, 1.0, 2.0, 4.0, 8.0]),
+            "spent_hours": rng.randint(0, 20) / 2}
+
+rng = random.Random(5)
+tasks = [task(i, rng) for i in range(3000)]
+
+print("--- Only closed tasks with an estimate; subtree roots resolved ---")
+df = estimation_frame(tasks, projects)
+assert len(df) == sum(1 for t in tasks if t["is_closed"] and t["estimated_hours"] > 0)
+assert set(df["root"]) == {"Alpha", "Beta", "❓ Sin Clasificar"}
+assert len(estimation_frame(tasks, projects, closed_only=False)) == sum(1 for t in tasks if t["estimated_hours"] > 0)
+
+print("--- Grouped statistics match a per-group loop ---")
+roots = {1: "Alpha", 2: "Alpha", 3: "Beta"}
+for by, key in [("root", lambda t: roots.get(t["project_id"], "❓ Sin Clasificar")), ("type", lambda t: t["type"]),
+                ("assignee", lambda t: t["assignee"] or "Unassigned"), ("priority", lambda t: t["priority"])]:
+    stats = accuracy_stats(df, by)
+    groups = {}
+    for t in tasks:
+        if t["is_closed"] and t["estimated_hours"] > 0:
+            groups.setdefault(key(t), []).append(t)
+    assert sorted(stats.index[:-1]) == sorted(groups) and stats.index[-1] == "Total"
+    for name, rows in groups.items():
+        ratios = [t["spent_hours"] / t["estimated_hours"] for t in rows]
+        row = stats.loc[name]
+        assert row["Tareas"] == len(rows)
+        assert abs(row["Ratio Mediana"] - round(statistics.median(ratios), 2)) < 0.011
+        assert abs(row["Ratio P90"] - round(float(np.quantile(ratios, 0.9)), 2)) < 0.011
+        assert abs(row["MAE (h)"] - statistics.mean(abs(t["spent_hours"] - t["estimated_hours"]) for t in rows)) < 0.01
+        assert abs(row["% Sobrecoste"] - 100 * sum(t["spent_hours"] > t["estimated_hours"] for t in rows) / len(rows)) < 0.1
+    assert stats.loc["Total", "Tareas"] == len(df)
+
+print("--- Histogram counts every task once ---")
+hist = ratio_histogram(df)
+assert hist["Tareas"].sum() == len(df) and hist.index[-1] == "> 3.00"
+
+print("--- 100k work packages recompute interactively ---")
+big = [task(i, rng) for i in range(100000)]
+frame = estimation_frame(big, projects)
+start = time.perf_counter()
+for by in ("root", "type", "assignee", "priority"):
+    accuracy_stats(frame[frame["priority"] != "Low"], by)
+elapsed = time.perf_counter() - start
+print(f"4 groupings over {len(frame)} tasks in {elapsed * 1000:.0f} ms")
+assert elapsed < 1.0
+
+print("SUCCESS: Estimation accuracy statistics verified")
@@ -0,0 +1,64 @@
+import os
+import threading
+import time
+
+import op_client
+from op_client import deadline, current_deadline, iter_concurrently, run_concurrently
+
+# A 2-worker shared pool, so the outer fan-out alone takes every worker
+with op_client._singletons_lock:
+    previous = op_client._singletons.get("executor")
+    op_client._singletons["executor"] = op_client._new_executor(2)
+
+def leaf(i):
+    time.sleep(0.05)
+    return i, current_deadline() is not None
+
+def middle(i):
+    # Nested fan-out, as in FederatedClient._fan_out -> _get_all_pages
+    return run_concurrently(*[lambda j=j: leaf(i * 10 + j) for j in range(3)])
+
+results = {}
+def outer():
+    with deadline(10):
+        results["run"] = run_concurrently(*[lambda i=i: middle(i) for i in range(4)])
+        results["iter"] = sorted(i for i, _ in iter_concurrently(*[lambda i=i: middle(i) for i in range(4)]))
+
+print("--- Fan-outs nested inside fan-outs finish on a pool of 2 workers ---")
+sessions = [threading.Thread(target=outer, daemon=True) for _ in range(3)]
+start = time.perf_counter()
+for t in sessions:
+    t.start()
+for t in sessions:
+    t.join(timeout=10)
+print(f"{time.perf_counter() - start:.2f} s")
+assert not any(t.is_alive() for t in sessions), "nested fan-out deadlocked"
+assert results["run"] == [[(i * 10 + j, True) for j in range(3)] for i in range(4)] # Deadline reaches the leaves
+assert results["iter"] == [0, 1, 2, 3]
+
+print("--- A wide nested fan-out runs on at most OP_MAX_IN_FLIGHT threads ---")
+os.environ["OP_MAX_IN_FLIGHT"] = "4"
+active = {"now": 0, "peak": 0}
+active_lock = threading.Lock()
+
+def counted():
+    with active_lock:
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+    time.sleep(0.02)
+    with active_lock:
+        active["now"] -= 1
+
+run_concurrently(lambda: run_concurrently(*[counted for _ in range(40)]))
+del os.environ["OP_MAX_IN_FLIGHT"]
+print(f"Peak threads: {active['peak']}")
+assert active["peak"] == 4
+
+with op_client._singletons_lock:
+    op_client._singletons["executor"].shutdown(wait=False)
+    if previous is None:
+        op_client._singletons.pop("executor")
+    else:
+        op_client._singletons["executor"] = previous
+
+print("SUCCESS: Nested fan-outs verified")
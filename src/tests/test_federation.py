@@ -0,0 +1,126 @@
+import time
+
+from federation import FederatedClient, instance_aliases, split_id
+from stand_in import StandIn, collection
+from views.reports import task_frame
+
+# Each list query takes this long on either instance
+DELAY = 0.4
+
+
+def start_instance(me_id, statuses, work_packages, relations=()):
+    """Local stand-in for one OpenProject instance. Returns (base url, request log)."""
+    log = []
+
+    def wp(i, project_id, assignee_id, status_id):
+        return {"id": i, "subject": f"T{i}", "updatedAt": "2026-10-01T10:00:00Z", "lockVersion": 1, "percentageDone": 0,
+                "estimatedTime": "PT2H", "spentTime": "PT0H",
+                "_links": {"status": {"href": f"/api/v3/statuses/{status_id}", "title": statuses[status_id]},
+                           "priority": {"title": "Normal"}, "project": {"href": f"/api/v3/projects/{project_id}", "title": "P"},
+                           "assignee": {"href": f"/api/v3/users/{assignee_id}", "title": f"User {assignee_id}"}}}
+
+    def get(request):
+        log.append(("GET", request.path))
+        if request.path == "/api/v3/users/me":
+            return {"id": me_id, "firstName": "Ana", "lastName": "Ruiz"}
+        if request.path == "/api/v3/users":
+            elements = [{"id": me_id, "firstName": "Ana", "lastName": "Ruiz"}, {"id": 6, "firstName": "Luis"}]
+        elif request.path == "/api/v3/projects":
+            elements = [{"id": 1, "name": "Root", "_links": {"parent": None}},
+                        {"id": 2, "name": "Child", "_links": {"parent": {"href": "/api/v3/projects/1"}}}]
+        elif request.path == "/api/v3/statuses":
+            elements = [{"id": i, "name": n, "isClosed": n == "Closed"} for i, n in statuses.items()]
+        elif request.path == "/api/v3/relations":
+            elements = [{"id": i, "type": "blocks", "_links": {"from": {"href": f"/api/v3/work_packages/{a}"},
+                                                              "to": {"href": f"/api/v3/work_packages/{b}"}}}
+                        for i, (a, b) in enumerate(relations, 1)]
+        elif request.path == "/api/v3/work_packages":
+            time.sleep(DELAY)
+            elements = [wp(*w) for w in work_packages]
+        else:
+            elements = []
+        return collection(elements, total=len(elements))
+
+    def patch(request):
+        log.append(("PATCH", request.path, request.json))
+        wp_id = int(request.path.split("/")[-1])
+        status_id = int(request.json["_links"]["status"]["href"].split("/")[-1])
+        return dict(wp(wp_id, 2, me_id, status_id), lockVersion=2)
+
+    return StandIn({"GET *": get, "PATCH *": patch}).url, log
+
+
+# Same person: user 5 on the internal instance, user 9 on the client-facing one
+url_a, log_a = start_instance(5, {1: "New", 2: "In Progress", 3: "Closed", 4: "Blocked"}, [(10, 2, 5, 1), (11, 1, 6, 1)], relations=[(11, 10)])
+url_b, log_b = start_instance(9, {21: "New", 22: "In Progress", 23: "Closed"}, [(10, 1, 9, 21)])
+client = FederatedClient([("Interno", "key-a", url_a), ("Cliente Externo", "key-b", url_b)])
+
+print("--- Aliases: slugged, unique ---")
+assert client.aliases == ["interno", "cliente-externo"]
+assert client.scope != FederatedClient([("Interno", "key-a", url_a), ("Cliente Externo", "key-c", url_b)]).scope # Per-user memos
+assert instance_aliases(["Diseño", "diseño", "??"]) == ["diseno", "diseno-2", "op"]
+
+print("--- Fan-out: latency of the slowest instance, not the sum ---")
+me = client.get_me()
+assert me["id"] == "interno:5"
+start = time.perf_counter()
+cached = client.get_all_tasks_cached(assignee_id=None)
+elapsed = time.perf_counter() - start
+print(f"{elapsed:.2f} s for two instances of {DELAY} s each")
+assert elapsed < DELAY * 1.8
+
+print("--- Merged rows: instance-qualified ids, linked 'me', per-instance caches ---")
+tasks = {t["id"]: t for t in cached.value}
+assert set(tasks) == {"interno:10", "interno:11", "cliente-externo:10"}
+assert tasks["cliente-externo:10"]["assignee_id"] == "interno:5" == tasks["interno:10"]["assignee_id"]
+assert tasks["interno:11"]["assignee_id"] == "interno:6" and tasks["interno:11"]["instance"] == "Interno"
+members = dict(client.members())
+assert [t["id"] for t in members["cliente-externo"].task_cache.peek(("all_tasks", None))] == [10]
+assert client.get_all_tasks_cached(assignee_id=None).value is cached.value # Qualified once per version
+assert task_frame(cached.value)["assignee_id"].tolist().count("interno:5") == 2
+
+projects = {p["id"]: p for p in client.get_projects()}
+assert projects["cliente-externo:1"]["name"] == "Cliente Externo › Root"
+assert projects["cliente-externo:2"] == dict(projects["cliente-externo:2"], parent_id="cliente-externo:1", name="Child")
+assert client.project_index().search("externo child") == ["cliente-externo:2"]
+
+users = {u["name"]: u["id"] for u in client.get_users()}
+assert users == {"Ana Ruiz (Interno)": "interno:5", "Luis (Interno)": "interno:6", "Luis (Cliente Externo)": "cliente-externo:6"}
+
+print("--- Assignee filters route to the right instances ---")
+mine = client.get_all_tasks_cached(assignee_id=me["id"])
+assert sorted(t["id"] for t in mine.value) == ["cliente-externo:10", "interno:10", "interno:11"] # Stand-ins ignore filters
+assert members["interno"].task_cache.peek(("all_tasks", "me")) is not None
+only_b = client.get_all_tasks_cached(assignee_id="cliente-externo:6")
+assert {t["id"] for t in only_b.value} == {"cliente-externo:10"}
+assert client.task_cache.version(("all_tasks", "cliente-externo:6")) == only_b.version
+
+print("--- Blockers and dependency graph stay within their instance ---")
+assert client.get_blockers(["interno:10", "cliente-externo:10"]) == {"interno:10": ["interno:11"]}
+assert client.dependency_graph().predecessors["interno:10"] == {"interno:11"}
+
+print("--- Writes go to the task's instance; statuses are matched by name ---")
+statuses = {s["name"]: s["id"] for s in client.get_statuses()}
+assert statuses["In Progress"] == "interno:2"
+client.get_my_tasks_cached()
+assert client.update_work_package("cliente-externo:10", 1, status_id=statuses["In Progress"])
+patch = [entry for entry in log_b if entry[0] == "PATCH"]
+assert patch and patch[0][1] == "/api/v3/work_packages/10" and patch[0][2]["_links"]["status"]["href"].endswith("/22")
+assert not any(entry[0] == "PATCH" for entry in log_a)
+assert split_id("cliente-externo:10") == ("cliente-externo", 10)
+
+print("--- A status the task's instance lacks: refused, not silently dropped ---")
+patches = len([entry for entry in log_b if entry[0] == "PATCH"])
+try:
+    client.update_work_package("cliente-externo:10", 1, status_id=statuses["Blocked"])
+    raise AssertionError("expected ValueError")
+except ValueError as e:
+    print(f"Refused as expected: {e}")
+    assert "Blocked" in str(e) and "Cliente Externo" in str(e)
+assert len([entry for entry in log_b if entry[0] == "PATCH"]) == patches
+
+print("--- Progressive load: every instance's shards, qualified ---")
+roots = sorted(str(root["id"]) for root, _ in client.iter_task_shards(None))
+assert roots == ["None", "None", "cliente-externo:1", "interno:1"]  # Plus each instance's catch-all shard
+
+print("\nSUCCESS: Multi-instance federation verified")
@@ -0,0 +1,94 @@
+import op_client
+from op_client import OpenProjectClient
+from stand_in import Reply, StandIn, collection
+
+# --- Local stand-in for OpenProject: assigning requires membership (422 otherwise) ---
+# User 5 is a direct member of project 1 and, through group 40, of project 6
+state = {"members": {1}, "group_projects": {6}, "groups_visible": True, "memberships_up": True, "log": [], "joined": []}
+
+def get(request):
+    state["log"].append(("GET", request.path))
+    if request.path == "/api/v3/users/me":
+        return {"id": 5, "_links": {"self": {"href": "/api/v3/users/5"}}}
+    if request.path == "/api/v3/groups":
+        members = {"members": [{"href": "/api/v3/users/9"}, {"href": "/api/v3/users/5"}]} if state["groups_visible"] else {}
+        return collection([{"id": 40, "name": "Diseño", "_links": members},
+                           {"id": 41, "name": "Ventas", "_links": {"members": [{"href": "/api/v3/users/9"}]}}])
+    if request.path == "/api/v3/memberships":
+        if not state["memberships_up"]:
+            return Reply(500, {})
+        principals = {int(v) for f in request.filters for v in f["principal"]["values"]}
+        memberships = [(5, pid) for pid in state["members"]] + [(40, pid) for pid in state["group_projects"]]
+        return collection([{"id": i, "_links": {"project": {"href": f"/api/v3/projects/{pid}"}}}
+                           for i, (principal, pid) in enumerate(memberships, 10) if principal in principals]
+                          + [{"id": 1, "_links": {"project": {"href": None}}}]) # Global membership
+    if request.path == "/api/v3/roles":
+        return collection([{"id": 1, "name": "Admin"}, {"id": 7, "name": "Miembro"}])
+    return Reply(404, {})
+
+def post(request):
+    payload = request.json
+    state["log"].append(("POST", request.path))
+    project_id = int(payload["_links"]["project"]["href"].split("/")[-1])
+    if request.path == "/api/v3/memberships":
+        assert payload["_links"]["roles"] == [{"href": "/api/v3/roles/7"}]
+        state["members"].add(project_id)
+        state["joined"].append(project_id)
+        return Reply(201, {"id": 10})
+    if project_id not in state["members"] | state["group_projects"]:
+        return Reply(422, {"errorIdentifier": "urn:openproject-org:api:v3:errors:PropertyConstraintViolation",
+                           "_embedded": {"details": {"attribute": "assignee"}}})
+    return Reply(201, {"id": 100})
+
+server = StandIn({"GET *": get, "POST *": post})
+url = server.url
+client = OpenProjectClient(api_key="test", url=url)
+
+print("--- Member already: index loaded once, no join ---")
+assert client.create_work_package(1, "A", 1)["id"] == 100
+assert client.get_member_project_ids() == {1, 6}
+assert state["joined"] == []
+
+print("--- Member through a group: no extra direct membership ---")
+assert client.create_work_package(6, "G", 1)["id"] == 100
+assert client.ensure_memberships([6]) == set() and state["joined"] == []
+
+print("--- New project: pre-joined before the write, no failed 422 ---")
+state["log"].clear()
+assert client.create_work_package(2, "B", 1)["id"] == 100
+print(state["log"])
+assert state["joined"] == [2]
+assert ("GET", "/api/v3/memberships") not in state["log"]
+assert state["log"][-2:] == [("POST", "/api/v3/memberships"), ("POST", "/api/v3/work_packages")]
+
+print("--- Second task in the same project: a single round-trip ---")
+state["log"].clear()
+client.create_work_package(2, "C", 1)
+assert state["log"] == [("POST", "/api/v3/work_packages")]
+
+print("--- Batch pre-join only joins the missing projects; role id resolved once per instance ---")
+assert client.ensure_memberships([1, 2, 3, 4, 6]) == {3, 4}
+assert sorted(state["joined"]) == [2, 3, 4]
+assert op_client._get_member_roles()[url] == 7
+
+print("--- Memberships can't be listed: falls back to the 422 auto-join ---")
+state["memberships_up"] = False
+other = OpenProjectClient(api_key="other", url=url)
+assert other.get_member_project_ids() is None
+state["log"].clear()
+assert other.create_work_package(8, "D", 1)["id"] == 100
+assert ("GET", "/api/v3/memberships") not in state["log"] # Refusal remembered
+assert state["joined"][-1] == 8
+
+print("--- Groups' members not visible: no index, so no pre-join for a possible group member ---")
+state["memberships_up"] = True
+state["groups_visible"] = False
+hidden = OpenProjectClient(api_key="hidden-groups", url=url)
+assert hidden.get_member_project_ids() is None
+assert hidden.ensure_memberships([6, 9]) == set()
+state["log"].clear()
+assert hidden.create_work_package(6, "H", 1)["id"] == 100
+assert ("POST", "/api/v3/memberships") not in state["log"]
+
+server.shutdown()
+print("\nSUCCESS: Membership index, batched pre-join and cached member role verified.")
@@ -0,0 +1,30 @@
+from project_tree import build_hierarchy, project_paths
+
+# Mock Data (children listed before their parents on purpose)
+projects = [
+    {"id": 4, "name": "Grandchild Project A.1.a", "parent_id": 2},
+    {"id": 1, "name": "Root Project A", "parent_id": None},
+    {"id": 2, "name": "Child Project A.1", "parent_id": 1},
+    {"id": 3, "name": "Root Project B", "parent_id": None},
+    {"id": 5, "name": "Broken Chain", "parent_id": 999},
+]
+
+print("--- Hierarchy ---")
+children, roots = build_hierarchy(projects)
+assert [r["id"] for r in roots] == [1, 3]
+assert [c["id"] for c in children[2]] == [4]
+
+print("--- Paths for the single grid ---")
+paths = project_paths(projects)
+for pid, (root, path) in paths.items():
+    print(f"{pid}: [{root}] {path}")
+
+assert paths[4] == ("Root Project A", "Root Project A › Child Project A.1 › Grandchild Project A.1.a")
+assert paths[3] == ("Root Project B", "Root Project B")
+assert paths[5] == ("Broken Chain", "Broken Chain")
+
+# Cycles don't loop forever
+cyclic = [{"id": 1, "name": "X", "parent_id": 2}, {"id": 2, "name": "Y", "parent_id": 1}]
+assert set(project_paths(cyclic)) == {1, 2}
+
+print("\nSUCCESS: Project paths verified.")
@@ -0,0 +1,32 @@
+from views.reports import build_cube, slice_cube, task_frame
+
+tasks = [
+    {"id": 10, "project_id": 1, "assignee_id": 5, "status": "New", "is_closed": False, "progress": 0, "estimatedTime": "PT10H", "spentTime": "PT0H"},
+    {"id": 11, "project_id": 2, "assignee_id": 5, "status": "In Progress", "is_closed": False, "progress": 50, "estimatedTime": "PT20H", "spentTime": "PT10H"},
+    {"id": 12, "project_id": 2, "assignee_id": 6, "status": "Closed", "is_closed": True, "progress": 100, "estimatedTime": "PT5H", "spentTime": "PT5H"},
+    {"id": 13, "project_id": 3, "assignee_id": None, "status": "New", "is_closed": False, "progress": 0, "estimatedTime": None, "spentTime": None},
+    {"id": 99, "project_id": 999, "assignee_id": 6, "status": "New", "is_closed": False, "progress": 20, "estimatedTime": "PT1H", "spentTime": "PT30M"},
+]
+
+df = task_frame(tasks)
+cube = build_cube(df)
+print(cube)
+
+print("--- Everybody: per-project totals over all assignees ---")
+everyone = slice_cube(cube)
+assert everyone.loc[2, "total"] == 2 and everyone.loc[2, "closed"] == 1
+assert everyone.loc[2, "hours_est"] == 25.0 and everyone.loc[2, "progress_sum"] == 150
+assert everyone.loc[3, "total"] == 1 # Unassigned tasks are kept
+
+print("--- One assignee: a slice, identical to filtering the tasks first ---")
+for assignee_id in (5, 6):
+    sliced = slice_cube(cube, assignee_id)
+    direct = slice_cube(build_cube(df[df["assignee_id"] == assignee_id]))
+    assert sliced.equals(direct), (assignee_id, sliced, direct)
+assert list(slice_cube(cube, 6).index) == [2, 999]
+assert slice_cube(cube, 6).loc[999, "hours_spent"] == 0.5
+
+print("--- Unknown assignee: empty slice ---")
+assert slice_cube(cube, 42).empty
+
+print("\nSUCCESS: Project × assignee cube and slicing verified.")
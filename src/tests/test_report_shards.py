@@ -0,0 +1,105 @@
+import time
+
+from op_client import OpenProjectClient
+from report_state import ALL
+from stand_in import StandIn, collection
+from views.reports import project_report, totals_frame
+
+# Roots 1 (with child 2 and grandchild 3), 4 and 5; project 6 hangs from an invisible parent
+projects = [
+    {"id": 1, "name": "Root", "parent_id": None},
+    {"id": 2, "name": "Child", "parent_id": 1},
+    {"id": 3, "name": "Grandchild", "parent_id": 2},
+    {"id": 4, "name": "Slow", "parent_id": None},
+    {"id": 5, "name": "Small", "parent_id": None},
+    {"id": 6, "name": "Shared", "parent_id": 99},
+]
+# Per-project delay of the work package query (seconds)
+DELAYS = {4: 0.8}
+# (id, project); project 42 is invisible, so work package 8 only comes back in the catch-all shard
+work_packages = [(1, 1), (2, 2), (3, 3), (4, 4), (5, 4), (6, 5), (7, 6), (8, 42)]
+queries = []
+
+def wp(i, project_id):
+    return {"id": i, "subject": f"T{i}", "updatedAt": f"2026-10-0{i}T10:00:00Z", "lockVersion": 1, "percentageDone": 50,
+            "estimatedTime": "PT4H", "spentTime": "PT1H",
+            "_links": {"status": {"href": "/api/v3/statuses/1", "title": "New"},
+                       "priority": {"title": "Normal"}, "project": {"href": f"/api/v3/projects/{project_id}", "title": "P"},
+                       "assignee": {"href": "/api/v3/users/5", "title": "Ana"}}}
+
+def work_packages_of(request):
+    project = next((f["project"] for f in request.filters if "project" in f), None)
+    ids = set(int(v) for v in project["values"]) if project else None
+    excluded = project is not None and project["operator"] == "!"
+    queries.append(("!" if excluded else "=", tuple(sorted(ids))) if ids else None)
+    time.sleep(max((DELAYS.get(pid, 0) for pid in ids or DELAYS), default=0) if not excluded else 0)
+    rows = [wp(i, pid) for i, pid in work_packages if ids is None or (pid in ids) != excluded]
+    return collection(rows, total=len(rows) + missing["rows"])
+
+missing = {"rows": 0}  # Reported in the total but never listed, as when the list changes while paging
+
+server = StandIn({
+    "GET /api/v3/projects": collection(
+        {"id": p["id"], "name": p["name"],
+         "_links": {"parent": {"href": f"/api/v3/projects/{p['parent_id']}"} if p["parent_id"] else None}}
+        for p in projects),
+    "GET /api/v3/work_packages": work_packages_of,
+    "GET *": collection([]),
+})
+client = OpenProjectClient(api_key="test", url=server.url)
+
+print("--- Shards: one per root subtree, orphaned subtrees included ---")
+shards = {root["id"]: ids and set(ids) for root, ids in client.project_shards(projects)}
+assert shards == {1: {1, 2, 3}, 4: {4}, 5: {5}, 6: {6}, None: None}, shards
+
+print("--- Shards arrive fastest first; the slow one doesn't hold back the others ---")
+start = time.perf_counter()
+arrivals = []
+for root, tasks in client.iter_task_shards(None, projects):
+    arrivals.append((root["id"], len(tasks), time.perf_counter() - start))
+print(arrivals)
+assert arrivals[-1][0] == 4 and arrivals[-1][1] == 2
+assert all(elapsed < 0.5 for _, _, elapsed in arrivals[:-1]) # Time to first content: the fast shards
+assert sorted(queries) == [("!", (1, 2, 3, 4, 5, 6)), ("=", (1, 2, 3)), ("=", (4,)), ("=", (5,)), ("=", (6,))]
+
+print("--- Once complete, the merged dataset and report state are served from the cache ---")
+queries.clear()
+cached = client.get_all_tasks_cached(assignee_id=None)
+assert sorted(t["id"] for t in cached.value) == [1, 2, 3, 4, 5, 6, 7, 8]
+assert queries == [] and not cached.stale
+state = client.report_state()
+assert state.total() == 8
+assert state.project_totals(rolled=True)[1]["total"] == 3
+
+print("--- Partial report only lists the loaded roots ---")
+partial = {1: {"total": 3, "closed": 0, "progress_sum": 150, "hours_est": 12.0, "hours_spent": 3.0}}
+report_df, chart_df = project_report(totals_frame(partial), totals_frame(partial), projects, root_ids={1})
+assert report_df["Proyecto"].str.contains("Root").any() and not report_df["Proyecto"].str.contains("Slow").any()
+full_df, _ = project_report(totals_frame(state.project_totals(ALL)), totals_frame(state.project_totals(ALL, rolled=True)), projects)
+# Project 6's parent is invisible: not in the tree table (as before); work package 8 is unclassified
+assert full_df["Total Tareas"].sum() == 7
+assert full_df.set_index("Proyecto").loc["❓ Sin Clasificar", "Total Tareas"] == 1
+
+print("--- An incomplete shard: nothing stored, the next read runs a full sync ---")
+missing["rows"] = 1
+fresh = OpenProjectClient(api_key="test-incomplete", url=server.url)
+assert len([root for root, _ in fresh.iter_task_shards(None, projects)]) == 5
+assert fresh.task_cache.peek(("all_tasks", None)) is None and fresh.report_state() is None
+missing["rows"] = 0
+queries.clear()
+assert sorted(t["id"] for t in fresh.get_all_tasks_cached(assignee_id=None).value) == [1, 2, 3, 4, 5, 6, 7, 8]
+assert queries == [None]  # One unfiltered list, not a delta
+
+print("--- A failing shard surfaces to the caller and leaves the cache untouched ---")
+failing = OpenProjectClient(api_key="test", url="http://127.0.0.1:9") # Nothing listens there
+failed = False
+try:
+    list(failing.iter_task_shards(None, projects))
+except Exception as e:
+    print(f"Shard load failed as expected: {type(e).__name__}")
+    failed = True
+assert failed
+assert failing.task_cache.peek(("all_tasks", None)) is None
+
+server.shutdown()
+print("SUCCESS: Reports load progressively by root project shard")
@@ -0,0 +1,151 @@
+import random
+import time
+
+from op_client import OpenProjectClient
+from report_state import ALL, ReportState
+from stand_in import StandIn, collection, page
+
+# Tree: 1 -> 2 -> 3, plus root 4
+projects = [
+    {"id": 1, "name": "Root", "parent_id": None},
+    {"id": 2, "name": "Child", "parent_id": 1},
+    {"id": 3, "name": "Grandchild", "parent_id": 2},
+    {"id": 4, "name": "Other", "parent_id": None},
+]
+
+def task(i, project_id, assignee_id=5, closed=False, est=2.0, spent=1.0, progress=10, updated="2026-10-01T10:00:00Z"):
+    return {"id": i, "project_id": project_id, "assignee_id": assignee_id, "is_closed": closed, "progress": progress,
+            "estimated_hours": est, "spent_hours": spent, "updated_at": updated}
+
+def recompute(tasks, assignee=ALL, rolled=False):
+    """Reference: full recompute of the same metrics."""
+    parents = {p["id"]: p["parent_id"] for p in projects}
+    out = {}
+    for t in tasks:
+        if assignee != ALL and t["assignee_id"] != assignee:
+            continue
+        targets = [t["project_id"]]
+        while rolled and parents.get(targets[-1]):
+            targets.append(parents[targets[-1]])
+        for pid in targets:
+            acc = out.setdefault(pid, {"total": 0, "closed": 0, "progress_sum": 0, "hours_est": 0.0, "hours_spent": 0.0})
+            acc["total"] += 1
+            acc["closed"] += int(t["is_closed"])
+            acc["progress_sum"] += t["progress"]
+            acc["hours_est"] += t["estimated_hours"]
+            acc["hours_spent"] += t["spent_hours"]
+    return out
+
+def same(a, b):
+    return a.keys() == b.keys() and all(abs(a[k][f] - b[k][f]) < 1e-6 for k in a for f in a[k])
+
+print("--- Initial load: direct and rolled-up totals ---")
+tasks = {t["id"]: t for t in [task(1, 1), task(2, 2, closed=True), task(3, 3, assignee_id=6), task(4, 4, assignee_id=None)]}
+state = ReportState(projects, tasks.values())
+assert state.project_totals(rolled=True)[1]["total"] == 3
+assert state.project_totals(6, rolled=True)[1]["total"] == 1
+assert state.project_totals()[4]["total"] == 1 # Unassigned still counted for everybody
+
+print("--- Random deltas stay equal to a full recompute ---")
+rng = random.Random(7)
+for step in range(300):
+    if tasks and rng.random() < 0.2:
+        removed = rng.choice(list(tasks))
+        del tasks[removed]
+        state.apply(removed=[removed])
+    else:
+        t = task(rng.randint(1, 30), rng.randint(1, 4), rng.choice([5, 6, None]), rng.random() < 0.3,
+                 rng.randint(0, 10) / 2, rng.randint(0, 10) / 2, rng.randint(0, 100))
+        tasks[t["id"]] = t
+        state.apply(changed=[t])
+    for assignee in (ALL, 5, 6, None):
+        for rolled in (False, True):
+            assert same(state.project_totals(assignee, rolled), recompute(tasks.values(), assignee, rolled)), step
+
+print("--- 50k work packages: a handful of edits is applied in milliseconds ---")
+big = [task(i, rng.randint(1, 4), rng.randint(1, 50)) for i in range(50000)]
+big_state = ReportState(projects, big)
+edits = [dict(big[i], progress=100, is_closed=True) for i in range(0, 50000, 5000)]
+start = time.perf_counter()
+big_state.apply(changed=edits)
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(f"10 edits applied in {elapsed_ms:.3f} ms")
+assert elapsed_ms < 20
+assert big_state.project_totals(rolled=True)[1]["closed"] == 10 - sum(1 for e in edits if e["project_id"] == 4)
+
+# --- Client: incremental sync driven by updatedAt ---
+server_tasks = {}
+queries = []
+unfiltered = []
+PAGE_CAP = 100
+shifting = False
+
+def wp(i, project_id, updated, est="PT4H"):
+    server_tasks[i] = {"id": i, "subject": f"T{i}", "updatedAt": updated, "lockVersion": 1, "percentageDone": 0,
+                       "estimatedTime": est, "spentTime": "PT1H",
+                       "_links": {"status": {"href": "/api/v3/statuses/1", "title": "New"},
+                                  "priority": {"title": "Normal"}, "project": {"href": f"/api/v3/projects/{project_id}", "title": "P"},
+                                  "assignee": {"href": "/api/v3/users/5", "title": "Ana"}}}
+
+def work_packages_since(request):
+    unfiltered.append("filters" not in request.query) # OpenProject would only return open work packages
+    since = next((f["updatedAt"]["values"][0] for f in request.filters if "updatedAt" in f), None)
+    queries.append(since)
+    matching = sorted((w for w in server_tasks.values() if since is None or w["updatedAt"] >= since),
+                      key=lambda w: w["updatedAt"], reverse=True)
+    if shifting and int(request.query.get("offset", 1)) > 1:
+        # As if the first element of page 2 was edited after page 1 went out: it moves to the top
+        matching.insert(0, matching.pop(min(int(request.query["pageSize"]), PAGE_CAP)))
+    return page(request, matching, max_page_size=PAGE_CAP) # Page size capped by the server
+
+server = StandIn({
+    "GET /api/v3/projects": collection(
+        {"id": p["id"], "name": p["name"],
+         "_links": {"parent": {"href": f"/api/v3/projects/{p['parent_id']}"} if p["parent_id"] else None}}
+        for p in projects),
+    "GET /api/v3/work_packages": work_packages_since,
+    "GET *": collection([]),
+})
+client = OpenProjectClient(api_key="test", url=server.url)
+
+print("--- First load is full; later refreshes only ask for what changed ---")
+wp(1, 3, "2026-10-01T10:00:00Z")
+wp(2, 4, "2026-10-02T10:00:00Z")
+assert len(client.get_all_tasks_cached(assignee_id=None).value) == 2
+assert queries == [None] and not any(unfiltered) # "filters=[]" even for every assignee and project
+assert client.report_state().project_totals(rolled=True)[1]["hours_est"] == 4.0
+
+wp(1, 3, "2026-10-03T10:00:00Z", est="PT10H") # Edited
+wp(3, 2, "2026-10-03T11:00:00Z") # Created
+tasks = client.get_all_tasks_cached(assignee_id=None, force=True).value
+assert queries[-1] == "2026-10-02T10:00:00Z"
+assert sorted(t["id"] for t in tasks) == [1, 2, 3]
+rolled = client.report_state().project_totals(rolled=True)
+assert rolled[1]["hours_est"] == 14.0 and rolled[1]["total"] == 2 and rolled[4]["total"] == 1
+
+print("--- More work packages than fit in one page: every page is loaded ---")
+for i in range(4, 1204):
+    wp(i, 4, "2026-10-04T10:00:00Z")
+tasks = client.get_all_tasks_cached(assignee_id=None, force=True).value
+assert len(tasks) == 1203
+assert queries.count("2026-10-03T11:00:00Z") == 13 # 1,201 matches (task 3 sits on the watermark) in pages of 100, the server cap
+assert client.report_state().project_totals(rolled=True)[4]["total"] == 1201
+assert not any(unfiltered)
+
+print("--- A list that shifts between pages removes nothing and keeps the watermark ---")
+del server_tasks[2]
+shifting = True
+with client._lock:
+    client._last_full_sync = float("-inf") # Next refresh is a full sync
+    watermark = client._tasks_watermark
+tasks = client.get_all_tasks_cached(assignee_id=None, force=True).value
+assert len(tasks) == 1203 and 2 in {t["id"] for t in tasks} # Not seen, but the list was incomplete
+assert client._tasks_watermark == watermark and client._last_full_sync == float("-inf")
+assert client.report_state().project_totals(rolled=True)[4]["total"] == 1201
+shifting = False
+tasks = client.get_all_tasks_cached(assignee_id=None, force=True).value # Full again, now complete
+assert len(tasks) == 1202 and 2 not in {t["id"] for t in tasks}
+assert client.report_state().project_totals(rolled=True)[4]["total"] == 1200
+
+server.shutdown()
+print("\nSUCCESS: Incremental per-project and ancestor accumulators verified.")
@@ -9,14 +9,14 @@ projects = [
 
 tasks = [
     # Program A (Direct)
-    {"id": 10, "project_id": 1, "status": "New", "progress": 0, "estimatedTime": "PT10H", "spentTime": "PT0H"},
+    {"id": 10, "project_id": 1, "status": "New", "is_closed": False, "progress": 0, "estimatedTime": "PT10H", "spentTime": "PT0H"},
     # Project A.1
-    {"id": 11, "project_id": 2, "status": "In Progress", "progress": 50, "estimatedTime": "PT20H", "spentTime": "PT10H"},
-    {"id": 12, "project_id": 2, "status": "Closed", "progress": 100, "estimatedTime": "PT5H", "spentTime": "PT5H"},
+    {"id": 11, "project_id": 2, "status": "In Progress", "is_closed": False, "progress": 50, "estimatedTime": "PT20H", "spentTime": "PT10H"},
+    {"id": 12, "project_id": 2, "status": "Closed", "is_closed": True, "progress": 100, "estimatedTime": "PT5H", "spentTime": "PT5H"},
     # Project A.2
-    {"id": 13, "project_id": 3, "status": "New", "progress": 0, "estimatedTime": None, "spentTime": None},
+    {"id": 13, "project_id": 3, "status": "New", "is_closed": False, "progress": 0, "estimatedTime": None, "spentTime": None},
     # Orphan
-    {"id": 99, "project_id": 999, "status": "New", "progress": 0, "estimatedTime": "PT1H", "spentTime": None},
+    {"id": 99, "project_id": 999, "status": "New", "is_closed": False, "progress": 0, "estimatedTime": "PT1H", "spentTime": None},
 ]
 
 print("--- Mock Data Prepared ---")
@@ -46,6 +46,7 @@ for col in ["spentTime", "estimatedTime", "project_id"]:
 df["Horas Estimadas"] = df["estimatedTime"].apply(parse_iso_duration)
 df["Horas Imputadas"] = df["spentTime"].apply(parse_iso_duration)
 df["status"] = df["status"].astype(str)
+df["Cierre"] = pd.Categorical.from_codes(df["is_closed"].fillna(False).astype(bool).astype(int), categories=["open", "closed"])
 
 project_map = {p["id"]: p for p in projects}
 project_children = {}
@@ -65,7 +66,7 @@ def process_project(p, depth=0):
     p_tasks = df[df["project_id"] == p_id]
     
     total_tasks = len(p_tasks)
-    closed_tasks = len(p_tasks[p_tasks["status"].str.contains("Close|Cerrad|Finaliza|Done|Reject", case=False, regex=True)])
+    closed_tasks = int((p_tasks["Cierre"] == "closed").sum())
     
     avg_progress = p_tasks["progress"].mean() if total_tasks > 0 else 0
     
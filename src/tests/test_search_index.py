@@ -0,0 +1,66 @@
+import random
+import time
+
+from op_client import OpenProjectClient
+from search_index import SearchIndex
+
+docs = [
+    (1, "Alpha", "Alpha"),
+    (2, "Alpha › Diseño Web", "Alpha › Diseño Web"),
+    (3, "Beta › Web", "Beta › Web"),
+    (4, "Beta › Backend", "Beta › Backend"),
+    (5, "Webinar", "Webinar"),
+    (6, "Cobweb", "Cobweb"),
+]
+index = SearchIndex(docs)
+
+print("--- Exact token, then prefix, then substring matches ---")
+assert index.search("web") == [2, 3, 5, 6]
+assert index.search("alpha web") == [2] # Every term must match
+assert index.search("diseno") == [2] and index.search("DISEÑO") == [2] # Case and accents ignored
+assert index.search("we") == [2, 3, 5] # Short terms match word starts only
+assert index.search("b") == [3, 4]
+assert index.search("nomatch") == [] and index.search("ab") == []
+
+print("--- Recent use breaks ties and leads the empty query ---")
+recent = {3: 200.0, 6: 100.0}
+assert index.search("web", recent=recent) == [3, 2, 5, 6]
+assert index.search("", limit=3, recent=recent) == [3, 6, 1]
+
+print("--- Incremental sync: only changed documents are re-indexed ---")
+updated = [d for d in docs if d[0] != 4] + [(3, "Beta › Frontend", "Beta › Frontend"), (7, "Gamma", "Gamma")]
+updated = [d for d in updated if d != (3, "Beta › Web", "Beta › Web")]
+assert index.sync(updated) == 3 # 4 removed, 3 changed, 7 added
+assert index.search("backend") == [] and index.search("front") == [3] and index.search("gam") == [7]
+assert index.search("web") == [2, 5, 6]
+assert index.sync(updated) == 0
+
+print("--- Typeahead over 20k documents stays sub-millisecond ---")
+rng = random.Random(1)
+syllables = ["ma", "po", "ri", "ta", "lu", "ne", "ca", "so", "di", "ve", "ro", "gi"]
+words = ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(3000)]
+big = SearchIndex((i, f"#{i}", f"{i} " + " ".join(rng.sample(words, 4))) for i in range(20000))
+queries = [words[0][:4], f"{words[1]} {words[2][:3]}", words[3][:2], "1234", words[4][1:5]]
+start = time.perf_counter()
+for _ in range(50):
+    for q in queries:
+        big.search(q, limit=20)
+per_query_ms = (time.perf_counter() - start) * 1000 / (50 * len(queries))
+print(f"{per_query_ms:.3f} ms per query")
+assert big.search("1234")[0] == 1234
+assert per_query_ms < 5 # Generous bound for slow CI machines; typically well under 1 ms
+
+print("--- Client: indexes follow the cached dataset versions ---")
+client = OpenProjectClient(api_key="test", url="http://127.0.0.1:9")
+client.task_cache.put(("projects",), [{"id": 1, "name": "Alpha", "parent_id": None},
+                                      {"id": 2, "name": "Web", "parent_id": 1}])
+projects = client.project_index()
+assert projects.search("alpha web") == [2] and projects.label(2) == "Alpha › Web"
+assert client.project_index() is projects
+client.task_cache.put(("my_tasks",), [{"id": 41, "subject": "Revisar factura", "project_name": "Alpha"}])
+tasks = client.task_index()
+assert tasks.search("#41") == [41] and tasks.search("factura") == [41]
+client.task_cache.patch_rows(41, {"subject": "Revisar contrato"})
+assert client.task_index().search("contrato") == [41] and client.task_index().search("factura") == []
+
+print("SUCCESS: Search index verified")
@@ -0,0 +1,36 @@
+import os
+import tempfile
+import time
+
+import snapshot
+from op_cache import StaleWhileRevalidate
+
+# Isolated snapshot directory, set after the import (as load_env() does with .env)
+snapshot_dir = tempfile.mkdtemp()
+os.environ["OP_SNAPSHOT_DIR"] = snapshot_dir
+
+tasks = [{"id": 101, "subject": "Task in Root A", "project_id": 1, "status": "New"}]
+projects = [{"id": 1, "name": "Root Project A", "parent_id": None}]
+
+print("--- Snapshot round-trip ---")
+assert snapshot.load_snapshot("https://op.example.com", "key") is None
+assert snapshot.save_snapshot("https://op.example.com/", "key", tasks, projects)
+snap = snapshot.load_snapshot("https://op.example.com", "key")
+print(snap)
+assert snap["tasks"] == tasks and snap["projects"] == projects
+assert snapshot.load_snapshot("https://op.example.com", "other-key") is None # Per-user file
+assert len(os.listdir(snapshot_dir)) == 1 and "key" not in os.listdir(snapshot_dir)[0]
+
+print("\n--- A day-old snapshot is served instantly while the refresh runs ---")
+cache = StaleWhileRevalidate(fresh_for=15, max_stale=900)
+cache.seed(("my_tasks",), snap["tasks"], time.time() - 86400)
+res = cache.get(("my_tasks",), lambda: (time.sleep(0.2), [{"id": 102}])[1])
+print(res)
+assert res.value == tasks and res.stale and res.refreshing and res.age >= 86400
+while cache.is_refreshing(("my_tasks",)): time.sleep(0.01)
+assert cache.get(("my_tasks",), lambda: []).value == [{"id": 102}]
+
+print("\n--- Seeding never overwrites fresher data ---")
+assert not cache.seed(("my_tasks",), tasks, time.time())
+
+print("\nSUCCESS: Warm-start snapshot verified.")
@@ -0,0 +1,63 @@
+import os
+
+from op_client import OpenProjectClient, is_closed_name
+from stand_in import StandIn, collection
+
+# Statuses in a language the old regexes didn't know; only isClosed tells them apart
+STATUSES = [
+    {"id": 1, "name": "Neu", "isClosed": False, "isDefault": True},
+    {"id": 2, "name": "Abgeschlossen", "isClosed": True, "isDefault": False},
+    {"id": 3, "name": "Abgelehnt", "isClosed": True, "isDefault": False},
+]
+
+def wp(wp_id, status):
+    return {
+        "id": wp_id, "subject": f"Task {wp_id}", "updatedAt": "2026-10-01T10:00:00Z", "lockVersion": 1,
+        "_links": {
+            "status": {"href": f"/api/v3/statuses/{status['id']}", "title": status["name"]},
+            "priority": {"title": "Normal"},
+            "project": {"href": "/api/v3/projects/1", "title": "P"},
+            "assignee": {"title": "Ana"},
+        },
+    }
+
+WORK_PACKAGES = [wp(1, STATUSES[0]), wp(2, STATUSES[1]), wp(3, STATUSES[2])]
+
+def start(statuses):
+    server = StandIn({"GET /api/v3/statuses": collection(statuses), "GET *": collection(WORK_PACKAGES)})
+    return server, OpenProjectClient(api_key="test", url=server.url)
+
+server, client = start(STATUSES)
+
+print("--- Closed statuses come from server metadata ---")
+assert client.get_closed_status_ids() == {2, 3}
+assert client._find_closed_status_id() == 2
+
+print("--- All tasks carry a consistent is_closed flag ---")
+tasks = client.get_all_tasks(assignee_id=None)
+print([(t["id"], t["status"], t["is_closed"]) for t in tasks])
+assert [t["is_closed"] for t in tasks] == [False, True, True]
+
+print("--- My tasks never include closed ones ---")
+assert [t["id"] for t in client.get_my_tasks()] == [1]
+
+print("--- Name fallback only when metadata is missing ---")
+assert is_closed_name("Cerrado") and is_closed_name("Rejected") and not is_closed_name("En curso")
+
+print("--- Closing picks 'Closed'/'Cerrado' over other closed statuses, or OP_CLOSED_STATUS ---")
+several, several_client = start([
+    {"id": 1, "name": "New", "isClosed": False},
+    {"id": 6, "name": "Rejected", "isClosed": True},
+    {"id": 7, "name": "Duplicate", "isClosed": True},
+    {"id": 8, "name": "Cerrado", "isClosed": True},
+])
+assert several_client._find_closed_status_id() == 8
+os.environ["OP_CLOSED_STATUS"] = "duplicate"
+assert several_client._find_closed_status_id() == 7
+os.environ["OP_CLOSED_STATUS"] = "Archivado" # Unknown: ignored
+assert several_client._find_closed_status_id() == 8
+del os.environ["OP_CLOSED_STATUS"]
+several.shutdown()
+
+server.shutdown()
+print("\nSUCCESS: Status classification verified.")
@@ -0,0 +1,35 @@
+import gzip
+import json
+
+import op_client
+from op_client import OpenProjectClient
+from stand_in import Reply, StandIn, collection
+
+# --- Local stand-in that gzips its answer when the client accepts it ---
+seen = {}
+PROJECTS = [{"id": i, "name": f"Project {i}", "_links": {"parent": None}} for i in range(1, 2001)]
+
+def projects(request):
+    seen["accept_encoding"] = request.headers.get("Accept-Encoding", "")
+    body = json.dumps(collection(PROJECTS, _type="Collection", total=len(PROJECTS))).encode()
+    headers = {"Content-Type": "application/hal+json"}
+    if "gzip" in seen["accept_encoding"]:
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    return Reply(200, headers=headers, body=body)
+
+server = StandIn({"GET *": projects})
+url = server.url
+
+modes = [False] + ([True] if op_client.ijson is not None else [])
+for stream in modes:
+    print(f"--- stream_json={stream} ---")
+    client = OpenProjectClient(api_key=f"test-{stream}", url=url)
+    client.stream_json = stream
+    projects = client.get_projects()
+    assert "gzip" in seen["accept_encoding"]
+    assert len(projects) == 2000
+    assert projects[-1] == {"id": 2000, "name": "Project 2000", "parent_id": None}
+
+server.shutdown()
+print("\nSUCCESS: Compressed transfer and incremental decoding verified.")
@@ -0,0 +1,74 @@
+import time
+
+from op_cache import CircuitBreaker, StaleWhileRevalidate
+
+# Mock loader: returns an increasing version of the task list, or fails when upstream is "down"
+state = {"calls": 0, "down": False}
+
+def loader():
+    state["calls"] += 1
+    if state["down"]:
+        raise ConnectionError("upstream down")
+    return [{"id": 1, "rev": state["calls"]}]
+
+breaker = CircuitBreaker(failure_threshold=2, reset_after=60)
+cache = StaleWhileRevalidate(fresh_for=0.1, max_stale=5, breaker=breaker)
+key = ("my_tasks",)
+
+print("--- First load is synchronous ---")
+res = cache.get(key, loader)
+print(res)
+assert res.value == [{"id": 1, "rev": 1}] and not res.stale
+
+print("\n--- Stale value served instantly while refreshing ---")
+time.sleep(0.2)
+res = cache.get(key, loader)
+print(res)
+assert res.value == [{"id": 1, "rev": 1}] and res.stale and res.refreshing
+for _ in range(50):
+    if cache.version(key) != res.version: break
+    time.sleep(0.01)
+res = cache.get(key, loader)
+print(res)
+assert res.value == [{"id": 1, "rev": 2}] and not res.stale
+
+print("\n--- Upstream down: stale data keeps flowing, breaker opens ---")
+state["down"] = True
+for _ in range(2):
+    time.sleep(0.2)
+    cache.get(key, loader)
+    while cache.is_refreshing(key): time.sleep(0.01)
+assert breaker.is_open
+calls_before = state["calls"]
+res = cache.get(key, loader)
+print(res)
+assert res.value == [{"id": 1, "rev": 2}] and res.stale and not res.refreshing
+assert res.age > 0.1
+assert state["calls"] == calls_before # Open breaker -> no more calls upstream
+
+print("\n--- Invalidation forces a reload but keeps the fallback ---")
+cache.invalidate()
+res = cache.get(key, loader)
+assert res.value == [{"id": 1, "rev": 2}] and res.stale
+
+print("\n--- Rows patched during a background refresh are patched into its result ---")
+cache = StaleWhileRevalidate(fresh_for=0.05, max_stale=60)
+cache.put(key, [{"id": 1, "rev": 1}])
+time.sleep(0.1)
+def slow_loader():
+    time.sleep(0.2)
+    return [{"id": 1, "rev": 1}, {"id": 2, "rev": 1}]
+assert cache.get(key, slow_loader).refreshing
+cache.patch_rows(1, {"rev": 5})  # e.g. a write's response, while the refresh is in flight
+while cache.is_refreshing(key): time.sleep(0.01)
+assert cache.peek(key) == [{"id": 1, "rev": 5}, {"id": 2, "rev": 1}]
+assert not cache.get(key, slow_loader).stale
+
+print("\n--- A value stored during a background refresh isn't overwritten by it ---")
+time.sleep(0.1)
+assert cache.get(key, slow_loader).refreshing
+cache.put(key, [{"id": 3, "rev": 1}])
+while cache.is_refreshing(key): time.sleep(0.01)
+assert cache.peek(key) == [{"id": 3, "rev": 1}]
+
+print("\nSUCCESS: Stale-while-revalidate and circuit breaker verified.")
@@ -0,0 +1,85 @@
+import os
+import time
+import threading
+
+os.environ.update({"OP_RATE_LIMIT": "50", "OP_MAX_IN_FLIGHT": "3"})
+
+import op_client
+from op_client import OpenProjectClient, run_concurrently
+from stand_in import Reply, StandIn, collection
+from throttle import AdaptiveConcurrency, HostThrottle, TokenBucket
+
+print("--- Token bucket: burst, then the configured rate ---")
+bucket = TokenBucket(rate=20, burst=5)
+start = time.monotonic()
+for _ in range(15):
+    assert bucket.acquire()
+elapsed = time.monotonic() - start
+print(f"15 tokens in {elapsed:.2f}s")
+assert 0.4 < elapsed < 0.8 # 5 immediate + 10 at 20/s
+assert not bucket.acquire(timeout=0.01)
+
+print("--- AIMD: one halving per burst of overload signals, additive recovery ---")
+limit = AdaptiveConcurrency(max_limit=8, cooldown=60)
+for _ in range(3):
+    assert limit.acquire(0)
+for _ in range(3):
+    limit.release(overloaded=True)
+assert limit.limit == 4
+for _ in range(4):
+    limit.acquire(0)
+    limit.release(overloaded=False)
+assert 4.9 < limit.limit < 5.0
+
+print("--- Request rate: halved once per burst of overload signals as well ---")
+host = HostThrottle(rate=40, max_in_flight=8, cooldown=60)
+for _ in range(5):
+    with host.slot(0) as report:
+        report(503, 0.1)
+assert host.stats()["rate"] == 20.0 and host.stats()["limit"] == 4
+with host.slot(0) as report:
+    report(200, 0.1)
+assert host.stats()["rate"] == 22.0
+bucket = TokenBucket(rate=1, burst=5)
+bucket.set_rate(1000)
+assert all(bucket.acquire(timeout=0) for _ in range(5)) # The burst in hand is kept
+assert bucket.acquire(timeout=0.05)
+
+# --- Local stand-in for OpenProject that counts concurrent requests and can shed load ---
+state = {"active": 0, "peak": 0, "overloaded": False}
+lock = threading.Lock()
+
+def counted(request):
+    with lock:
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+    time.sleep(0.1)
+    with lock:
+        state["active"] -= 1
+    if state["overloaded"]:
+        return Reply(429, headers={"Retry-After": "1"})
+    return collection([])
+
+server = StandIn({"GET *": counted})
+url = server.url
+
+print("--- Many sessions at once: never more than OP_MAX_IN_FLIGHT requests on the host ---")
+clients = [OpenProjectClient(api_key=f"user{i}", url=url) for i in range(10)]
+run_concurrently(*[c.get_users for c in clients])
+print("peak in flight:", state["peak"])
+assert state["peak"] <= 3
+
+print("--- 429 with Retry-After: limits halve and new requests wait ---")
+throttle = op_client._get_throttle(url)
+state["overloaded"] = True
+clients[0].get_users()
+stats = throttle.stats()
+print(stats)
+assert stats["limit"] < 3 and stats["rate"] < 50
+state["overloaded"] = False
+start = time.monotonic()
+clients[1].get_users()
+assert time.monotonic() - start >= 0.8 # Paused for Retry-After
+
+server.shutdown()
+print("\nSUCCESS: Token bucket, AIMD concurrency and overload back-off verified.")
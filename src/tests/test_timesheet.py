@@ -0,0 +1,71 @@
+from datetime import date, timedelta
+
+from op_client import OpenProjectClient
+from stand_in import StandIn, page
+from views.timesheet import time_entries_frame, timesheet_pivot
+
+today = date.today()
+monday = today - timedelta(days=today.weekday())
+last_week = monday - timedelta(days=7)
+
+def entry(i, day, user, project, hours):
+    return {"id": i, "spentOn": day.isoformat(), "hours": hours, "comment": {"raw": ""},
+            "_links": {"user": {"href": f"/api/v3/users/{user}", "title": f"User {user}"},
+                       "project": {"href": f"/api/v3/projects/{project}", "title": f"Project {project}"},
+                       "workPackage": {"href": "/api/v3/work_packages/1", "title": "Task 1"}}}
+
+ENTRIES = [
+    entry(1, last_week, 5, 1, "PT2H"),
+    entry(2, last_week, 6, 1, "PT1H30M"),
+    entry(3, last_week + timedelta(days=1), 5, 2, "PT4H"),
+    entry(4, monday, 5, 1, "PT3H"),
+    entry(5, today, 6, 2, "PT0.5H"),
+]
+
+# --- Local stand-in for OpenProject: /time_entries filtered by spentOn, 2 per page max ---
+requests_seen = []
+
+def time_entries(request):
+    first, last = request.filters[0]["spentOn"]["values"]
+    requests_seen.append((first, last, int(request.query["offset"])))
+    return page(request, [e for e in ENTRIES if first <= e["spentOn"] <= last], max_page_size=2)
+
+server = StandIn({"GET *": time_entries})
+client = OpenProjectClient(api_key="test", url=server.url)
+
+print("--- First load: every page of the range (pages 2+ concurrently) ---")
+entries = client.get_time_entries(last_week, today)
+print(requests_seen)
+assert sorted(e["id"] for e in entries) == [1, 2, 3, 4, 5]
+assert sorted(offset for _, _, offset in requests_seen) == [1, 2, 3]
+assert {e["hours"] for e in entries} == {2.0, 1.5, 4.0, 3.0, 0.5}
+
+print("--- Same range again: served from the spentOn cache ---")
+requests_seen.clear()
+assert len(client.get_time_entries(last_week, today)) == 5
+assert requests_seen == []
+
+print("--- Refresh: only the current week is re-fetched ---")
+ENTRIES.append(entry(6, today, 5, 1, "PT1H"))
+entries = client.get_time_entries(last_week, today, refresh=True)
+assert {(first, last) for first, last, _ in requests_seen} == {(monday.isoformat(), today.isoformat())}
+assert len(entries) == 6
+
+print("--- Wider range: only the missing days are fetched ---")
+requests_seen.clear()
+client.get_time_entries(last_week - timedelta(days=7), today)
+assert {(first, last) for first, last, _ in requests_seen} == {
+    ((last_week - timedelta(days=7)).isoformat(), (last_week - timedelta(days=1)).isoformat())}
+
+print("--- Pivot: user × project × week, with totals ---")
+df = time_entries_frame(entries)
+pivot = timesheet_pivot(df, "Semana", ("Persona", "Proyecto"))
+print(pivot)
+assert pivot.loc[("User 5", "Project 1"), "Total"] == 6.0
+assert pivot.loc[("User 5", "Project 2"), f"Sem {last_week:%d/%m}"] == 4.0
+assert pivot.loc[("Total", ""), "Total"] == 12.0
+daily = timesheet_pivot(df, "Día", ("Persona",))
+assert daily.loc["User 6", f"{today:%d/%m}"] == 0.5
+
+server.shutdown()
+print("\nSUCCESS: Time entries pagination, day-keyed cache and timesheet pivots verified.")
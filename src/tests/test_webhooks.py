@@ -0,0 +1,143 @@
+import time
+
+import requests
+
+from op_client import dispatch_webhook, get_client
+from report_state import ReportState
+from stand_in import StandIn, collection
+from webhooks import SIGNATURE_HEADER, WebhookReceiver, send_event, sign, verify
+
+SECRET = "s3cret"
+
+print("--- Signatures: HMAC-SHA1 of the raw body, compared in constant time ---")
+body = b'{"action": "work_package:updated"}'
+assert sign(SECRET, body).startswith("sha1=") and verify(SECRET, body, sign(SECRET, body))
+assert not verify(SECRET, body, sign("other", body)) and not verify(SECRET, body + b" ", sign(SECRET, body))
+assert not verify(SECRET, body, None)
+
+print("--- Receiver: only signed, well-formed deliveries are dispatched ---")
+received = []
+receiver = WebhookReceiver(SECRET, received.append, port=0).start()
+assert send_event(receiver.url, SECRET, {"action": "project:created"}) == 200
+assert send_event(receiver.url, "wrong", {"action": "project:created"}) == 401
+bad_json = requests.post(receiver.url, data=b"{nope", headers={SIGNATURE_HEADER: sign(SECRET, b"{nope")})
+assert bad_json.status_code == 400
+assert send_event(receiver.url.replace("/openproject", "/other"), SECRET, {}) == 404
+assert received == [{"action": "project:created"}] and receiver.received == 1 and receiver.rejected == 2
+receiver.stop()
+
+# --- Local stand-in for OpenProject: statuses, projects, single work packages and open work packages ---
+def hal_wp(wp_id, subject, status_id, estimate="PT8H", spent="PT0H", project_id=2, assignee_id=5):
+    return {"id": wp_id, "subject": subject, "lockVersion": 3, "percentageDone": 20, "dueDate": None,
+            "estimatedTime": estimate, "spentTime": spent, "updatedAt": "2026-10-02T10:00:00Z",
+            "_links": {"status": {"href": f"/api/v3/statuses/{status_id}", "title": "New" if status_id == 1 else "Closed"},
+                       "project": {"href": f"/api/v3/projects/{project_id}", "title": "Web"},
+                       "assignee": {"href": f"/api/v3/users/{assignee_id}", "title": "Ana"},
+                       "priority": {"href": "/api/v3/priorities/8", "title": "Normal"}}}
+
+server_wps = {7: hal_wp(7, "Maquetar", 1, spent="PT2H")}
+
+def paths():
+    return [r.path for r in server.requests]
+
+server = StandIn({
+    "GET /api/v3/statuses": collection([{"id": 1, "name": "New", "isClosed": False},
+                                        {"id": 3, "name": "Closed", "isClosed": True}]),
+    "GET /api/v3/projects": collection([
+        {"id": 1, "name": "Alpha", "_links": {"parent": {"href": None}}},
+        {"id": 2, "name": "Web", "_links": {"parent": {"href": "/api/v3/projects/1", "title": "Alpha"}}}]),
+    "GET /api/v3/users/me": {"id": 5, "firstName": "Ana"},
+    "GET /api/v3/work_packages": lambda request: collection(
+        wp for wp in server_wps.values() if wp["_links"]["status"]["href"].endswith("/1")),
+    "GET /api/v3/work_packages/*": lambda request: server_wps[int(request.path.split("/")[-1])],
+})
+client = get_client(api_key="webhook-test", url=server.url)
+
+row = {"id": 7, "subject": "Maquetar", "project_id": 2, "project_name": "Web", "status": "New", "status_id": 1,
+       "is_closed": False, "progress": 20, "lock_version": 3, "estimated_hours": 8.0, "spent_hours": 2.0,
+       "updated_at": "2026-10-01T10:00:00Z"}
+projects = [{"id": 1, "name": "Alpha", "parent_id": None}, {"id": 2, "name": "Web", "parent_id": 1}]
+client.task_cache.put(("my_tasks",), [row])
+client.task_cache.put(("all_tasks", None), [dict(row, assignee_id=5)])
+client._report_state = ReportState(projects, [dict(row, assignee_id=5)])
+client.time_entries.store(["2026-10-02"], [{"id": 1, "spentOn": "2026-10-02", "hours": 2.0}], lambda e: e["spentOn"])
+
+receiver = WebhookReceiver(SECRET, dispatch_webhook, port=0).start()
+
+print("--- Field edit: cached rows and report accumulators patched, no list reload ---")
+version = client.task_cache.version(("my_tasks",))
+server_wps[7] = hal_wp(7, "Maquetar portada", 1, estimate="PT10H", spent="PT2H")
+server.requests.clear()
+assert send_event(receiver.url, SECRET, {"action": "work_package:updated", "work_package": server_wps[7]}) == 200
+assert client.task_cache.peek(("my_tasks",))[0]["subject"] == "Maquetar portada"
+assert client.task_cache.version(("my_tasks",)) > version
+assert client.report_state().project_totals(rolled=True)[1]["hours_est"] == 10.0
+assert "/api/v3/work_packages" not in paths()
+
+print("--- Time entry logged: its day is forgotten and the work package refetched ---")
+server_wps[7] = hal_wp(7, "Maquetar portada", 1, estimate="PT10H", spent="PT3H30M")
+entry = {"id": 2, "spentOn": "2026-10-02", "hours": "PT1H30M",
+         "_links": {"workPackage": {"href": "/api/v3/work_packages/7", "title": "Maquetar portada"}}}
+assert send_event(receiver.url, SECRET, {"action": "time_entry:created", "time_entry": entry}) == 200
+assert client.time_entries.missing(["2026-10-02"]) == ["2026-10-02"]
+assert "/api/v3/work_packages/7" in paths()
+assert client.task_cache.peek(("all_tasks", None))[0]["spent_hours"] == 3.5
+
+print("--- Status change: upserted or dropped per list, nothing reloaded ---")
+client.task_cache.put(("all_tasks", "me"), [dict(row, assignee_id=5)])
+client.open_states.get_many([7], lambda ids: {7: True}) # Known open as a blocker
+server.requests.clear()
+server_wps[7] = hal_wp(7, "Maquetar portada", 3, estimate="PT10H")
+assert send_event(receiver.url, SECRET, {"action": "work_package:updated", "work_package": server_wps[7]}) == 200
+assert client.task_cache.peek(("my_tasks",)) == [] # Closed: not an open task of mine any more
+assert client.task_cache.peek(("all_tasks", None))[0]["is_closed"]
+assert client.task_cache.peek(("all_tasks", "me"))[0]["status"] == "Closed"
+assert client.report_state().project_totals(rolled=True)[1]["closed"] == 1
+assert client.open_states.get_many([7], lambda ids: {7: False}) == {7: False} # Forgotten, asked again
+
+print("--- New tasks (mine and somebody else's), then one moved out of sight ---")
+server_wps[8] = hal_wp(8, "Nueva tarea", 1)
+assert send_event(receiver.url, SECRET, {"action": "work_package:created", "work_package": server_wps[8]}) == 200
+assert [t["id"] for t in client.task_cache.peek(("my_tasks",))] == [8]
+assert [t["id"] for t in client.task_cache.peek(("all_tasks", None))] == [8, 7]
+assert client.report_state().project_totals(rolled=True)[1]["total"] == 2
+
+server_wps[9] = hal_wp(9, "Otra persona", 1, assignee_id=6)
+assert send_event(receiver.url, SECRET, {"action": "work_package:created", "work_package": server_wps[9]}) == 200
+assert [t["id"] for t in client.task_cache.peek(("my_tasks",))] == [8]
+assert [t["id"] for t in client.task_cache.peek(("all_tasks", "me"))] == [8, 7]
+assert [t["id"] for t in client.task_cache.peek(("all_tasks", None))] == [9, 8, 7]
+
+server_wps[9] = hal_wp(9, "Otra persona", 1, project_id=99, assignee_id=6) # A project this user can't see
+assert send_event(receiver.url, SECRET, {"action": "work_package:updated", "work_package": server_wps[9]}) == 200
+assert [t["id"] for t in client.task_cache.peek(("all_tasks", None))] == [8, 7]
+assert client.report_state().project_totals(rolled=True)[1]["total"] == 2
+assert not client.task_cache.is_refreshing(("all_tasks", None)) and "/api/v3/work_packages" not in paths()
+
+print("--- Projects unknown to the client: pushed work package not inserted, its lists reloaded ---")
+blind = StandIn({
+    "GET /api/v3/statuses": collection([{"id": 1, "name": "New", "isClosed": False}]),
+    "GET /api/v3/projects": collection([]),
+    "GET /api/v3/users/me": {"id": 5, "firstName": "Ana"},
+    "GET /api/v3/work_packages": collection([]),
+})
+blind_client = get_client(api_key="webhook-blind", url=blind.url)
+blind_client.task_cache.put(("all_tasks", None), [])
+blind_client.apply_webhook({"action": "work_package:created", "work_package": hal_wp(9, "Secreta", 1, project_id=4)})
+assert blind_client.task_cache.peek(("all_tasks", None)) == []
+for _ in range(100):
+    if "/api/v3/work_packages" in [r.path for r in blind.requests] and not blind_client.task_cache.is_refreshing(("all_tasks", None)):
+        break
+    time.sleep(0.02)
+assert "/api/v3/work_packages" in [r.path for r in blind.requests]
+assert all(r["id"] != 9 for r in blind_client.task_cache.peek(("all_tasks", None)))
+blind.shutdown()
+
+print("--- Bad signature: nothing applied ---")
+server_wps[8] = hal_wp(8, "Manipulada", 1)
+assert send_event(receiver.url, "wrong", {"action": "work_package:updated", "work_package": server_wps[8]}) == 401
+assert client.task_cache.peek(("my_tasks",))[0]["subject"] == "Nueva tarea"
+
+receiver.stop()
+server.shutdown()
+print("\nSUCCESS: Webhook signatures, receiver and cache updates verified")
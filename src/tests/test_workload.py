@@ -0,0 +1,89 @@
+import random
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from views.workload import person_labels, remaining_work, workload_matrix
+
+TODAY = date(2026, 10, 19)  # A Monday
+
+ids = {}
+
+def task(assignee, est, spent=0.0, start=None, due=None, closed=False, assignee_id=None):
+    if assignee is not None and assignee_id is None:
+        assignee_id = ids.setdefault(assignee, len(ids) + 1)
+    return {"assignee": assignee, "assignee_id": assignee_id,
+            "is_closed": closed, "estimated_hours": est, "spent_hours": spent,
+            "startDate": start and start.isoformat(), "dueDate": due and due.isoformat()}
+
+def days(n):
+    return TODAY + timedelta(days=n)
+
+print("--- Remaining hours spread over working days up to the due date ---")
+tasks = [
+    task("Ana", 10, 0, due=days(4)),                # Mon..Fri: 2h/day
+    task("Ana", 6, 2, start=days(2), due=days(3)),  # Wed..Thu: 2h/day
+    task("Bob", 8, 0, due=days(-3)),                # Overdue: everything today
+    task("Bob", 3, 0, start=days(5), due=days(6)),  # Weekend only: rolls to next Monday
+    task("Bob", 5, 0),                              # No due date: not on the calendar
+    task("Eva", 4, 6, due=days(2)),                 # Overspent: nothing left
+    task("Eva", 4, 0, due=days(2), closed=True),    # Closed
+    task(None, 4, 0, due=days(2)),                  # Unassigned
+]
+work = remaining_work(tasks, today=TODAY)
+assert sorted(work["assignee"]) == ["Ana", "Ana", "Bob", "Bob", "Bob"]
+load = workload_matrix(work, TODAY, 14)
+ana, bob = ids["Ana"], ids["Bob"]
+assert list(load.index) == [ana, bob]
+assert len(load.columns) == 10 # Working days only
+assert list(load.loc[ana].iloc[:5]) == [2.0, 2.0, 4.0, 4.0, 2.0]
+assert load.loc[bob].iloc[0] == 8.0 and load.loc[bob].iloc[5] == 3.0
+assert abs(load.to_numpy().sum() - (10 + 4 + 8 + 3)) < 1e-9
+
+print("--- Grouped by assignee id: namesakes stay apart, labelled with their id ---")
+namesakes = [task("Ana", 5, 0, due=days(0), assignee_id=1), task("Ana", 3, 0, due=days(0), assignee_id=2)]
+work = remaining_work(namesakes, today=TODAY)
+load = workload_matrix(work, TODAY, 7)
+assert list(load.index) == [1, 2] and list(load.iloc[:, 0]) == [5.0, 3.0]
+assert person_labels(work) == {1: "Ana (#1)", 2: "Ana (#2)"}
+assert person_labels(remaining_work(tasks, today=TODAY)) == {ana: "Ana", bob: "Bob"}
+
+print("--- Matches a per-task loop on random data; work beyond the horizon is cut ---")
+rng = random.Random(11)
+people = [f"P{i}" for i in range(30)]
+random_tasks = []
+for _ in range(2000):
+    start = days(rng.randint(-10, 30)) if rng.random() < 0.5 else None
+    due = days(rng.randint(-10, 60)) if rng.random() < 0.9 else None
+    random_tasks.append(task(rng.choice(people), rng.randint(1, 40), rng.randint(0, 20), start, due, rng.random() < 0.2))
+work = remaining_work(random_tasks, today=TODAY)
+load = workload_matrix(work, TODAY, 28)
+expected = {}
+calendar = [d for d in (days(i) for i in range(28)) if d.weekday() < 5]
+for row in work.itertuples():
+    if pd.isna(row.due):
+        continue
+    first, last = row.start.date(), row.due.date()
+    while first.weekday() >= 5:
+        first += timedelta(days=1)
+    last = max(last, first)
+    span = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    working = [d for d in span if d.weekday() < 5]
+    for d in working:
+        if d in calendar:
+            expected[(row.assignee_id, d)] = expected.get((row.assignee_id, d), 0.0) + row.remaining / len(working)
+for (person, d), hours in expected.items():
+    assert abs(load.loc[person, np.datetime64(d)] - hours) < 0.02, (person, d)
+assert abs(load.to_numpy().sum() - sum(expected.values())) < 0.5
+
+print("--- 100k open tasks in well under a second ---")
+big = [task(f"P{i % 300}", 16, 4, days(i % 20 - 5), days(i % 45)) for i in range(100000)]
+start = time.perf_counter()
+load = workload_matrix(remaining_work(big, today=TODAY), TODAY, 56)
+elapsed = time.perf_counter() - start
+print(f"{len(big)} tasks -> {load.shape} in {elapsed * 1000:.0f} ms")
+assert elapsed < 1.0
+
+print("SUCCESS: Workload forecast spreads remaining hours over working days")
@@ -0,0 +1,121 @@
+import os
+import time
+import socket
+import tempfile
+import threading
+
+# Journal enabled, in a fresh file, with a fast flusher
+journal_path = os.path.join(tempfile.mkdtemp(), "write_journal.sqlite")
+os.environ.update({"OP_WRITE_JOURNAL": "1", "OP_WRITE_JOURNAL_PATH": journal_path, "OP_JOURNAL_INTERVAL": "0.1"})
+
+import op_client
+from op_client import OpenProjectClient
+from stand_in import Reply, StandIn, collection
+from write_journal import DONE, FAILED, PENDING, RETRY, SENDING, UNCERTAIN, JournalItem, WriteJournal
+
+stale = op_client._singletons.pop("write_journal", None)
+if stale is not None:
+    stale.close()
+
+# --- Local stand-in for OpenProject: unavailable (503) until told otherwise ---
+state = {"up": False, "created": [], "keys": []}
+
+def create(request):
+    if not state["up"]:
+        return Reply(503, {"message": "maintenance"})
+    state["keys"].append(request.headers.get("Idempotency-Key"))
+    state["created"].append(request.json["subject"])
+    return Reply(201, {"id": 100 + len(state["created"]), "subject": request.json["subject"]})
+
+def wait_for(condition, timeout=5):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+server = StandIn({
+    "GET /api/v3/memberships": collection([{"_links": {"project": {"href": "/api/v3/projects/1"}}}]),
+    "GET /api/v3/groups": collection([]),
+    "GET *": {"id": 5, "firstName": "Ana", "_links": {"self": {"href": "/api/v3/users/5"}}},
+    "POST *": create,
+})
+client = OpenProjectClient(api_key="test", url=server.url)
+assert client.uses_journal()
+
+print("--- Upstream down: the intent is acknowledged at once and retried in the background ---")
+key = client.enqueue("create_work_package", project_id=1, subject="Offline task", type_id=1)
+client._start_flusher().backoff = 0.2
+assert client.journal_items()[0].key == key
+assert wait_for(lambda: client.journal_items()[0].attempts >= 2)
+item = client.journal_items()[0]
+print(item.status, item.attempts, item.last_error)
+assert item.status in (PENDING, SENDING) and state["created"] == []
+
+print("--- Upstream back: delivered once, with its idempotency key ---")
+state["up"] = True
+assert wait_for(lambda: client.journal_items()[0].status == DONE)
+item = client.journal_items()[0]
+assert item.result == {"id": 101}
+assert state["created"] == ["Offline task"]
+assert len(state["keys"]) == 1 and state["keys"][0]
+
+print("--- Same idempotency key appended twice: recorded once ---")
+journal = op_client._get_write_journal()
+scope = client._journal_scope()
+journal.append(scope, "close_task", {"work_package_id": 1, "lock_version": 1}, key="dup")
+journal.append(scope, "close_task", {"work_package_id": 1, "lock_version": 1}, key="dup")
+assert sum(1 for i in client.journal_items() if i.key == "dup") == 1
+journal.discard("dup")
+
+print("--- Exhausted retries -> failed; manual retry requeues it ---")
+state["up"] = False
+client._flusher.max_attempts = 2
+key = client.enqueue("create_work_package", project_id=1, subject="Doomed", type_id=1)
+assert wait_for(lambda: journal.get(key).status == FAILED)
+state["up"] = True
+client.retry_intent(key)
+assert wait_for(lambda: journal.get(key).status == DONE)
+assert state["created"] == ["Offline task", "Doomed"]
+
+print("--- Crash mid-send: on reopen the intent is uncertain, never replayed blindly ---")
+client.close()
+key = journal.append(scope, "create_work_package", {"project_id": 1, "subject": "Maybe", "type_id": 1})
+journal.claim(scope, 10)
+assert journal.get(key).status == SENDING
+reopened = WriteJournal(journal_path)
+assert reopened.get(key).status == UNCERTAIN
+reopened.close()
+
+print("--- Send outcomes: refused -> retry, rejected (4xx) -> failed, connection lost mid-write -> uncertain ---")
+def intent(url):
+    sender = OpenProjectClient(api_key="test", url=url)
+    item = JournalItem("k", "update_work_package", {"work_package_id": 1, "lock_version": 1, "subject": "X"},
+                       PENDING, 1, None, None, 0, 0)
+    return sender._send_intent(item)
+
+closed = socket.socket()
+closed.bind(("127.0.0.1", 0))
+closed_url = f"http://127.0.0.1:{closed.getsockname()[1]}"
+closed.close()
+assert intent(closed_url)[0] == RETRY
+
+rejecting = StandIn({"PATCH *": Reply(422, {"message": "Subject is invalid"})})
+assert intent(rejecting.url)[0] == FAILED
+rejecting.shutdown()
+
+def hang_up(listener):
+    conn, _ = listener.accept()
+    conn.recv(65536)
+    conn.close()
+
+listener = socket.socket()
+listener.bind(("127.0.0.1", 0))
+listener.listen()
+threading.Thread(target=hang_up, args=(listener,), daemon=True).start()
+assert intent(f"http://127.0.0.1:{listener.getsockname()[1]}")[0] == UNCERTAIN
+listener.close()
+
+server.shutdown()
+print("\nSUCCESS: Durable write journal, background flush, retries and idempotency keys verified.")
@@ -0,0 +1,162 @@
+import time
+import threading
+from contextlib import contextmanager
+
+# Responses that mean "the upstream is overloaded": back off
+OVERLOAD_STATUSES = (429, 503)
+
+
+class ThrottleTimeout(Exception):
+    """Raised when no request slot frees up within the caller's timeout."""
+
+
+class TokenBucket:
+    """Requests/second limiter: `rate` tokens per second, bursts of up to `burst` requests."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Takes one token, waiting for it up to `timeout` seconds. Returns False on timeout."""
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                else:
+                    wait = (1 - self._tokens) / self.rate
+            if end is not None and now + wait > end:
+                return False
+            time.sleep(wait)
+
+    def set_rate(self, rate):
+        """Changes the refill rate; tokens accrued so far are kept at the old rate."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = float(rate)
+
+    def pause(self, seconds):
+        """Hands out no tokens for `seconds` (e.g. the upstream's Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class AdaptiveConcurrency:
+    """Caps requests in flight with an AIMD limit between `min_limit` and `max_limit`.
+
+    Every healthy response raises the limit by 1/limit (about +1 per round of requests); an
+    overload signal halves it, at most once per `cooldown` seconds so that one burst of
+    failures counts as a single signal.
+    """
+
+    def __init__(self, max_limit, min_limit=1, decrease=0.5, cooldown=1.0):
+        self.max_limit = float(max_limit)
+        self.min_limit = float(min_limit)
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, overloaded):
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if overloaded:
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+class HostThrottle:
+    """Process-wide governor for one upstream host: token bucket + adaptive concurrency.
+
+    Overload (a 429/503, or a response slower than `target_latency`) halves both the in-flight
+    limit and the request rate, each at most once per `cooldown` seconds, and a Retry-After
+    pauses new requests; healthy responses grow them back additively up to the configured ceilings.
+    """
+
+    def __init__(self, rate=20.0, burst=None, max_in_flight=8, target_latency=3.0, min_rate=0.5, cooldown=1.0):
+        self.max_rate = float(rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.target_latency = target_latency
+        self.cooldown = cooldown
+        self.bucket = TokenBucket(rate, burst or max(rate, 1))
+        self.concurrency = AdaptiveConcurrency(max_in_flight, cooldown=cooldown)
+        self._last_decrease = 0.0
+        self._rate_lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, timeout=None):
+        """Holds a request slot; yields a callable to report (status_code, latency, retry_after)."""
+        end = None if timeout is None else time.monotonic() + timeout
+        if not self.bucket.acquire(timeout):
+            raise ThrottleTimeout(f"Rate limit: no token within {timeout:.1f}s")
+        remaining = None if end is None else max(end - time.monotonic(), 0)
+        if not self.concurrency.acquire(remaining):
+            raise ThrottleTimeout(f"Concurrency limit: no slot within {timeout:.1f}s")
+        outcome = {"overloaded": False}
+
+        def report(status_code, latency, retry_after=None):
+            outcome["overloaded"] = status_code in OVERLOAD_STATUSES or latency > self.target_latency
+            if retry_after:
+                self.bucket.pause(retry_after)
+
+        try:
+            yield report
+        except Exception:
+            # Timeouts and connection errors are overload signals too
+            outcome["overloaded"] = True
+            raise
+        finally:
+            self.concurrency.release(outcome["overloaded"])
+            self._adjust_rate(outcome["overloaded"])
+
+    def _adjust_rate(self, overloaded):
+        # Same rule as AdaptiveConcurrency: one burst of overloaded responses is a single signal
+        with self._rate_lock:
+            now = time.monotonic()
+            rate = self.bucket.rate
+            if overloaded:
+                if now - self._last_decrease < self.cooldown:
+                    return
+                self._last_decrease = now
+                rate = max(self.min_rate, rate * 0.5)
+            else:
+                rate = min(self.max_rate, rate + self.max_rate * 0.05)
+            self.bucket.set_rate(rate)
+
+    def stats(self):
+        return {"rate": self.bucket.rate, "limit": self.concurrency.limit, "in_flight": self.concurrency.in_flight}
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds form only); None if absent or a date."""
+    try:
+        return max(float(value), 0.0) if value else None
+    except ValueError:
+        return None
@@ -0,0 +1,95 @@
+import streamlit as st
+from op_client import webhooks_enabled
+from datetime import datetime, timedelta
+from write_journal import DONE, FAILED, PENDING, SENDING, UNCERTAIN
+
+# --- Data freshness (stale-while-revalidate) ---
+
+def format_age(seconds):
+    if seconds < 60:
+        return f"{int(seconds)} s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min"
+    return f"{seconds / 3600:.1f} h"
+
+@st.fragment(run_every=2)
+def watch_refresh(client, seen_versions):
+    # Rerun the page as soon as a background refresh stores fresh data
+    if any(client.task_cache.version(key) != version for key, version in seen_versions):
+        st.rerun()
+
+def render_freshness(client, cached, cache_key, related=()):
+    """Shows when the served data was last updated and reloads the page when fresh data lands.
+
+    `related` holds extra (cache_key, CachedResult) pairs rendered on the same page.
+    """
+    if cached.value is None:
+        st.error("No se pudo contactar con OpenProject y no hay datos recientes en caché.")
+        return False
+    if cached.stale:
+        age = format_age(cached.age)
+        updated_at = datetime.now() - timedelta(seconds=cached.age)
+        if cached.refreshing:
+            st.caption(f"🕒 Última actualización: {updated_at:%d/%m %H:%M} (hace {age}) · actualizando en segundo plano…")
+        else:
+            st.warning(f"⚠️ OpenProject no disponible. Mostrando datos de hace {age}.")
+    watched = [(cache_key, cached)] + list(related)
+    # With webhooks the cached data also changes when someone else edits a work package
+    if webhooks_enabled() or any(c.refreshing for _, c in watched):
+        watch_refresh(client, [(key, c.version) for key, c in watched])
+    return True
+
+
+# --- Write-behind journal ---
+
+JOURNAL_STATUS_LABELS = {
+    PENDING: "⏳ En cola", SENDING: "📤 Enviando", DONE: "✅ Enviado",
+    FAILED: "❌ Error", UNCERTAIN: "⚠️ Sin confirmar",
+}
+JOURNAL_OP_LABELS = {
+    "create_work_package": "Crear tarea", "log_time": "Imputar horas",
+    "update_work_package": "Editar tarea", "close_task": "Cerrar tarea",
+}
+
+def describe_intent(item):
+    args = item.args
+    if item.op == "create_work_package":
+        created = f" → #{item.result['id']}" if item.result else ""
+        return f"{args.get('subject', '')}{created}"
+    if item.op == "log_time":
+        return f"#{args.get('work_package_id')} · {args.get('hours')} h"
+    return f"#{args.get('work_package_id')}"
+
+@st.fragment(run_every=3)
+def render_journal(client):
+    """Per-item status of this user's queued writes, with retry/discard for the ones that got stuck."""
+    items = client.journal_items()
+    if not items:
+        return
+    waiting = sum(1 for i in items if i.status in (PENDING, SENDING))
+    stuck = [i for i in items if i.status in (FAILED, UNCERTAIN)]
+    with st.expander(f"📮 Envíos a OpenProject ({waiting} en cola, {len(stuck)} con incidencias)", expanded=bool(stuck)):
+        st.dataframe(
+            [{
+                "Hora": datetime.fromtimestamp(i.created_at).strftime("%d/%m %H:%M:%S"),
+                "Operación": JOURNAL_OP_LABELS.get(i.op, i.op),
+                "Detalle": describe_intent(i),
+                "Estado": JOURNAL_STATUS_LABELS.get(i.status, i.status),
+                "Intentos": i.attempts,
+                "Error": i.last_error or "",
+            } for i in items],
+            use_container_width=True,
+            hide_index=True,
+        )
+        for item in stuck:
+            col_desc, col_retry, col_discard = st.columns([4, 1, 1])
+            with col_desc:
+                st.caption(f"{JOURNAL_STATUS_LABELS[item.status]} · {JOURNAL_OP_LABELS.get(item.op, item.op)}: {describe_intent(item)}")
+            with col_retry:
+                if st.button("🔁 Reintentar", key=f"journal_retry_{item.key}"):
+                    client.retry_intent(item.key)
+                    st.rerun(scope="fragment")
+            with col_discard:
+                if st.button("🗑️ Descartar", key=f"journal_discard_{item.key}"):
+                    client.discard_intent(item.key)
+                    st.rerun(scope="fragment")
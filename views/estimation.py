@@ -0,0 +1,129 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+from project_tree import project_paths
+from views.common import render_freshness
+
+# Grouping dimension label -> frame column
+DIMENSIONS = {"Proyecto raíz": "root", "Tipo": "type", "Responsable": "assignee", "Prioridad": "priority"}
+QUANTILES = (0.1, 0.5, 0.9)
+# Histogram bins of the spent/estimate ratio (the last one catches everything above 3x)
+RATIO_BINS = np.append(np.arange(0, 3.25, 0.25), np.inf)
+
+
+def estimation_frame(tasks, projects, closed_only=True):
+    """Tasks with an estimate, with the accuracy columns: ratio (spent / estimate), abs_error (h), overrun."""
+    df = pd.DataFrame(tasks, columns=["id", "project_id", "type", "assignee", "priority", "is_closed",
+                                      "estimated_hours", "spent_hours"])
+    df["estimated_hours"] = pd.to_numeric(df["estimated_hours"]).fillna(0.0)
+    df["spent_hours"] = pd.to_numeric(df["spent_hours"]).fillna(0.0)
+    mask = df["estimated_hours"] > 0
+    if closed_only:
+        mask &= df["is_closed"].eq(True)
+    df = df[mask]
+
+    roots = {pid: root for pid, (root, _) in project_paths(projects).items()}
+    est, spent = df["estimated_hours"].to_numpy(), df["spent_hours"].to_numpy()
+    return df.assign(
+        root=df["project_id"].map(roots).fillna("❓ Sin Clasificar"),
+        type=df["type"].fillna("—"),
+        assignee=df["assignee"].fillna("Unassigned"),
+        priority=df["priority"].fillna("—"),
+        ratio=spent / est,
+        abs_error=np.abs(spent - est),
+        overrun=spent > est,
+    )
+
+
+def accuracy_stats(df, by):
+    """Per-group ratio percentiles, mean ratio, MAE and overrun share, plus a "Total" row."""
+    grouped = df.groupby(by, sort=True)
+    stats = grouped.agg(
+        tasks=("ratio", "size"),
+        hours_est=("estimated_hours", "sum"),
+        hours_spent=("spent_hours", "sum"),
+        mean_ratio=("ratio", "mean"),
+        mae=("abs_error", "mean"),
+        overrun=("overrun", "mean"),
+    )
+    quantiles = grouped["ratio"].quantile(list(QUANTILES)).unstack()
+    total = pd.DataFrame({
+        "tasks": [len(df)], "hours_est": [df["estimated_hours"].sum()], "hours_spent": [df["spent_hours"].sum()],
+        "mean_ratio": [df["ratio"].mean()], "mae": [df["abs_error"].mean()], "overrun": [df["overrun"].mean()],
+    }, index=["Total"])
+    total_quantiles = pd.DataFrame([df["ratio"].quantile(list(QUANTILES)).to_numpy()], index=["Total"], columns=list(QUANTILES))
+    stats = pd.concat([stats.join(quantiles), total.join(total_quantiles)])
+
+    out = pd.DataFrame({
+        "Tareas": stats["tasks"].astype(int),
+        "Horas Est.": stats["hours_est"].round(1),
+        "Horas Imp.": stats["hours_spent"].round(1),
+        "Ratio P10": stats[0.1].round(2),
+        "Ratio Mediana": stats[0.5].round(2),
+        "Ratio P90": stats[0.9].round(2),
+        "Ratio Medio": stats["mean_ratio"].round(2),
+        "MAE (h)": stats["mae"].round(2),
+        "% Sobrecoste": (stats["overrun"] * 100).round(1),
+    })
+    return out.rename_axis(next(label for label, col in DIMENSIONS.items() if col == by))
+
+
+def ratio_histogram(df):
+    counts, _ = np.histogram(np.clip(df["ratio"].to_numpy(), 0, 3.5), bins=RATIO_BINS)
+    labels = [f"{lo:.2f}–{hi:.2f}" for lo, hi in zip(RATIO_BINS[:-2], RATIO_BINS[1:-1])] + ["> 3.00"]
+    return pd.DataFrame({"Tareas": counts}, index=pd.Index(labels, name="Imputado / Estimado"))
+
+
+def render(client):
+    st.header("🎯 Precisión de Estimaciones")
+    st.markdown("Horas imputadas frente a estimadas: un ratio de 1 es una estimación exacta.")
+
+    col_group, col_closed, col_refresh = st.columns([2, 1, 1])
+    with col_group:
+        group_label = st.radio("Agrupar por", list(DIMENSIONS), horizontal=True)
+    with col_closed:
+        closed_only = st.toggle("Solo tareas cerradas", value=True)
+    with col_refresh:
+        st.write("") # Spacer
+        force_refresh = st.button("🔄 Refrescar")
+
+    with st.spinner("Cargando tareas de todos los responsables..."):
+        projects = client.get_projects()
+        cached = client.get_all_tasks_cached(assignee_id=None, force=force_refresh)
+    if not render_freshness(client, cached, ("all_tasks", None)):
+        return
+
+    # Accuracy columns computed once per dataset version; filters and grouping reuse them
+    memo_key = (client.base_url, client.scope, cached.version, closed_only)
+    memo = st.session_state.get("estimation_frame")
+    if memo is None or memo[0] != memo_key:
+        memo = (memo_key, estimation_frame(cached.value, projects, closed_only))
+        st.session_state["estimation_frame"] = memo
+    df = memo[1]
+    if df.empty:
+        st.info("No hay tareas con horas estimadas para analizar.")
+        return
+
+    filter_cols = st.columns(len(DIMENSIONS))
+    mask = np.ones(len(df), dtype=bool)
+    for col, (label, column) in zip(filter_cols, DIMENSIONS.items()):
+        with col:
+            selected = st.multiselect(label, sorted(df[column].unique()), placeholder="Todos", key=f"estimation_{column}")
+        if selected:
+            mask &= df[column].isin(selected).to_numpy()
+    df = df[mask]
+    if df.empty:
+        st.info("Sin tareas para los filtros seleccionados.")
+        return
+
+    col_tasks, col_median, col_mae, col_overrun = st.columns(4)
+    col_tasks.metric("Tareas", len(df))
+    col_median.metric("Ratio mediano", f"{df['ratio'].median():.2f}")
+    col_mae.metric("Error medio (h)", f"{df['abs_error'].mean():.1f}")
+    col_overrun.metric("Con sobrecoste", f"{df['overrun'].mean() * 100:.0f} %")
+
+    st.subheader(f"📋 Precisión por {group_label.lower()}")
+    st.dataframe(accuracy_stats(df, DIMENSIONS[group_label]), use_container_width=True)
+
+    st.subheader("📈 Distribución del ratio imputado / estimado")
+    st.bar_chart(ratio_histogram(df))
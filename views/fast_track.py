@@ -0,0 +1,84 @@
+import streamlit as st
+import time
+from views.common import render_journal
+
+# Projects offered in the selectbox for the current search
+PROJECT_RESULTS = 20
+
+
+def render(client):
+    st.header("⚡ Fast-Track Captura")
+    st.markdown("Crea tareas rápidamente en tus proyectos.")
+
+    projects = client.project_index()
+    types = client.get_types()
+
+    if not len(projects):
+        st.warning("No se encontraron proyectos. Revisa tu conexión o permisos.")
+        return
+
+    # Typeahead over the project index: only the best matches are sent to the browser
+    recent = st.session_state.setdefault("recent_projects", {})
+    query = st.text_input("🔎 Buscar proyecto", placeholder="Nombre o ruta, p. ej. «alpha web»", key="project_search")
+    matches = projects.search(query, limit=PROJECT_RESULTS, recent=recent)
+    if not matches:
+        st.info("Ningún proyecto coincide con la búsqueda.")
+        return
+    st.caption(f"{len(matches)} de {len(projects)} proyectos · los usados recientemente primero")
+
+    with st.form("fast_track_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            project_id = st.selectbox("Proyecto", options=matches, format_func=projects.label)
+
+            subject = st.text_input("Asunto / Título de la Tarea")
+
+        with col2:
+            if types:
+                type_options = {t["name"]: t["id"] for t in types}
+                selected_type_name = st.selectbox("Tipo de Trabajo", options=list(type_options.keys()))
+                type_id = type_options[selected_type_name]
+            else:
+                st.warning("No se pudieron cargar los Tipos de Tarea. Usando ID 1 por defecto.")
+                type_id = 1
+            
+            estimated_hours = st.number_input("Estimación (Horas)", min_value=0.0, step=0.5)
+            due_date = st.date_input("Fecha Límite (Opcional)", value=None)
+
+        # Show current user assignment
+        me = client.get_me()
+        if me:
+            user_name = f"{me.get('firstName', '')} {me.get('lastName', '')}".strip()
+            st.info(f"👤 Tarea asignada automáticamente a: **{user_name}**")
+
+
+        description = st.text_area("Descripción (Opcional)")
+        
+        submitted = st.form_submit_button("🚀 Crear Tarea")
+
+        if submitted:
+            if not subject:
+                st.error("El Asunto es obligatorio.")
+            else:
+                due_date_str = due_date.isoformat() if due_date else None
+                try:
+                    if client.uses_journal():
+                        # Acknowledged once stored locally; sent in the background (status below)
+                        client.enqueue("create_work_package", project_id=project_id, subject=subject, type_id=type_id,
+                                       estimated_hours=estimated_hours, description=description, due_date=due_date_str)
+                        st.success("Tarea guardada. Se enviará a OpenProject en segundo plano.")
+                        recent[project_id] = time.time()
+                    else:
+                        with st.spinner("Creando tarea..."):
+                            result = client.create_work_package(project_id, subject, type_id, estimated_hours, description, due_date=due_date_str)
+                            if result:
+                                st.success(f"Tarea creada con éxito: #{result['id']}")
+                                recent[project_id] = time.time()
+                                time.sleep(1) # Visual feedback
+                            else:
+                                st.error("Hubo un error al crear la tarea. Revisa la consola para más detalles.")
+                except ValueError as e: # e.g. the type doesn't exist on the project's instance (federation)
+                    st.error(f"No se pudo crear la tarea: {e}")
+
+    if client.uses_journal():
+        render_journal(client)
@@ -0,0 +1,415 @@
+import streamlit as st
+import pandas as pd
+import time
+from datetime import datetime
+from op_client import OpenProjectClient, run_concurrently
+from project_tree import build_hierarchy, project_paths
+from snapshot import save_snapshot
+from views.common import render_freshness, render_journal
+
+TREE_VIEW = "🌳 Árbol por proyecto"
+SEARCH_RESULTS = 10
+GRID_VIEW = "📑 Tabla única"
+
+# Task frame column -> display label, shared by the per-project tables and the single grid
+TASK_COLUMNS = {
+    "id": "ID", "priority": "Prioridad", "subject": "Asunto", "status": "Estado", "Bloqueada por": "Bloqueada por",
+    "progress": "Avance %", "Horas Trabajadas": "Horas Trab.", "Horas Pendientes": "Horas Pend.",
+    "Horas Totales": "Horas Tot.", "Fecha Límite": "Fecha Límite", "Estado Fecha": "Estado Fecha",
+    "updated_at": "Última Act.",
+}
+
+
+def render_task_grid(df, projects):
+    """One table for every project, with grouping columns and server-side filter, sort and paging.
+
+    Only the current page of rows is sent to the browser, so widget count and websocket
+    payload stay flat however many projects have tasks.
+    """
+    paths = project_paths(projects)
+    grid = df.copy()
+    grid["Raíz"] = grid["project_id"].map({pid: root for pid, (root, _) in paths.items()}).fillna("❓ Sin Clasificar")
+    grid["Ruta"] = grid["project_id"].map({pid: path for pid, (_, path) in paths.items()}).fillna(grid["project_name"])
+
+    col_search, col_root, col_status = st.columns([2, 1, 1])
+    with col_search:
+        search = st.text_input("🔎 Buscar (asunto o #ID)", key="grid_search")
+    with col_root:
+        roots = ["Todas"] + sorted(grid["Raíz"].unique())
+        root_filter = st.selectbox("Proyecto raíz", options=roots, key="grid_root")
+    with col_status:
+        status_filter = st.multiselect("Estado", options=sorted(grid["status"].unique()), key="grid_status")
+
+    mask = pd.Series(True, index=grid.index)
+    if search:
+        term = search.strip().lstrip("#")
+        mask &= grid["subject"].str.contains(term, case=False, regex=False) | (grid["id"].astype(str) == term)
+    if root_filter != "Todas":
+        mask &= grid["Raíz"] == root_filter
+    if status_filter:
+        mask &= grid["status"].isin(status_filter)
+    grid = grid[mask]
+
+    sort_options = {"Ruta": "Ruta", **{label: col for col, label in TASK_COLUMNS.items()}}
+    col_sort, col_order, col_size = st.columns([2, 1, 1])
+    with col_sort:
+        sort_label = st.selectbox("Ordenar por", options=list(sort_options.keys()), key="grid_sort")
+    with col_order:
+        ascending = st.radio("Orden", ["Asc", "Desc"], horizontal=True, key="grid_order") == "Asc"
+    with col_size:
+        page_size = st.selectbox("Filas por página", options=[25, 50, 100, 250], index=1, key="grid_page_size")
+
+    grid = grid.sort_values([sort_options[sort_label], "id"], ascending=ascending, kind="stable", na_position="last")
+
+    total = len(grid)
+    page_count = max(1, -(-total // page_size))
+    page_number = st.number_input("Página", min_value=1, max_value=page_count, value=1, step=1, key="grid_page")
+    start = (int(page_number) - 1) * page_size
+    page_df = grid.iloc[start:start + page_size]
+    st.caption(f"Mostrando {min(start + 1, total)}–{start + len(page_df)} de {total} tareas · página {int(page_number)}/{page_count}")
+
+    display_df = page_df[["Raíz", "Ruta"] + list(TASK_COLUMNS.keys())].rename(columns=TASK_COLUMNS)
+
+    event = st.dataframe(
+        display_df,
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key="kanban_grid"
+    )
+    if len(event.selection.rows) > 0:
+        selected_id = display_df["ID"].tolist()[event.selection.rows[0]] # Plain int (or "instance:id" when federated)
+        st.session_state["selected_task_id"] = selected_id
+        st.session_state["last_selected_id"] = selected_id
+
+
+def render(client):
+    st.header("📋 My Kanban (Mis Tareas Activas)")
+    
+    force_refresh = st.button("🔄 Refrescar Lista")
+
+    # Fetch Tasks and Projects (last good data served instantly, refreshed in background)
+    cached, projects_cached, _ = run_concurrently(
+        lambda: client.get_my_tasks_cached(force=force_refresh),
+        lambda: client.get_projects_cached(force=force_refresh),
+        lambda: client.get_relations_cached(force=force_refresh), # Warms the dependency graph
+    )
+    if not render_freshness(client, cached, ("my_tasks",), related=[(("projects",), projects_cached)]):
+        return
+    tasks = cached.value
+    projects = projects_cached.value or []
+
+    # Persist the freshly built dataset for an instant warm start on the next login
+    # (single instance only: merged views hold instance-qualified ids)
+    if isinstance(client, OpenProjectClient) and not cached.stale and not projects_cached.stale:
+        versions = (cached.version, projects_cached.version)
+        if st.session_state.get("snapshot_versions") != versions:
+            save_snapshot(st.session_state["op_url"], st.session_state["op_api_key"], tasks, projects)
+            st.session_state["snapshot_versions"] = versions
+    
+    if not tasks:
+        st.info("¡Bien hecho! No tienes tareas activas asignadas actualmente.")
+        return
+
+    # Build Project Hierarchy: {parent_id: [child_objs]} and the root projects
+    project_children, root_projects = build_hierarchy(projects)
+    
+    # Process Tasks DataFrame once
+    df = pd.DataFrame(tasks)
+    
+    # --- Helper: Parse ISO Duration ---
+    def parse_iso_duration(duration_str):
+        if not duration_str or pd.isna(duration_str):
+            return 0.0
+        try:
+            duration_str = duration_str.replace("PT", "")
+            hours = 0.0
+            if "H" in duration_str:
+                parts = duration_str.split("H")
+                hours += float(parts[0])
+                duration_str = parts[1]
+            if "M" in duration_str:
+                minutes = float(duration_str.replace("M", ""))
+                hours += minutes / 60.0
+            return round(hours, 2)
+        except:
+            return 0.0
+
+    # Ensure columns existence
+    expected_cols = ["progress", "spentTime", "estimatedTime", "dueDate", "project_id", "project_name"]
+    for col in expected_cols:
+        if col not in df.columns:
+            df[col] = None 
+            if col == "progress": df[col] = 0
+
+    df["progress"] = df["progress"].fillna(0).astype(int)
+    df["Horas Trabajadas"] = df["spentTime"].apply(parse_iso_duration)
+    df["Horas Totales"] = df["estimatedTime"].apply(parse_iso_duration)
+    df["Horas Pendientes"] = df["Horas Totales"] - df["Horas Trabajadas"]
+    
+    today = datetime.now().date()
+    def get_due_status(date_str):
+        if not date_str: return ""
+        try:
+            due_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+            if due_date < today: return "Pasado de Fecha ⚠️"
+            elif due_date == today: return "Al Límite 🔥"
+            else: return "Check ✅"
+        except: return ""
+
+    df["Estado Fecha"] = df["dueDate"].apply(get_due_status)
+    df["Fecha Límite"] = df["dueDate"]
+
+    # Tasks waiting on open work packages (relations: blocks / precedes / requires)
+    blockers = client.get_blockers(df["id"].tolist())
+    df["Bloqueada por"] = df["id"].map(lambda i: "🚫 " + ", ".join(f"#{b}" for b in blockers[i]) if i in blockers else "")
+    if blockers:
+        st.caption(f"🚫 {len(blockers)} tarea(s) bloqueada(s) por trabajo pendiente.")
+
+    # --- Helper Functions (Time) ---
+    # Helper function to render a subset of tasks
+    def render_task_table(subset_df, key_suffix):
+        if subset_df.empty:
+            st.caption("No hay tareas activas en este nivel.")
+            return
+
+        display_df = subset_df[[
+            "id", "priority", "subject", "status", "Bloqueada por",
+            "progress", "Horas Trabajadas", "Horas Pendientes", "Horas Totales", 
+            "Fecha Límite", "Estado Fecha", "updated_at"
+        ]].copy()
+        
+        display_df.columns = [
+            "ID", "Prioridad", "Asunto", "Estado", "Bloqueada por",
+            "Avance %", "Horas Trab.", "Horas Pend.", "Horas Tot.", 
+            "Fecha Límite", "Estado Fecha", "Última Act."
+        ]
+
+        # Selection logic per table
+        event = st.dataframe(
+            display_df, 
+            use_container_width=True, 
+            hide_index=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            key=f"kanban_table_{key_suffix}"
+        )
+        
+        # Handle selection
+        if len(event.selection.rows) > 0:
+            row_idx = event.selection.rows[0]
+            selected_id = display_df["ID"].tolist()[row_idx]
+            st.session_state["selected_task_id"] = selected_id
+            st.session_state["last_selected_id"] = selected_id # Track global selection
+
+
+    # Initialize global selection state if needed
+    if "selected_task_id" not in st.session_state:
+        st.session_state["selected_task_id"] = None
+
+    # Render Project Groups
+    # We loop through root projects, and for each, we check if there are tasks for it OR its children
+    
+    # 1. Identify all project IDs that have tasks
+    active_project_ids = df["project_id"].dropna().unique().tolist()
+
+    # 2. Iterate Root Projects
+    def render_project_tree(project_obj, depth=0):
+        p_id = project_obj["id"]
+        p_name = project_obj["name"]
+        children = project_children.get(p_id, [])
+        
+        # Collect all descendant IDs to check if we should render this branch
+        # Simple BFS/DFS to get all children IDs
+        to_visit = [c["id"] for c in children]
+        all_descendants = set(to_visit)
+        while to_visit:
+            curr = to_visit.pop(0)
+            grand_kids = project_children.get(curr, [])
+            for gk in grand_kids:
+                if gk["id"] not in all_descendants:
+                    all_descendants.add(gk["id"])
+                    to_visit.append(gk["id"])
+        
+        # Check for tasks in this project or any descendant
+        has_tasks = p_id in active_project_ids
+        has_descendant_tasks = any(did in active_project_ids for did in all_descendants)
+        
+        if not (has_tasks or has_descendant_tasks):
+            return # Skip empty branches
+            
+        # Render Logic
+        if depth == 0:
+            # Root Level -> Expander
+            with st.expander(f"📂 {p_name}", expanded=True):
+                # Render tasks for this root
+                if has_tasks:
+                    st.markdown("**Tareas Principales**")
+                    p_tasks = df[df["project_id"] == p_id]
+                    render_task_table(p_tasks, f"proj_{p_id}")
+                
+                # Render Children
+                for child in children:
+                    render_project_tree(child, depth + 1)
+        else:
+            # Child Levels -> Headers/Markdown with simple visual indentation
+            # depth 1 = "### ↳ Name", depth 2 = "#### ↳ Name", etc.
+            # Or just use indents
+            prefix = "&nbsp;&nbsp;&nbsp;&nbsp;" * depth
+            st.markdown(f"{prefix}**↳ {p_name}**", unsafe_allow_html=True)
+            
+            if has_tasks:
+                p_tasks = df[df["project_id"] == p_id]
+                render_task_table(p_tasks, f"proj_{p_id}")
+                
+            for child in children:
+                render_project_tree(child, depth + 1)
+
+    # Quick jump: indexed search over my tasks (subject or #ID); a hit drives the actions panel
+    recent_tasks = st.session_state.setdefault("recent_tasks", {})
+    task_query = st.text_input("🔎 Buscar tarea (asunto o #ID)", key="kanban_search")
+    if task_query:
+        task_index = client.task_index()
+        hits = task_index.search(task_query, limit=SEARCH_RESULTS, recent=recent_tasks)
+        if hits:
+            hits_df = pd.DataFrame({"Tarea": [task_index.label(h) for h in hits]})
+            event = st.dataframe(hits_df, use_container_width=True, hide_index=True, on_select="rerun",
+                                 selection_mode="single-row", key="kanban_search_results")
+            if len(event.selection.rows) > 0:
+                st.session_state["selected_task_id"] = hits[event.selection.rows[0]]
+                st.session_state["last_selected_id"] = hits[event.selection.rows[0]]
+        else:
+            st.caption("Ninguna tarea coincide con la búsqueda.")
+
+    view_mode = st.radio("Vista", [TREE_VIEW, GRID_VIEW], horizontal=True, key="kanban_view_mode")
+    if view_mode == GRID_VIEW:
+        render_task_grid(df, projects)
+    else:
+        for root in root_projects:
+            render_project_tree(root)
+
+        # Handle Tasks with Unknown Projects or Non-Hierarchical
+        known_ids = set([p["id"] for p in projects])
+        orphan_tasks = df[~df["project_id"].isin(known_ids)]
+        if not orphan_tasks.empty:
+            with st.expander("❓ Otros Proyectos / Sin Clasificar", expanded=True):
+                render_task_table(orphan_tasks, "orphans")
+
+    # --- Actions Section (Global) ---
+    st.markdown("---")
+    st.markdown("### Acciones sobre Tarea Seleccionada")
+    
+    selected_id = st.session_state.get("selected_task_id")
+    
+    if selected_id:
+        recent_tasks[selected_id] = time.time() # Ranks it first in later searches
+        task_row = df[df["id"] == selected_id]
+        if not task_row.empty:
+            task_data = task_row.iloc[0]
+            st.info(f"Seleccionado: **#{selected_id} - {task_data['subject']}**")
+            if task_data["Bloqueada por"]:
+                st.warning(f"Esta tarea espera a: {task_data['Bloqueada por'].removeprefix('🚫 ')}")
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.subheader("⏱️ Logguear Tiempo")
+                # Pre-fill
+                current_progress = int(task_data.get("progress", 0) or 0)
+                hours_log = st.number_input("Horas a imputar", min_value=0.1, step=0.5, key="log_hours")
+                date_log = st.date_input("Fecha", value=datetime.now().date(), key="log_date")
+                progress_log = st.slider("% Avance", 0, 100, step=5, value=current_progress, key="log_progress")
+                comment_log = st.text_input("Comentario (Opcional)", key="log_comment")
+                
+                if st.button("✅ Imputar Horas"):
+                    if client.uses_journal():
+                        client.enqueue("log_time", work_package_id=selected_id, hours=hours_log, comment=comment_log,
+                                       progress=progress_log, spent_on=date_log.isoformat())
+                        success, msg = True, None
+                    else:
+                        success, msg = client.log_time(selected_id, hours_log, comment_log, progress=progress_log, spent_on=date_log.isoformat())
+                    if success:
+                        st.success(f"Tiempo imputado a #{selected_id}")
+                        time.sleep(1)
+                        st.rerun()
+                    else:
+                        st.error(f"Error al imputar tiempo: {msg}")
+
+            with col2:
+                st.subheader("✏️ Editar Tarea")
+                
+                # Fetch Statuses for Edit Form
+                statuses = client.get_statuses()
+                status_options = {s["name"]: s["id"] for s in statuses}
+                
+                with st.form("edit_form"):
+                    new_subject = st.text_input("Asunto", value=task_data["subject"])
+                    
+                    # Status Select
+                    current_status_name = task_data["status"]
+                    # Try to find current status in options (case insensitive match?)
+                    # Using exact match for now, or default to first
+                    status_index = 0
+                    if current_status_name in status_options:
+                        status_index = list(status_options.keys()).index(current_status_name)
+                    
+                    new_status_name = st.selectbox("Estado", options=list(status_options.keys()), index=status_index)
+                    new_status_id = status_options[new_status_name]
+
+                    # Parse current due date
+                    current_due = None
+                    if task_data.get("dueDate"):
+                        try: current_due = datetime.strptime(task_data["dueDate"], "%Y-%m-%d").date()
+                        except: pass
+                    
+                    new_date = st.date_input("Fecha Límite", value=current_due)
+                    
+                    # Estimate
+                    current_est = float(task_data.get("Horas Totales") or 0)
+                    new_est = st.number_input("Estimación (H)", min_value=0.0, step=0.5, value=current_est)
+                    
+                    if st.form_submit_button("💾 Guardar Cambios"):
+                        lock_version = int(task_data["lock_version"])
+                        new_date_str = new_date.isoformat() if new_date else None
+                        
+                        changes = dict(subject=new_subject, due_date=new_date_str, estimated_hours=new_est, status_id=new_status_id)
+                        error = "Error al actualizar la tarea."
+                        try:
+                            if client.uses_journal():
+                                client.enqueue("update_work_package", work_package_id=selected_id, lock_version=lock_version, **changes)
+                                updated = True
+                            else:
+                                updated = client.update_work_package(selected_id, lock_version, **changes)
+                        except ValueError as e: # e.g. the status doesn't exist on the task's instance (federation)
+                            updated, error = False, f"Error al actualizar la tarea: {e}"
+                        if updated:
+                            st.success("Tarea actualizada.")
+                            time.sleep(1)
+                            st.rerun()
+                        else:
+                            st.error(error)
+
+            with col3:
+                st.subheader("🔒 Cerrar Tarea")
+                lock_version = int(task_data["lock_version"])
+                if st.button("🏁 Cerrar Tarea Finalizada"):
+                    with st.spinner("Cerrando..."):
+                        if client.uses_journal():
+                            closed = bool(client.enqueue("close_task", work_package_id=selected_id, lock_version=lock_version))
+                        else:
+                            closed = client.close_task(selected_id, lock_version)
+                        if closed:
+                            st.success(f"Tarea #{selected_id} cerrada.")
+                            st.session_state["selected_task_id"] = None # Deselect
+                            time.sleep(1)
+                            st.rerun()
+                        else:
+                            st.error("No se pudo cerrar la tarea.")
+        else:
+            st.warning("La tarea seleccionada ya no está en la lista visible.")
+    else:
+        st.info("👈 Selecciona una tarea de la tabla para ver acciones.")
+
+    if client.uses_journal():
+        render_journal(client)
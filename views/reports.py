@@ -0,0 +1,410 @@
+import streamlit as st
+import pandas as pd
+from op_client import is_closed_name
+from exports import EXPORT_FORMATS, available_formats, export_file
+from project_tree import build_hierarchy, project_paths
+from report_state import ALL, FIELDS, ReportState
+from views.common import render_freshness
+
+# Task-level export: frame column -> exported column
+TASK_EXPORT_COLUMNS = {
+    "id": "ID", "subject": "Asunto", "project_id": "ID Proyecto", "Ruta": "Proyecto",
+    "status": "Estado", "assignee": "Responsable", "priority": "Prioridad", "progress": "Avance %",
+    "Horas Estimadas": "Horas Estimadas", "Horas Imputadas": "Horas Imputadas",
+    "dueDate": "Fecha Límite", "updated_at": "Última Act.",
+}
+
+
+def task_export_frame(df, projects):
+    """Enriched task-level rows for export (project path instead of the bare project id)."""
+    paths = {pid: path for pid, (_, path) in project_paths(projects).items()}
+    out = df.reindex(columns=[c for c in TASK_EXPORT_COLUMNS if c != "Ruta"])
+    path = df["project_id"].map(paths)
+    if "project_name" in df.columns:
+        path = path.fillna(df["project_name"])
+    out.insert(3, "Ruta", path)
+    return out.rename(columns=TASK_EXPORT_COLUMNS)
+
+
+def parse_iso_duration(duration_str):
+    """ISO 8601 duration (e.g. 'PT2H30M') -> hours."""
+    if not duration_str or pd.isna(duration_str): return 0.0
+    try:
+        duration_str = duration_str.replace("PT", "")
+        hours = 0.0
+        if "H" in duration_str:
+            parts = duration_str.split("H")
+            hours += float(parts[0])
+            duration_str = parts[1]
+        if "M" in duration_str:
+            minutes = float(duration_str.replace("M", ""))
+            hours += minutes / 60.0
+        return round(hours, 2)
+    except: return 0.0
+
+
+def task_frame(tasks):
+    """Task rows as a frame with the derived report columns (hours, Cierre)."""
+    df = pd.DataFrame(tasks)
+    # Ensure columns
+    for col in ["spentTime", "estimatedTime", "project_id", "assignee_id", "progress"]:
+        if col not in df.columns: df[col] = None
+    
+    df["Horas Estimadas"] = df["estimatedTime"].apply(parse_iso_duration)
+    df["Horas Imputadas"] = df["spentTime"].apply(parse_iso_duration)
+    df["status"] = df["status"].astype(str)
+    if pd.api.types.infer_dtype(df["assignee_id"], skipna=True) != "string": # Federated ids are "instance:id"
+        df["assignee_id"] = df["assignee_id"].astype("Int64")
+
+    # Closed/open from the server's isClosed status flags (resolved when the tasks were fetched)
+    if "is_closed" not in df.columns:
+        df["is_closed"] = df["status"].map(is_closed_name)
+    df["Cierre"] = pd.Categorical.from_codes(df["is_closed"].fillna(False).astype(bool).astype(int), categories=["open", "closed"])
+    return df
+
+
+def build_cube(df):
+    """Project × assignee aggregates of the task frame, in a single groupby."""
+    return (
+        df.assign(closed=(df["Cierre"] == "closed").astype(int), progress=df["progress"].fillna(0))
+        .groupby(["project_id", "assignee_id"], dropna=False)
+        .agg(
+            total=("id", "size"),
+            closed=("closed", "sum"),
+            progress_sum=("progress", "sum"),
+            hours_est=("Horas Estimadas", "sum"),
+            hours_spent=("Horas Imputadas", "sum"),
+        )
+    )
+
+
+def slice_cube(cube, assignee_id=None):
+    """Per-project totals of one assignee (None: every assignee) from a build_cube() cube."""
+    if assignee_id is not None:
+        cube = cube[cube.index.get_level_values("assignee_id") == assignee_id]
+    return cube.groupby(level="project_id", dropna=False).sum()
+
+
+def totals_frame(totals):
+    """{project_id: {field: value}} (report_state.ReportState.project_totals) as a frame like slice_cube()."""
+    return pd.DataFrame.from_dict(totals, orient="index", columns=list(FIELDS))
+
+
+def roll_up(project_stats, projects):
+    """Adds every project's stats to its ancestors: subtree totals per project."""
+    parents = {p["id"]: p.get("parent_id") for p in projects}
+    rolled = {}
+    for project_id, row in project_stats.iterrows():
+        seen, current = set(), project_id
+        while current is not None and current not in seen and not pd.isna(current):
+            seen.add(current)
+            rolled[current] = rolled.get(current, 0) + row
+            current = parents.get(current)
+    return pd.DataFrame(rolled).T.reindex(columns=project_stats.columns) if rolled else project_stats.iloc[0:0]
+
+
+def project_report(project_stats, rolled_stats, projects, root_ids=None):
+    """Report table and chart rows from per-project stats, walking the project tree.
+
+    `root_ids` limits the table to those root projects (e.g. the shards loaded so far).
+    """
+    project_children, root_projects = build_hierarchy(projects)
+    if root_ids is not None:
+        root_projects = [p for p in root_projects if p["id"] in root_ids]
+
+    report_rows = []
+    
+    # For Char data
+    chart_data_rows = []
+
+    def process_project(p, depth=0):
+        p_id = p["id"]
+        
+        stats = project_stats.loc[p_id] if p_id in project_stats.index else None
+        
+        total_tasks = int(stats["total"]) if stats is not None else 0
+        closed_tasks = int(stats["closed"]) if stats is not None else 0
+        
+        avg_progress = stats["progress_sum"] / total_tasks if total_tasks > 0 else 0
+        
+        hours_est = stats["hours_est"] if stats is not None else 0.0
+        hours_spent = stats["hours_spent"] if stats is not None else 0.0
+        hours_rem = hours_est - hours_spent
+
+        # Whole subtree (project + descendants)
+        tree = rolled_stats.loc[p_id] if p_id in rolled_stats.index else None
+        tree_tasks = int(tree["total"]) if tree is not None else 0
+        tree_rem = tree["hours_est"] - tree["hours_spent"] if tree is not None else 0.0
+        
+        # Format Name with Indent
+        indent = "⠀⠀" * depth 
+        display_name = f"{indent}{'📂 ' if depth==0 else '↳ '}{p['name']}"
+
+        report_rows.append({
+            "Proyecto": display_name,
+            "Total Tareas": total_tasks,
+            "Tareas Cerradas": closed_tasks,
+            "Avance Global %": round(avg_progress, 1),
+            "Horas Est.": round(hours_est, 1),
+            "Horas Imp.": round(hours_spent, 1),
+            "Horas Pend.": round(hours_rem, 1),
+            "Tareas (árbol)": tree_tasks,
+            "Horas Pend. (árbol)": round(tree_rem, 1)
+        })
+        
+        # Collect data for chart (only loop over active projects to avoid clutter)
+        if total_tasks > 0:
+            chart_data_rows.append({
+                "Proyecto": p["name"], # No indent for chart
+                "Horas Estimadas": hours_est,
+                "Horas Imputadas": hours_spent,
+                "Horas Pendientes": hours_rem
+            })
+
+        # Process Children
+        children = project_children.get(p_id, [])
+        for child in children:
+            process_project(child, depth + 1)
+
+    for root in root_projects:
+        process_project(root)
+
+    # Add Orphans
+    known_ids = set([p["id"] for p in projects])
+    orphan_stats = project_stats[~project_stats.index.isin(known_ids)]
+    if not orphan_stats.empty:
+        orphans = orphan_stats.sum()
+        hours_est = orphans["hours_est"]
+        hours_spent = orphans["hours_spent"]
+        hours_rem = hours_est - hours_spent
+        
+        report_rows.append({
+            "Proyecto": "❓ Sin Clasificar",
+            "Total Tareas": int(orphans["total"]),
+            "Tareas Cerradas": int(orphans["closed"]),
+            "Avance Global %": round(orphans["progress_sum"] / orphans["total"], 1),
+            "Horas Est.": round(hours_est, 1),
+            "Horas Imp.": round(hours_spent, 1),
+            "Horas Pend.": round(hours_rem, 1),
+            "Tareas (árbol)": int(orphans["total"]),
+            "Horas Pend. (árbol)": round(hours_rem, 1)
+        })
+        chart_data_rows.append({
+            "Proyecto": "❓ Sin Clasificar",
+            "Horas Estimadas": hours_est,
+            "Horas Imputadas": hours_spent,
+            "Horas Pendientes": hours_rem
+        })
+
+    return pd.DataFrame(report_rows), pd.DataFrame(chart_data_rows)
+
+
+def show_report(report_df, chart_df):
+    st.subheader("📋 Detalle de Avance")
+    st.dataframe(
+        report_df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Avance Global %": st.column_config.ProgressColumn(
+                "Avance",
+                format="%.1f%%",
+                min_value=0,
+                max_value=100,
+            ),
+        },
+        height=500
+    )
+    
+    if not chart_df.empty:
+        st.subheader("📈 Distribución de Horas por Proyecto")
+        # Let's use simple bar_chart which treats columns as series.
+        st.bar_chart(chart_df.set_index("Proyecto")[["Horas Estimadas", "Horas Imputadas", "Horas Pendientes"]])
+
+
+def critical_path_frame(graph, tasks, projects):
+    """Longest chain of dependent open tasks per project (by estimated hours), longest first."""
+    open_tasks = {t["id"]: t for t in tasks if not t.get("is_closed") and t.get("project_id") is not None}
+    weights = {i: t.get("estimated_hours") or 0.0 for i, t in open_tasks.items()}
+    group_of = {i: t["project_id"] for i, t in open_tasks.items()}
+    names = {p["id"]: p["name"] for p in projects}
+    rows = []
+    for project_id, (hours, path) in graph.critical_paths(weights, group_of).items():
+        rows.append({
+            "Proyecto": names.get(project_id, f"#{project_id}"),
+            "Horas Ruta": round(hours, 1),
+            "Tareas": len(path),
+            "Ruta": " → ".join(f"#{i}" for i in path),
+            "Siguiente": open_tasks[path[0]]["subject"],
+        })
+    columns = ["Proyecto", "Horas Ruta", "Tareas", "Ruta", "Siguiente"]
+    return pd.DataFrame(rows, columns=columns).sort_values("Horas Ruta", ascending=False, kind="stable")
+
+
+def render_critical_paths(client, tasks, projects):
+    st.subheader("🧭 Ruta Crítica por Proyecto")
+    with st.spinner("Cargando dependencias..."):
+        graph = client.dependency_graph()
+    if graph is None:
+        st.caption("No se pudieron cargar las relaciones entre tareas.")
+        return
+    cycles = graph.cycles()
+    if cycles:
+        shown = "; ".join(" ↔ ".join(f"#{i}" for i in sorted(c)) for c in cycles[:5])
+        st.warning(f"⚠️ {len(cycles)} dependencia(s) circular(es): {shown}")
+    paths = critical_path_frame(graph, tasks, projects)
+    if paths.empty:
+        st.caption("Sin dependencias entre tareas abiertas.")
+        return
+    st.caption("Cadena más larga de tareas abiertas dependientes (bloquea / precede), por horas estimadas.")
+    st.dataframe(paths, use_container_width=True, hide_index=True)
+
+
+def render_progressive(client, projects, fetch_assignee_id, slice_id):
+    """Loads the tasks shard by shard (root project subtrees), refreshing the table and chart as each lands.
+
+    Returns True once every shard is in (the full dataset is then cached), False if the load failed.
+    """
+    shards = client.project_shards(projects)
+    progress = st.progress(0.0, text=f"⏳ Cargando {len(shards)} proyectos raíz...")
+    report_area = st.empty()
+    state = ReportState(projects)
+    assignee_key = ALL if slice_id is None else slice_id
+    loaded, landed = set(), 0
+    try:
+        for root, tasks in client.iter_task_shards(fetch_assignee_id, projects):
+            state.apply(changed=tasks)
+            loaded.add(root["id"])
+            landed += 1  # The catch-all shards (one per instance) share the id None
+            project_stats = totals_frame(state.project_totals(assignee_key))
+            rolled_stats = totals_frame(state.project_totals(assignee_key, rolled=True))
+            report_df, chart_df = project_report(project_stats, rolled_stats, projects, root_ids=loaded)
+            progress.progress(landed / len(shards),
+                              text=f"⏳ Totales parciales: {landed}/{len(shards)} proyectos raíz cargados")
+            with report_area.container():
+                show_report(report_df, chart_df)
+    except Exception as e:
+        print(f"Progressive report load failed: {e}")
+        progress.empty()
+        report_area.empty()
+        st.warning("La carga progresiva falló: se usa la carga completa.")
+        return False
+    return True
+
+
+def render(client):
+    st.header("📊 Management Reports")
+    st.markdown("Visión general del avance por Proyecto y Subproyecto.")
+
+    # 1. Fetch Users & Projects
+    with st.spinner("Cargando referencia..."):
+        projects = client.get_projects()
+        users = client.get_users()
+
+    if not projects:
+        st.warning("No se encontraron proyectos.")
+        return
+
+    # User Filter
+    user_options = {"Todos": None, "Yo": "me"}
+    
+    # Sort users by name for better UX (sorted copy: the list may be shared with other sessions)
+    users = sorted(users, key=lambda x: x["name"])
+    
+    for u in users:
+        user_options[u["name"]] = u["id"]
+
+    col_filter, col_cube, col_refresh = st.columns([3, 2, 1])
+    with col_filter:
+        selected_user_label = st.selectbox("👤 Filtrar por Responsable", options=list(user_options.keys()), index=1)
+        selected_assignee_id = user_options[selected_user_label]
+
+    with col_cube:
+        # One pull of every assignee's tasks; switching the filter then just slices the cube
+        use_cube = st.toggle("⚡ Cargar todos los responsables", value=True, help="Una sola carga: cambiar de responsable es instantáneo.")
+        progressive = st.toggle("🧩 Carga progresiva", value=True, help="Carga por proyecto raíz en paralelo y muestra cada uno en cuanto llega.")
+    
+    with col_refresh:
+        st.write("") # Spacer
+        force_refresh = st.button("🔄 Refrescar")
+
+    # 2. Assignee whose tasks are shown (cube mode slices locally, else the server filters)
+    fetch_assignee_id = None if use_cube else selected_assignee_id
+    slice_id = None
+    if use_cube and selected_assignee_id == "me":
+        me = client.get_me()
+        slice_id = me["id"] if me else None
+        if slice_id is None:
+            st.warning("No se pudo identificar tu usuario: se muestran todos los responsables.")
+    elif use_cube:
+        slice_id = selected_assignee_id
+
+    # 3. Fetch Tasks. Cold load: shard by root project and show each one as it lands
+    cache_key = ("all_tasks", fetch_assignee_id)
+    if progressive and (force_refresh or client.task_cache.peek(cache_key) is None):
+        if render_progressive(client, projects, fetch_assignee_id, slice_id):
+            st.rerun() # Every shard landed: the full dataset is cached now
+    with st.spinner(f"Cargando tareas de: {'Todos' if use_cube else selected_user_label}..."):
+        cached = client.get_all_tasks_cached(assignee_id=fetch_assignee_id, force=force_refresh)
+    if not render_freshness(client, cached, cache_key):
+        return
+    tasks = cached.value
+
+    # 4. Per-project stats for the selected assignee
+    state = client.report_state() if use_cube else None
+    if state is not None:
+        # Accumulators kept up to date by the client from work package deltas: nothing to recompute
+        assignee_key = ALL if slice_id is None else slice_id
+        if state.total(assignee_key) == 0:
+            st.info(f"No hay tareas registradas para '{selected_user_label}'.")
+            return
+        project_stats = totals_frame(state.project_totals(assignee_key))
+        rolled_stats = totals_frame(state.project_totals(assignee_key, rolled=True))
+        # The task-level frame is only needed for the export: built when the button is clicked
+        def task_rows():
+            df = task_frame(tasks)
+            return df if slice_id is None else df[df["assignee_id"] == slice_id]
+    else:
+        # Frame + cube built once per dataset version (reused across filter changes)
+        memo_key = (client.base_url, client.scope, fetch_assignee_id, cached.version)
+        memo = st.session_state.get("report_cube")
+        if memo is None or memo[0] != memo_key:
+            df_all = task_frame(tasks) if tasks else pd.DataFrame()
+            memo = (memo_key, df_all, build_cube(df_all) if not df_all.empty else None)
+            st.session_state["report_cube"] = memo
+        _, df, cube = memo
+        if slice_id is not None and not df.empty:
+            df = df[df["assignee_id"] == slice_id]
+        if df.empty:
+            st.info(f"No hay tareas registradas para '{selected_user_label}'.")
+            return
+        project_stats = slice_cube(cube, slice_id)
+        rolled_stats = roll_up(project_stats, projects)
+        task_rows = lambda: df
+
+    # 5. Aggregation + 6. Table + 7. Chart
+    report_df, chart_df = project_report(project_stats, rolled_stats, projects)
+    show_report(report_df, chart_df)
+    render_critical_paths(client, tasks, projects)
+
+    # 8. Download: files are only built when a button is clicked (callable data)
+    st.subheader("📥 Exportar")
+    export_format = st.selectbox("Formato", options=available_formats(), key="export_format")
+    ext, mime = EXPORT_FORMATS[export_format]
+    col_report, col_tasks = st.columns(2)
+    with col_report:
+        st.download_button(
+            "📥 Descargar Reporte (por proyecto)",
+            lambda: export_file(report_df, export_format),
+            f"reporte_avance.{ext}",
+            mime,
+            key='download-report'
+        )
+    with col_tasks:
+        st.download_button(
+            "📥 Descargar Tareas (detalle)",
+            lambda: export_file(task_export_frame(task_rows(), projects), export_format),
+            f"tareas_detalle.{ext}",
+            mime,
+            key='download-tasks'
+        )
@@ -0,0 +1,83 @@
+import streamlit as st
+import pandas as pd
+from datetime import date, timedelta
+
+# Row dimension label -> frame column
+TIMESHEET_ROWS = {"Persona": "user", "Proyecto": "project", "Tarea": "work_package"}
+PERIODS = ("Día", "Semana")
+
+
+def time_entries_frame(entries):
+    """Time entries as a typed frame; adds the Día / Semana (Monday) period columns."""
+    df = pd.DataFrame(entries, columns=["id", "spentOn", "hours", "user_id", "user", "project_id", "project",
+                                        "work_package_id", "work_package", "comment"])
+    df["spentOn"] = pd.to_datetime(df["spentOn"])
+    df["hours"] = pd.to_numeric(df["hours"]).fillna(0.0)
+    for col in ("user", "project", "work_package"):
+        df[col] = df[col].fillna("—")
+    df["Día"] = df["spentOn"].dt.normalize()
+    df["Semana"] = df["Día"] - pd.to_timedelta(df["Día"].dt.weekday, unit="D")
+    return df
+
+
+def timesheet_pivot(df, period="Día", rows=("Persona", "Proyecto")):
+    """Hours per row dimensions (e.g. Persona × Proyecto) × period, with totals."""
+    index = [TIMESHEET_ROWS[r] for r in rows]
+    pivot = df.pivot_table(index=index, columns=period, values="hours", aggfunc="sum",
+                           fill_value=0.0, margins=True, margins_name="Total")
+    fmt = "%d/%m" if period == "Día" else "Sem %d/%m"
+    pivot.columns = [c if c == "Total" else c.strftime(fmt) for c in pivot.columns]
+    return pivot.rename_axis(index=list(rows)).round(2)
+
+
+def render(client):
+    st.header("🕒 Timesheet")
+    st.markdown("Horas imputadas por persona, proyecto y periodo.")
+
+    today = date.today()
+    default_start = today - timedelta(days=today.weekday() + 21) # Four weeks, starting on a Monday
+    col_range, col_period, col_rows, col_refresh = st.columns([2, 1, 2, 1])
+    with col_range:
+        selected = st.date_input("Rango de fechas", value=(default_start, today), max_value=today)
+    with col_period:
+        period = st.radio("Periodo", PERIODS, horizontal=True)
+    with col_rows:
+        rows = st.multiselect("Filas", list(TIMESHEET_ROWS), default=["Persona", "Proyecto"])
+    with col_refresh:
+        st.write("") # Spacer
+        refresh = st.button("🔄 Refrescar semana")
+
+    if not isinstance(selected, (tuple, list)) or len(selected) != 2:
+        st.info("Selecciona la fecha de inicio y de fin.")
+        return
+    if not rows:
+        st.info("Selecciona al menos una dimensión para las filas.")
+        return
+    start, end = selected
+
+    with st.spinner("Cargando imputaciones..."):
+        entries = client.get_time_entries(start, end, refresh=refresh)
+    if not entries:
+        st.info("No hay horas imputadas en el rango seleccionado.")
+        return
+    df = time_entries_frame(entries)
+
+    users = sorted(df["user"].unique())
+    selected_users = st.multiselect("👤 Personas", users, placeholder="Todas")
+    if selected_users:
+        df = df[df["user"].isin(selected_users)]
+        if df.empty:
+            st.info("Sin imputaciones para la selección.")
+            return
+
+    col_total, col_people, col_avg = st.columns(3)
+    col_total.metric("Horas imputadas", f"{df['hours'].sum():.1f}")
+    col_people.metric("Personas", df["user"].nunique())
+    col_avg.metric("Media por persona y día", f"{df.groupby(['user', 'Día'])['hours'].sum().mean():.1f}")
+
+    st.subheader("📋 Horas por periodo")
+    st.dataframe(timesheet_pivot(df, period, rows), use_container_width=True)
+
+    st.subheader("📈 Evolución por persona")
+    chart = df.pivot_table(index=period, columns="user", values="hours", aggfunc="sum", fill_value=0.0)
+    st.bar_chart(chart)
@@ -0,0 +1,133 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+from datetime import date
+from views.common import render_freshness
+
+WEEKDAY_LETTERS = "LMXJVSD"
+HORIZONS = {"2 semanas": 14, "4 semanas": 28, "8 semanas": 56}
+
+
+def remaining_work(tasks, today=None):
+    """Open, assigned tasks with hours left, as a frame: assignee_id, assignee (display name),
+    remaining, start, due (datetime64[D]).
+
+    Work is scheduled from max(today, startDate) to dueDate; overdue work lands on today, and
+    tasks without a due date keep a NaT `due` (they can't be placed on the calendar).
+    """
+    today = np.datetime64(today or date.today(), "D")
+    df = pd.DataFrame(tasks, columns=["assignee", "assignee_id", "is_closed", "estimated_hours", "spent_hours",
+                                      "startDate", "dueDate"])
+    remaining = pd.to_numeric(df["estimated_hours"]).fillna(0.0) - pd.to_numeric(df["spent_hours"]).fillna(0.0)
+    df = df.assign(remaining=remaining)
+    df = df[~df["is_closed"].eq(True) & df["assignee_id"].notna() & (df["remaining"] > 0)]
+
+    due = pd.to_datetime(df["dueDate"], errors="coerce").to_numpy("datetime64[D]")
+    start = pd.to_datetime(df["startDate"], errors="coerce").to_numpy("datetime64[D]")
+    start = np.where(np.isnat(start) | (start < today), today, start)
+    due = np.where(~np.isnat(due) & (due < today), today, due)
+    start = np.where(~np.isnat(due) & (start > due), due, start)
+    return pd.DataFrame({"assignee_id": df["assignee_id"].to_numpy(), "assignee": df["assignee"].to_numpy(),
+                         "remaining": df["remaining"].to_numpy(), "start": start, "due": due})
+
+
+def person_labels(work):
+    """{assignee_id: display name}; people sharing a name get their id appended."""
+    names = work.drop_duplicates("assignee_id").set_index("assignee_id")["assignee"].fillna("?").astype(str)
+    shared = names.duplicated(keep=False)
+    return {pid: f"{name} (#{pid})" if shared[pid] else name for pid, name in names.items()}
+
+
+def workload_matrix(work, first_day, days):
+    """Hours per assignee (indexed by assignee_id) × working day over `days` calendar days from `first_day`.
+
+    Each task's remaining hours are spread evenly over the working days of [start, due]
+    (a range with none rolls to the next working day). Vectorized: every task adds its daily
+    rate at its first day and removes it after its last one, and a cumulative sum along the
+    calendar turns those steps into loads. Work after the horizon is left out.
+    """
+    first_day = np.datetime64(first_day, "D")
+    calendar = np.arange(first_day, first_day + days, dtype="datetime64[D]")
+    calendar = calendar[np.is_busday(calendar)]
+    scheduled = work[~np.isnat(work["due"].to_numpy("datetime64[D]"))]
+    people = np.sort(scheduled["assignee_id"].unique())
+    if len(people) == 0 or len(calendar) == 0:
+        return pd.DataFrame(index=pd.Index(people, name="assignee_id"), columns=pd.DatetimeIndex(calendar), dtype=float)
+
+    start = np.busday_offset(scheduled["start"].to_numpy("datetime64[D]"), 0, roll="forward")
+    due = scheduled["due"].to_numpy("datetime64[D]")
+    due = np.where(due < start, start, due)
+    rate = scheduled["remaining"].to_numpy(float) / np.maximum(np.busday_count(start, due + 1), 1)
+
+    rows = np.searchsorted(people, scheduled["assignee_id"].to_numpy())
+    first = np.searchsorted(calendar, start)
+    last = np.searchsorted(calendar, due, side="right")
+    steps = np.zeros((len(people), len(calendar) + 1))
+    np.add.at(steps, (rows, first), rate)
+    np.add.at(steps, (rows, last), -rate)
+    load = np.cumsum(steps, axis=1)[:, :-1]
+    return pd.DataFrame(load.round(2), index=pd.Index(people, name="assignee_id"), columns=pd.DatetimeIndex(calendar))
+
+
+def _load_color(ratio):
+    if ratio > 1:
+        return "background-color: #f8b4b4"
+    if ratio > 0.8:
+        return "background-color: #fde68a"
+    if ratio > 0:
+        return "background-color: #bbf7d0"
+    return ""
+
+
+def render(client):
+    st.header("📅 Carga de Trabajo")
+    st.markdown("Horas pendientes repartidas por día laborable hasta la fecha límite, frente a la capacidad diaria.")
+
+    col_capacity, col_horizon, col_refresh = st.columns([1, 1, 1])
+    with col_capacity:
+        capacity = st.number_input("Capacidad diaria (h)", min_value=0.5, max_value=24.0, value=8.0, step=0.5)
+    with col_horizon:
+        horizon = st.selectbox("Horizonte", list(HORIZONS), index=1)
+    with col_refresh:
+        st.write("") # Spacer
+        force_refresh = st.button("🔄 Refrescar")
+
+    with st.spinner("Cargando tareas de todos los responsables..."):
+        cached = client.get_all_tasks_cached(assignee_id=None, force=force_refresh)
+    if not render_freshness(client, cached, ("all_tasks", None)):
+        return
+    work = remaining_work(cached.value)
+    if work.empty:
+        st.info("No hay trabajo pendiente asignado.")
+        return
+
+    load = workload_matrix(work, date.today(), HORIZONS[horizon])
+    unscheduled = work[np.isnat(work["due"].to_numpy("datetime64[D]"))].groupby("assignee_id")["remaining"].sum()
+    labels = person_labels(work)
+
+    overloaded = (load > capacity).sum(axis=1)
+    col_people, col_hours, col_over = st.columns(3)
+    col_people.metric("Personas con carga", len(load))
+    col_hours.metric("Horas planificadas", f"{load.to_numpy().sum():.0f}")
+    col_over.metric("Personas sobrecargadas", int((overloaded > 0).sum()))
+
+    st.subheader("🌡️ Mapa de calor (horas/día)")
+    heatmap = load.copy()
+    heatmap.columns = [f"{WEEKDAY_LETTERS[d.weekday()]} {d:%d/%m}" for d in load.columns]
+    heatmap.index = pd.Index(load.index.map(labels), name="Persona")
+    st.dataframe(heatmap.style.map(lambda h: _load_color(h / capacity)).format("{:.1f}"), use_container_width=True)
+    st.caption("🟩 ≤ 80 % · 🟨 ≤ 100 % · 🟥 por encima de la capacidad")
+
+    st.subheader("📋 Resumen por persona")
+    summary = pd.DataFrame({
+        "Horas en horizonte": load.sum(axis=1),
+        "Capacidad": len(load.columns) * capacity,
+        "Días sobrecargados": overloaded,
+        "Pico (h/día)": load.max(axis=1),
+    })
+    summary["Ocupación %"] = (summary["Horas en horizonte"] / summary["Capacidad"] * 100).round(1)
+    summary = summary.join(unscheduled.rename("Sin fecha límite (h)"), how="outer").fillna(0.0)
+    summary.index = pd.Index(summary.index.map(labels), name="Persona")
+    st.dataframe(summary.sort_values("Ocupación %", ascending=False).round(1), use_container_width=True)
+    if not unscheduled.empty:
+        st.caption("Las tareas sin fecha límite no se pueden repartir en el calendario: se muestran aparte.")
@@ -0,0 +1,108 @@
+# OpenProject webhooks: signature check, an embedded receiver and a stand-in sender for local testing.
+# OpenProject signs each delivery with the webhook's secret: header X-OP-Signature is
+# "sha1=" + hex HMAC-SHA1 of the raw request body. Stand-in sender (e.g. against a local receiver):
+#     python webhooks.py http://127.0.0.1:8765/webhooks/openproject SECRET event.json
+
+import hashlib
+import hmac
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SIGNATURE_HEADER = "X-OP-Signature"
+DEFAULT_PATH = "/webhooks/openproject"
+MAX_BODY_BYTES = 5 * 1024 * 1024
+
+
+def sign(secret, body):
+    return "sha1=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha1).hexdigest()
+
+
+def verify(secret, body, signature):
+    """True if `signature` (the X-OP-Signature header) matches `body` under `secret`."""
+    return bool(signature) and hmac.compare_digest(sign(secret, body), signature.strip())
+
+
+class WebhookReceiver:
+    """Embedded HTTP endpoint for OpenProject webhooks.
+
+    Deliveries with a valid signature are parsed and handed to `dispatch(event)`; anything else
+    is rejected (401 bad signature, 400 invalid JSON, 413 too large, 404 other paths).
+    `dispatch` runs on the request thread, so it should hand slow work off and return.
+    """
+
+    def __init__(self, secret, dispatch, host="127.0.0.1", port=8765, path=DEFAULT_PATH):
+        self.secret = secret
+        self.dispatch = dispatch
+        self.path = path
+        self.received = 0
+        self.rejected = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.path}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="op-webhooks", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path.split("?")[0] != receiver.path:
+                    return self._reply(404)
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > MAX_BODY_BYTES:
+                    return self._reply(413)
+                body = self.rfile.read(length)
+                if not verify(receiver.secret, body, self.headers.get(SIGNATURE_HEADER)):
+                    receiver.rejected += 1
+                    return self._reply(401)
+                try:
+                    event = json.loads(body)
+                except ValueError:
+                    receiver.rejected += 1
+                    return self._reply(400)
+                receiver.received += 1
+                try:
+                    receiver.dispatch(event)
+                except Exception as e:
+                    print(f"Error dispatching webhook {event.get('action')}: {e}")
+                self._reply(200)
+
+            def _reply(self, status):
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def send_event(url, secret, event, timeout=5):
+    """Stand-in for OpenProject: POSTs a signed event. Returns the response status code."""
+    import requests
+    body = json.dumps(event).encode("utf-8")
+    headers = {"Content-Type": "application/json", SIGNATURE_HEADER: sign(secret, body)}
+    return requests.post(url, data=body, headers=headers, timeout=timeout).status_code
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        sys.exit("Usage: python webhooks.py URL SECRET EVENT_JSON_FILE")
+    with open(sys.argv[3], encoding="utf-8") as f:
+        print(send_event(sys.argv[1], sys.argv[2], json.load(f)))
@@ -0,0 +1,227 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from collections import namedtuple
+
+# Item states. "uncertain": the request may have reached the server (e.g. read timeout), so it is
+# not replayed automatically; the user decides whether to retry or discard it.
+PENDING, SENDING, DONE, FAILED, UNCERTAIN = "pending", "sending", "done", "failed", "uncertain"
+
+# Outcome of one flush attempt, returned by the executor passed to JournalFlusher (along with
+# FAILED and UNCERTAIN, which settle the item at once)
+SENT, RETRY = "sent", "retry"
+
+JournalItem = namedtuple("JournalItem", [
+    "key", "op", "args", "status", "attempts", "last_error", "result", "created_at", "updated_at",
+])
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "openproject_agile", "write_journal.sqlite")
+
+
+def _native(value):
+    # numpy scalars (ids and lock versions read from DataFrames) -> plain Python values
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+class WriteJournal:
+    """Durable (SQLite) FIFO of write intents per credential scope.
+
+    Intents are acknowledged once appended; a JournalFlusher sends them later. Every intent
+    carries an idempotency key, so a resubmitted intent is recorded once and applied at most once.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS intents ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT UNIQUE, scope TEXT, op TEXT, args TEXT,"
+            " status TEXT, attempts INTEGER DEFAULT 0, last_error TEXT, result TEXT,"
+            " created_at REAL, updated_at REAL, next_attempt_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS intents_scope ON intents (scope, status, seq)")
+        os.chmod(path, 0o600)
+        # A previous process died mid-send: whether the server applied those is unknown
+        with self._lock:
+            self._conn.execute(
+                "UPDATE intents SET status = ?, last_error = ? WHERE status = ?",
+                (UNCERTAIN, "Interrumpido durante el envío", SENDING),
+            )
+
+    def append(self, scope, op, args, key=None):
+        """Records an intent and returns its idempotency key. Re-appending the same key is a no-op."""
+        key = key or uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO intents (key, scope, op, args, status, created_at, updated_at, next_attempt_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, scope, op, json.dumps(args, default=_native), PENDING, now, now, now),
+            )
+        return key
+
+    def claim(self, scope, limit):
+        """Marks up to `limit` due pending intents of `scope` as sending and returns them, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM intents WHERE scope = ? AND status = ? AND next_attempt_at <= ? ORDER BY seq LIMIT ?",
+                (scope, PENDING, time.time(), limit),
+            ).fetchall()
+            keys = [r[0] for r in rows]
+            self._conn.executemany(
+                "UPDATE intents SET status = ?, attempts = attempts + 1, updated_at = ? WHERE key = ?",
+                [(SENDING, time.time(), k) for k in keys],
+            )
+        return [self.get(k) for k in keys]
+
+    def _set(self, key, **fields):
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE intents SET {columns} WHERE key = ?", (*fields.values(), key))
+
+    def mark_done(self, key, result=None):
+        self._set(key, status=DONE, result=json.dumps(result), last_error=None)
+
+    def mark_retry(self, key, error, delay):
+        self._set(key, status=PENDING, last_error=error, next_attempt_at=time.time() + delay)
+
+    def mark_failed(self, key, error):
+        self._set(key, status=FAILED, last_error=error)
+
+    def mark_uncertain(self, key, error):
+        self._set(key, status=UNCERTAIN, last_error=error)
+
+    def release(self, keys):
+        """Returns claimed but unsent intents to the queue without counting an attempt."""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE intents SET status = ?, attempts = attempts - 1 WHERE key = ? AND status = ?",
+                [(PENDING, k, SENDING) for k in keys],
+            )
+
+    def requeue(self, key):
+        """Manual retry of a failed/uncertain intent (same idempotency key)."""
+        self._set(key, status=PENDING, next_attempt_at=time.time())
+
+    def discard(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM intents WHERE key = ? AND status != ?", (key, SENDING))
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, op, args, status, attempts, last_error, result, created_at, updated_at"
+                " FROM intents WHERE key = ?", (key,)
+            ).fetchone()
+        return self._item(row) if row else None
+
+    def items(self, scope, limit=50):
+        """Most recent intents of `scope`, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, op, args, status, attempts, last_error, result, created_at, updated_at"
+                " FROM intents WHERE scope = ? ORDER BY seq DESC LIMIT ?", (scope, limit)
+            ).fetchall()
+        return [self._item(r) for r in rows]
+
+    def has_pending(self, scope):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM intents WHERE scope = ? AND status = ? LIMIT 1", (scope, PENDING)
+            ).fetchone()
+        return row is not None
+
+    def prune(self, max_age):
+        """Forgets delivered intents older than `max_age` seconds."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM intents WHERE status = ? AND updated_at < ?", (DONE, time.time() - max_age)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _item(row):
+        key, op, args, status, attempts, last_error, result, created_at, updated_at = row
+        return JournalItem(key, op, json.loads(args), status, attempts, last_error,
+                           json.loads(result) if result else None, created_at, updated_at)
+
+
+class JournalFlusher:
+    """Background thread sending the pending intents of one scope in batches.
+
+    `execute(item)` sends one intent and returns (SENT, result), (RETRY, error), (FAILED, error)
+    or (UNCERTAIN, error); exceptions it raises mark the item uncertain. The optional `prepare(items)`
+    runs once before each batch. Retries back off exponentially; after `max_attempts` the item
+    is marked failed. A batch stops at the first retry, since the upstream is likely unavailable.
+    """
+
+    def __init__(self, journal, scope, execute, batch_size=20, interval=5.0, max_attempts=5, backoff=2.0, prepare=None):
+        self.journal = journal
+        self.scope = scope
+        self.execute = execute
+        self.prepare = prepare
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="op-journal", daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def flush_once(self):
+        """Sends one batch. Returns the number of intents delivered."""
+        sent = 0
+        batch = self.journal.claim(self.scope, self.batch_size)
+        if batch and self.prepare is not None:
+            try:
+                self.prepare(batch)
+            except Exception as e:
+                print(f"Error preparing journal batch: {e}")
+        for i, item in enumerate(batch):
+            try:
+                outcome, detail = self.execute(item)
+            except Exception as e:
+                self.journal.mark_uncertain(item.key, str(e))
+                continue
+            if outcome == SENT:
+                self.journal.mark_done(item.key, detail)
+                sent += 1
+            elif outcome == UNCERTAIN:
+                self.journal.mark_uncertain(item.key, detail)
+            elif outcome == FAILED or item.attempts >= self.max_attempts:
+                self.journal.mark_failed(item.key, detail)
+            else:
+                self.journal.mark_retry(item.key, detail, self.backoff ** item.attempts)
+                self.journal.release([rest.key for rest in batch[i + 1:]])
+                break
+        return sent
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.clear()
+            try:
+                while self.flush_once():
+                    pass
+            except sqlite3.Error as e:
+                print(f"Error flushing write journal: {e}")
+            self._wake.wait(self.interval)